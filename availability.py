@@ -0,0 +1,160 @@
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+AVAILABILITY_WEIGHTS = (0.60, 0.30, 0.10)
+DURABILITY_PENALTY_FACTOR = 0.05
+# Durability_Composite blends recency-weighted GP with median GP at 70/30.
+WEIGHTED_GP_SHARE = 0.7
+MEDIAN_GP_SHARE = 0.3
+
+
+def build_availability_metrics(
+    nba_df: pd.DataFrame,
+    weights: Sequence[float] = AVAILABILITY_WEIGHTS,
+    penalty_factor: float = DURABILITY_PENALTY_FACTOR,
+) -> pd.DataFrame:
+    if nba_df.empty:
+        return pd.DataFrame(
+            columns=
+            [
+                "PLAYER_ID",
+                "Weighted_GP",
+                "GP_Median",
+                "GP_Variance",
+                "Durability_Composite",
+                "Durability_Penalty",
+                "Seasons_Weighted",
+                "Seasons_Total",
+            ]
+        )
+
+    base_weights = np.asarray(weights, dtype=float)
+    if base_weights.ndim != 1 or base_weights.size == 0:
+        raise ValueError("weights must be a non-empty 1D sequence")
+
+    # One stable sort puts every player's seasons newest-first, matching the
+    # per-player ordering; everything after is grouped array arithmetic.
+    frame = pd.DataFrame(
+        {
+            "PLAYER_ID": nba_df["PLAYER_ID"],
+            "SEASON_START_YEAR": nba_df["SEASON_START_YEAR"],
+            "SEASON_ID": nba_df["SEASON_ID"],
+            "GP": pd.to_numeric(nba_df["GP"], errors="coerce").fillna(0.0),
+        }
+    )
+    frame = frame[frame["PLAYER_ID"].notna()].sort_values(
+        ["PLAYER_ID", "SEASON_START_YEAR", "SEASON_ID"],
+        ascending=[True, False, False],
+        na_position="last",
+        kind="stable",
+    )
+    grouped = frame.groupby("PLAYER_ID", sort=True)
+    gp = frame["GP"].to_numpy(dtype=float)
+    recency = grouped.cumcount().to_numpy()
+    considered = recency < base_weights.size
+    codes = grouped.ngroup().to_numpy()
+    n_players = grouped.ngroups
+
+    total_seasons = np.bincount(codes, minlength=n_players)
+    seasons_weighted = np.minimum(total_seasons, base_weights.size)
+    median_gp = grouped["GP"].median().to_numpy(dtype=float)
+    mean_gp = np.bincount(codes, weights=gp, minlength=n_players) / total_seasons
+    variance_gp = (
+        np.bincount(codes, weights=(gp - mean_gp[codes]) ** 2, minlength=n_players) / total_seasons
+    )
+
+    row_weights = np.where(considered, base_weights[np.minimum(recency, base_weights.size - 1)], 0.0)
+    weight_sum = np.bincount(codes, weights=row_weights, minlength=n_players)
+    row_norm = np.where(
+        weight_sum[codes] == 0,
+        np.where(considered, 1.0 / seasons_weighted[codes], 0.0),
+        row_weights / np.where(weight_sum == 0, 1.0, weight_sum)[codes],
+    )
+    weighted_gp = np.bincount(codes, weights=gp * row_norm, minlength=n_players)
+
+    availability_anchor = (weighted_gp * WEIGHTED_GP_SHARE) + (median_gp * MEDIAN_GP_SHARE)
+    stability_penalty = variance_gp * penalty_factor
+    durability_composite = np.maximum(availability_anchor - stability_penalty, 0.0)
+
+    season_slots = (
+        frame.loc[considered, ["PLAYER_ID", "SEASON_ID"]]
+        .assign(slot=recency[considered])
+        .pivot(index="PLAYER_ID", columns="slot", values="SEASON_ID")
+    )
+    seasons_used = season_slots[0].astype(str)
+    for slot in season_slots.columns[1:]:
+        nxt = season_slots[slot]
+        seasons_used = seasons_used.where(nxt.isna(), seasons_used + "," + nxt.astype(str))
+
+    return pd.DataFrame(
+        {
+            "PLAYER_ID": grouped["GP"].size().index,
+            "Weighted_GP": weighted_gp,
+            "GP_Median": median_gp,
+            "GP_Variance": variance_gp,
+            "Durability_Composite": durability_composite,
+            "Durability_Penalty": stability_penalty,
+            "Seasons_Weighted": seasons_weighted,
+            "Seasons_Total": total_seasons,
+            "Seasons_Used": seasons_used.to_numpy(),
+        }
+    )
+
+
+def durability_from_windows(
+    gp: np.ndarray,
+    weights: Sequence[float] = AVAILABILITY_WEIGHTS,
+    penalty_factor: float = DURABILITY_PENALTY_FACTOR,
+) -> dict:
+    """:func:`build_availability_metrics` over dense, newest-first GP windows.
+
+    ``gp`` has shape ``(..., seasons)`` with NaN where the player has no row
+    for a season; any leading axes (players, target seasons) are batched. As
+    in the grouped version, weights go to a player's present seasons in
+    recency order, and median/variance cover every present season in the
+    window. Rows with no present season come back NaN.
+    """
+
+    base_weights = np.asarray(weights, dtype=float)
+    present = ~np.isnan(gp)
+    recency = np.cumsum(present, axis=-1) - 1
+    considered = present & (recency < base_weights.size)
+    total_seasons = present.sum(axis=-1)
+    seasons_weighted = np.minimum(total_seasons, base_weights.size)
+
+    row_weights = np.where(considered, base_weights[np.minimum(recency, base_weights.size - 1)], 0.0)
+    weight_sum = row_weights.sum(axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        row_norm = np.where(
+            weight_sum == 0,
+            np.where(considered, 1.0 / seasons_weighted[..., None], 0.0),
+            row_weights / np.where(weight_sum == 0, 1.0, weight_sum),
+        )
+        weighted_gp = np.where(total_seasons > 0, np.nansum(gp * row_norm, axis=-1), np.nan)
+        mean_gp = np.nansum(gp, axis=-1) / total_seasons
+        variance_gp = np.nansum((gp - mean_gp[..., None]) ** 2, axis=-1) / total_seasons
+        median_gp = _nanmedian(gp, present)
+
+    stability_penalty = variance_gp * penalty_factor
+    anchor = weighted_gp * WEIGHTED_GP_SHARE + median_gp * MEDIAN_GP_SHARE
+    return {
+        "Weighted_GP": weighted_gp,
+        "GP_Median": median_gp,
+        "GP_Variance": variance_gp,
+        "Durability_Composite": np.maximum(anchor - stability_penalty, 0.0),
+        "Durability_Penalty": stability_penalty,
+        "Seasons_Total": total_seasons,
+    }
+
+
+def _nanmedian(values: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Median over the last axis ignoring NaN, without nanmedian's all-NaN warnings."""
+
+    counts = present.sum(axis=-1)
+    ordered = np.sort(np.where(present, values, np.inf), axis=-1)  # NaNs pushed to the end
+    low = np.take_along_axis(ordered, np.maximum((counts - 1) // 2, 0)[..., None], axis=-1)[..., 0]
+    high = np.take_along_axis(ordered, np.maximum(counts // 2, 0)[..., None], axis=-1)[..., 0]
+    with np.errstate(invalid="ignore"):
+        return np.where(counts > 0, (low + high) / 2, np.nan)
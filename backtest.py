@@ -0,0 +1,358 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from availability import (
+    AVAILABILITY_WEIGHTS,
+    DURABILITY_PENALTY_FACTOR,
+    MEDIAN_GP_SHARE,
+    WEIGHTED_GP_SHARE,
+    durability_from_windows,
+)
+from cache import CACHE
+from nba_pull import DEFAULT_SEASON, SEASON_STORE_DIR, pull_totals, season_completed
+
+FIRST_TARGET_SEASON = "2010-11"
+DEFAULT_PENALTIES = (0.0, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2)
+WEIGHT_GRID_STEP = 0.1
+BACKTEST_WORKERS = int(os.environ.get("IRONMAN_BACKTEST_WORKERS", "0")) or (os.cpu_count() or 1)
+
+
+def season_label(start_year: int) -> str:
+    return f"{start_year}-{(start_year + 1) % 100:02d}"
+
+
+def season_range(first: str, last: str) -> list[str]:
+    """Inclusive list of season labels from ``first`` to ``last``, oldest first."""
+
+    return [season_label(year) for year in range(int(first[:4]), int(last[:4]) + 1)]
+
+
+def last_completed_season() -> str:
+    year = int(DEFAULT_SEASON[:4])
+    while not season_completed(season_label(year)):
+        year -= 1
+    return season_label(year)
+
+
+@dataclass
+class History:
+    """Dense player x season GP matrix (oldest season first, NaN = no row)."""
+
+    seasons: list[str]
+    player_ids: np.ndarray
+    gp: np.ndarray
+
+    @classmethod
+    def from_totals(cls, totals: pd.DataFrame, seasons: Sequence[str]) -> "History":
+        frame = totals[["PLAYER_ID", "SEASON_ID", "GP"]].dropna(subset=["PLAYER_ID"])
+        frame = frame.assign(GP=pd.to_numeric(frame["GP"], errors="coerce"))
+        # A traded player can have several rows in one season; they sum to the player's season GP.
+        matrix = frame.pivot_table(index="PLAYER_ID", columns="SEASON_ID", values="GP", aggfunc="sum")
+        matrix = matrix.reindex(columns=list(seasons))
+        return cls(list(seasons), matrix.index.to_numpy(), matrix.to_numpy(dtype=float))
+
+    def windows(self, targets: Sequence[str], window: int) -> tuple[np.ndarray, np.ndarray]:
+        """Newest-first GP for the ``window`` seasons before each target, plus target GP.
+
+        Returns ``(history, actual)`` shaped ``(targets, players, window)`` and
+        ``(targets, players)``.
+        """
+
+        position = {season: pos for pos, season in enumerate(self.seasons)}
+        target_idx = np.array([position[season] for season in targets])
+        if (target_idx < window).any():
+            raise ValueError(f"need {window} seasons of history before {targets[0]}")
+        offsets = np.arange(1, window + 1)  # 1 = the season just before the target
+        history = self.gp[:, target_idx[:, None] - offsets[None, :]]  # (players, targets, window)
+        return history.transpose(1, 0, 2), self.gp[:, target_idx].T
+
+
+def load_history(
+    first_target: str = FIRST_TARGET_SEASON,
+    last_target: str | None = None,
+    window: int = len(AVAILABILITY_WEIGHTS),
+    store_dir: str | None = SEASON_STORE_DIR,
+) -> tuple[History, list[str]]:
+    """Pull (or read from the season store) every season the backtest needs."""
+
+    last_target = last_target or last_completed_season()
+    targets = season_range(first_target, last_target)
+    first_history = season_label(int(first_target[:4]) - window)
+    seasons = season_range(first_history, last_target)
+    totals = pull_totals(seasons, store_dir=store_dir)
+    return History.from_totals(totals, seasons), targets
+
+
+def group_ranks(values: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Average-tie ranks (1-based) of ``values`` within each integer group."""
+
+    order = np.lexsort((values, groups))
+    ordered, ordered_groups = values[order], groups[order]
+    n = len(values)
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = ordered_groups[1:] != ordered_groups[:-1]
+    new_block = new_group.copy()
+    new_block[1:] |= ordered[1:] != ordered[:-1]
+    positions = np.arange(n)
+    within = positions - np.maximum.accumulate(np.where(new_group, positions, 0))
+    block = np.cumsum(new_block) - 1
+    mean_position = np.bincount(block, weights=within) / np.bincount(block)
+    ranks = np.empty(n)
+    ranks[order] = mean_position[block] + 1
+    return ranks
+
+
+def _centered_ranks(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    ranks = group_ranks(values, groups)
+    counts = np.bincount(groups, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return ranks - (np.bincount(groups, weights=ranks, minlength=n_groups) / counts)[groups]
+
+
+def _rank_correlation(x: np.ndarray, y: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """Pearson correlation of group-centered ranks, one value per group."""
+
+    covariance = np.bincount(groups, weights=x * y, minlength=n_groups)
+    spread = np.bincount(groups, weights=x * x, minlength=n_groups) * np.bincount(
+        groups, weights=y * y, minlength=n_groups
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return covariance / np.sqrt(spread)
+
+
+def spearman(pred: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """Row-wise Spearman rank correlation over the entries valid in both inputs.
+
+    Ranks every row at once: valid entries are flattened, ranked within their
+    row by :func:`group_ranks`, and the Pearson sums are ``np.bincount`` calls.
+    """
+
+    rows = pred.shape[0]
+    row_idx, col_idx = np.nonzero(~np.isnan(pred) & ~np.isnan(actual))
+    x = _centered_ranks(pred[row_idx, col_idx], row_idx, rows)
+    y = _centered_ranks(actual[row_idx, col_idx], row_idx, rows)
+    return _rank_correlation(x, y, row_idx, rows)
+
+
+def errors(pred: np.ndarray, actual: np.ndarray) -> Dict[str, np.ndarray]:
+    """Row-wise player count, MAE and RMSE over entries valid in both inputs."""
+
+    diff = pred - actual
+    valid = ~np.isnan(diff)
+    n = valid.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "players": n,
+            "mae": np.nansum(np.abs(diff), axis=-1) / n,
+            "rmse": np.sqrt(np.nansum(diff * diff, axis=-1) / n),
+        }
+
+
+def evaluate(
+    history: np.ndarray,
+    actual: np.ndarray,
+    weights: Sequence[float] = AVAILABILITY_WEIGHTS,
+    penalty_factor: float = DURABILITY_PENALTY_FACTOR,
+) -> Dict[str, np.ndarray]:
+    """Per-target-season scores of ``Durability_Composite`` against actual GP.
+
+    Only players who have at least one season in the window and a row in the
+    target season count: stats.nba.com has no row for a player who missed
+    the whole season, so full-season absences are not in the sample.
+    """
+
+    composite = durability_from_windows(history, weights, penalty_factor)["Durability_Composite"]
+    composite = np.where(np.isnan(actual), np.nan, composite)
+    return {"spearman": spearman(composite, actual), **errors(composite, actual)}
+
+
+def _pooled(scores: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """Season-averaged correlation; player-weighted MAE/RMSE across all seasons."""
+
+    n = scores["players"]
+    total = n.sum()
+    return {
+        "spearman": float(np.nanmean(scores["spearman"])),
+        "spearman_min": float(np.nanmin(scores["spearman"])),
+        "mae": float(np.nansum(scores["mae"] * n) / total),
+        "rmse": float(np.sqrt(np.nansum(scores["rmse"] ** 2 * n) / total)),
+        "players": int(total),
+    }
+
+
+def weight_grid(seasons: int, step: float = WEIGHT_GRID_STEP) -> list[tuple[float, ...]]:
+    """Every newest-first weight vector of length ``seasons`` on a ``step`` grid summing to 1."""
+
+    units = int(round(1 / step))
+    return [
+        tuple(round(part * step, 10) for part in combo)
+        for combo in itertools.product(range(units + 1), repeat=seasons)
+        if sum(combo) == units
+    ]
+
+
+# Sweep inputs shared with worker processes, set once per process by _init_worker.
+_SHARED: Dict[str, np.ndarray] = {}
+
+
+def _init_worker(history: np.ndarray, actual: np.ndarray) -> None:
+    """Keep only the (target, player) cells that can be scored, and rank actual GP once.
+
+    Which cells are scorable (some history and a target-season row) does not
+    depend on the weights or penalty, so every configuration works on the
+    same compact arrays.
+    """
+
+    scorable = ~np.isnan(history).all(axis=-1) & ~np.isnan(actual)
+    targets, players = np.nonzero(scorable)
+    _SHARED["windows"] = history[targets, players]
+    _SHARED["actual"] = actual[targets, players]
+    _SHARED["targets"] = targets
+    _SHARED["n_targets"] = np.asarray(actual.shape[0])
+    _SHARED["actual_ranks"] = _centered_ranks(_SHARED["actual"], targets, actual.shape[0])
+
+
+def _sweep_weights(weights: tuple, penalties: Sequence[float]) -> List[Dict[str, float]]:
+    """Score one weight vector under every penalty factor.
+
+    The penalty only scales the variance term, so the weighted/median anchor
+    and the variance are computed once and broadcast over ``penalties``;
+    every (penalty, target season) pair is then one group in a single ranking.
+    """
+
+    windows, actual, targets = _SHARED["windows"], _SHARED["actual"], _SHARED["targets"]
+    n_targets = int(_SHARED["n_targets"])
+    parts = durability_from_windows(windows, weights, 0.0)
+    anchor = parts["Weighted_GP"] * WEIGHTED_GP_SHARE + parts["GP_Median"] * MEDIAN_GP_SHARE
+    factors = np.asarray(penalties, dtype=float)[:, None]
+    composite = np.maximum(anchor[None] - parts["GP_Variance"][None] * factors, 0.0)
+
+    n_groups = len(penalties) * n_targets
+    groups = (np.arange(len(penalties))[:, None] * n_targets + targets[None]).ravel()
+    x = _centered_ranks(composite.ravel(), groups, n_groups)
+    y = np.tile(_SHARED["actual_ranks"], len(penalties))
+    rho = _rank_correlation(x, y, groups, n_groups).reshape(len(penalties), n_targets)
+    diff = (composite - actual[None]).ravel()
+    n = np.bincount(groups, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mae = (np.bincount(groups, weights=np.abs(diff), minlength=n_groups) / n).reshape(rho.shape)
+        rmse = np.sqrt(np.bincount(groups, weights=diff * diff, minlength=n_groups) / n).reshape(rho.shape)
+    counts = n.reshape(rho.shape)
+    label = ",".join(f"{w:g}" for w in weights)
+    return [
+        {
+            "weights": label,
+            "penalty": penalty,
+            **_pooled({"spearman": rho[pos], "mae": mae[pos], "rmse": rmse[pos], "players": counts[pos]}),
+        }
+        for pos, penalty in enumerate(penalties)
+    ]
+
+
+def sweep(
+    history: np.ndarray,
+    actual: np.ndarray,
+    weight_sets: Sequence[tuple],
+    penalties: Sequence[float] = DEFAULT_PENALTIES,
+    workers: int = BACKTEST_WORKERS,
+) -> pd.DataFrame:
+    """Score every (weights, penalty) pair; best mean Spearman first."""
+
+    workers = max(1, min(int(workers), len(weight_sets)))
+    if workers == 1:
+        _init_worker(history, actual)
+        results = [_sweep_weights(weights, penalties) for weights in weight_sets]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(history, actual)) as pool:
+            chunk = max(1, len(weight_sets) // (workers * 4))
+            results = list(
+                pool.map(_sweep_weights, weight_sets, itertools.repeat(penalties), chunksize=chunk)
+            )
+    frame = pd.DataFrame([row for rows in results for row in rows])
+    return frame.sort_values(["spearman", "mae"], ascending=[False, True], kind="stable").reset_index(
+        drop=True
+    )
+
+
+def _floats(text: str) -> tuple[float, ...]:
+    return tuple(float(part) for part in text.split(",") if part.strip())
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Backtest Durability_Composite against next-season games played."
+    )
+    parser.add_argument("--first-target", default=FIRST_TARGET_SEASON, help="First season to predict.")
+    parser.add_argument("--last-target", help="Last season to predict (default: last completed).")
+    parser.add_argument("--window", type=int, default=len(AVAILABILITY_WEIGHTS), help="Seasons of history.")
+    parser.add_argument("--weights", type=_floats, default=AVAILABILITY_WEIGHTS, help="Newest-first, e.g. 0.6,0.3,0.1")
+    parser.add_argument("--penalty", type=float, default=DURABILITY_PENALTY_FACTOR)
+    parser.add_argument("--sweep", action="store_true", help="Grid-search weights and penalty factors.")
+    parser.add_argument("--step", type=float, default=WEIGHT_GRID_STEP, help="Weight grid step for --sweep.")
+    parser.add_argument("--penalties", type=_floats, default=DEFAULT_PENALTIES, help="Penalty factors for --sweep.")
+    parser.add_argument("--workers", type=int, default=BACKTEST_WORKERS)
+    parser.add_argument("--top", type=int, default=15, help="Sweep rows to print.")
+    parser.add_argument("--out", help="Write the per-season table (or full sweep) to this CSV.")
+    parser.add_argument("--offline", action="store_true", help="Only use cached/stored NBA seasons.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(argv)
+    CACHE.offline = args.offline
+    started = time.perf_counter()
+    history, targets = load_history(args.first_target, args.last_target, args.window)
+    windows, actual = history.windows(targets, args.window)
+    print(
+        f"Loaded {len(history.player_ids)} players over {len(history.seasons)} seasons "
+        f"({history.seasons[0]}..{history.seasons[-1]}) in {time.perf_counter() - started:.2f}s."
+    )
+
+    if args.sweep:
+        weight_sets = weight_grid(args.window, args.step)
+        started = time.perf_counter()
+        table = sweep(windows, actual, weight_sets, args.penalties, args.workers)
+        print(
+            f"Scored {len(table)} configurations over {len(targets)} target seasons "
+            f"in {time.perf_counter() - started:.2f}s."
+        )
+        current = ",".join(f"{w:g}" for w in AVAILABILITY_WEIGHTS)
+        is_current = (table["weights"] == current) & np.isclose(table["penalty"], DURABILITY_PENALTY_FACTOR)
+        if is_current.any():
+            print(f"Current settings ({current} / {DURABILITY_PENALTY_FACTOR}) rank #{int(np.flatnonzero(is_current)[0]) + 1}.")
+        print(table.head(args.top).to_string(float_format=lambda value: f"{value:.4f}"))
+    else:
+        scores = evaluate(windows, actual, args.weights, args.penalty)
+        naive = {"spearman": spearman(windows[..., 0], actual), **errors(windows[..., 0], actual)}
+        table = pd.DataFrame(
+            {
+                "target": targets,
+                "players": scores["players"],
+                "spearman": scores["spearman"],
+                "mae": scores["mae"],
+                "rmse": scores["rmse"],
+                "last_gp_spearman": naive["spearman"],
+                "last_gp_mae": naive["mae"],
+            }
+        )
+        print(table.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+        summary = _pooled(scores)
+        print(
+            f"Overall: mean Spearman {summary['spearman']:.3f} (worst {summary['spearman_min']:.3f}), "
+            f"MAE {summary['mae']:.2f} GP, RMSE {summary['rmse']:.2f} GP over {summary['players']} player-seasons."
+        )
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"Wrote {args.out}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+import argparse
+import json
+import math
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import pandas as pd
+
+from availability import AVAILABILITY_WEIGHTS, DURABILITY_PENALTY_FACTOR, build_availability_metrics
+from cache import CACHE
+from compact import LOW_MEMORY
+from ironman import GOOD_IRONMAN_WEIGHTS, IRONMAN_WEIGHTS, VALUE_COLUMNS, compute
+from metrics import HISTORY_PATH, METRICS, process_age_s
+from nba_pull import DEFAULT_SEASON
+from run_pipeline import (
+    COMBINED_FETCH,
+    OUTPUT_COLUMNS,
+    RECENT_SEASON_COUNT,
+    bearer,
+    input_graph,
+    merge_inputs,
+    recent_seasons,
+    start_run,
+)
+from yfs import configure_logging, log
+
+BATCH_WORKERS = int(os.environ.get("IRONMAN_BATCH_WORKERS", "0")) or (os.cpu_count() or 1)
+
+# League category names -> ironman.Z_COLUMNS entries.
+CATEGORY_COLUMNS = {
+    "PTS": "PTS_PG",
+    "REB": "REB_PG",
+    "AST": "AST_PG",
+    "STL": "STL_PG",
+    "BLK": "BLK_PG",
+    "FG3M": "FG3M_PG",
+    "3PTM": "FG3M_PG",
+    "FG_PCT": "FG_PCT",
+    "FT_PCT": "FT_PCT",
+    "FG3_PCT": "FG3_PCT",
+    "TOV": "TOV_PG_NEG",
+    "DD2": "DD2_PG",
+}
+_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+@dataclass
+class LeagueConfig:
+    """One league's scoring settings; defaults reproduce ``run_pipeline.py``.
+
+    Built from a JSON object by :meth:`from_dict`. Only ``name`` (the output
+    file stem) is required; ``seasons``, ``availability_weights`` and
+    ``penalty_factor`` shape the availability metrics, ``ironman_weights`` and
+    ``good_weights`` partially override the ironman defaults, ``categories``
+    picks what ValueZ averages, and ``teams`` x ``roster_size`` limits the
+    z-score pool to that many best-ADP players.
+
+    Weights must be non-negative and ``availability_weights`` needs one entry
+    per season. Each ironman weight set is rescaled after the overrides so
+    its parts other than ``absence`` sum to 1, as the defaults do; scores from
+    different leagues are then on the same scale.
+    """
+
+    name: str
+    seasons: int = RECENT_SEASON_COUNT
+    availability_weights: tuple = AVAILABILITY_WEIGHTS
+    penalty_factor: float = DURABILITY_PENALTY_FACTOR
+    ironman_weights: Dict[str, float] = field(default_factory=lambda: dict(IRONMAN_WEIGHTS))
+    good_weights: Dict[str, float] = field(default_factory=lambda: dict(GOOD_IRONMAN_WEIGHTS))
+    value_columns: List[str] = field(default_factory=lambda: list(VALUE_COLUMNS))
+    pool_size: int | None = None
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "LeagueConfig":
+        raw = dict(raw)
+        name = str(raw.pop("name", ""))
+        if not _NAME.match(name):
+            raise ValueError(f"league name {name!r} must be letters, digits, '-' or '_'")
+        config = cls(name)
+        if "seasons" in raw:
+            config.seasons = int(raw.pop("seasons"))
+            if config.seasons < 1:
+                raise ValueError(f"{name}: seasons must be at least 1")
+        if "availability_weights" in raw:
+            config.availability_weights = tuple(float(w) for w in raw.pop("availability_weights"))
+            if any(w < 0 for w in config.availability_weights):
+                raise ValueError(f"{name}: availability_weights must not be negative")
+        if len(config.availability_weights) != config.seasons:
+            raise ValueError(
+                f"{name}: availability_weights has {len(config.availability_weights)} entries "
+                f"for {config.seasons} seasons; give one weight per season"
+            )
+        if "penalty_factor" in raw:
+            config.penalty_factor = float(raw.pop("penalty_factor"))
+        for key in ("ironman_weights", "good_weights"):
+            overrides = raw.pop(key, {})
+            weights = getattr(config, key)
+            unknown = set(overrides) - set(weights)
+            if unknown:
+                raise ValueError(f"{name}: unknown {key} {sorted(unknown)}; expected {sorted(weights)}")
+            weights.update({part: float(value) for part, value in overrides.items()})
+            setattr(config, key, _normalized(name, key, weights))
+        if "categories" in raw:
+            categories = [str(cat).upper() for cat in raw.pop("categories")]
+            unknown = [cat for cat in categories if cat not in CATEGORY_COLUMNS]
+            if unknown or not categories:
+                raise ValueError(f"{name}: unknown categories {unknown}; expected {sorted(CATEGORY_COLUMNS)}")
+            config.value_columns = list(dict.fromkeys(CATEGORY_COLUMNS[cat] for cat in categories))
+        teams, roster_size = raw.pop("teams", None), raw.pop("roster_size", 13)
+        if teams is not None:
+            config.pool_size = int(teams) * int(roster_size)
+        if raw:
+            raise ValueError(f"{name}: unknown keys {sorted(raw)}")
+        return config
+
+
+def _normalized(name: str, key: str, weights: Dict[str, float]) -> Dict[str, float]:
+    """Scale ``weights`` so the parts besides ``absence`` (a share of durability) sum to 1."""
+
+    negative = sorted(part for part, value in weights.items() if value < 0)
+    if negative:
+        raise ValueError(f"{name}: {key} {negative} must not be negative")
+    if weights.get("absence", 0.0) > weights["durability"]:
+        raise ValueError(f"{name}: {key} absence is a share of durability and cannot exceed it")
+    total = sum(value for part, value in weights.items() if part != "absence")
+    if total <= 0:
+        raise ValueError(f"{name}: {key} must not all be zero")
+    if math.isclose(total, 1.0):
+        return weights  # already a unit blend; dividing would only add rounding noise
+    return {part: value / total for part, value in weights.items()}
+
+
+def load_leagues(path: str | Path) -> List[LeagueConfig]:
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(raw, dict):
+        raw = raw.get("leagues", [])
+    leagues = [LeagueConfig.from_dict(entry) for entry in raw]
+    names = [league.name for league in leagues]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate league names: {duplicates}")
+    if not leagues:
+        raise ValueError("no leagues configured")
+    return leagues
+
+
+def score_league(
+    league: LeagueConfig,
+    nba_totals: pd.DataFrame,
+    link_df: pd.DataFrame,
+    yahoo_players: pd.DataFrame,
+    nba_latest: pd.DataFrame,
+    draft: pd.DataFrame,
+) -> pd.DataFrame:
+    """Availability, merge and scoring for one league over the shared inputs.
+
+    Players whose latest NBA row falls outside the league's season window are
+    dropped, as they would be in a single-league run with that window.
+    """
+
+    seasons = recent_seasons(DEFAULT_SEASON, league.seasons)
+    in_window = nba_totals["SEASON_ID"].isin(seasons)
+    availability = build_availability_metrics(
+        nba_totals[in_window], league.availability_weights, league.penalty_factor
+    )
+    merged = merge_inputs(link_df, yahoo_players, nba_latest, draft, availability)
+    merged = merged[merged["SEASON_ID"].isin(seasons)]
+    if league.pool_size is not None and "ADP" in merged.columns:
+        merged = merged.sort_values("ADP", na_position="last", kind="stable").head(league.pool_size)
+    return compute(merged, league.ironman_weights, league.good_weights, league.value_columns)
+
+
+# Shared inputs for worker processes, set once per worker by _init_worker so
+# each league task only pickles its small config.
+_SHARED: Dict[str, pd.DataFrame] = {}
+
+
+def _init_worker(shared: Dict[str, pd.DataFrame]) -> None:
+    _SHARED.update(shared)
+
+
+def _run_league(league: LeagueConfig, out_dir: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    scored = score_league(league, **_SHARED)
+    target = Path(out_dir) / f"{league.name}.csv"
+    tmp = target.with_name(target.name + ".tmp")
+    scored[OUTPUT_COLUMNS].to_csv(tmp, index=False, encoding="utf-8-sig")
+    os.replace(tmp, target)
+    return {
+        "league": league.name,
+        "path": str(target),
+        "rows": len(scored),
+        "wall_s": round(time.perf_counter() - started, 4),
+    }
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Score many leagues from one Yahoo/NBA data pull.")
+    parser.add_argument("leagues", help="JSON file with a list of league configs.")
+    parser.add_argument("--out-dir", default="leagues", help="Directory for the per-league CSVs.")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Worker processes.")
+    parser.add_argument("--offline", action="store_true", help="Replay responses from the local cache.")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the response cache and checkpoints.")
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        default=LOW_MEMORY,
+        help="Share compact NBA totals (categorical labels, int16 GP, float32 stats) with the workers.",
+    )
+    parser.add_argument(
+        "--combined-fetch",
+        action="store_true",
+        default=COMBINED_FETCH,
+        help="Fetch draft analysis with each player page instead of separately.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    startup_s = process_age_s()
+    args = parse_args(argv)
+    configure_logging()
+    try:
+        leagues = load_leagues(args.leagues)
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"{args.leagues}: {exc}") from exc
+    stages = start_run(args)
+    print(f"Starting batch run for {len(leagues)} leagues...")
+    log.info("Starting batch run for %d leagues (offline=%s)", len(leagues), args.offline)
+    if not args.offline:
+        bearer()
+
+    season_list = recent_seasons(DEFAULT_SEASON, max(league.seasons for league in leagues))
+    inputs = input_graph(stages, season_list, args.low_memory, combined=args.combined_fetch).run()
+    yahoo_players, draft, nba_latest, link_df = (
+        inputs[step] for step in ("players", "draft", "nba_latest", "links")
+    )
+    nba_totals = inputs["nba"][0]
+    print(f"Matched {len(link_df)} Yahoo players to NBA stats.")
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    shared = {
+        "nba_totals": nba_totals,
+        "link_df": link_df,
+        "yahoo_players": yahoo_players,
+        "nba_latest": nba_latest,
+        "draft": draft,
+    }
+    workers = max(1, min(int(args.workers), len(leagues)))
+    print(f"Scoring {len(leagues)} leagues across {workers} processes...")
+    with METRICS.stage("leagues") as record:
+        record.rows_in = len(link_df)
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(shared,)) as pool:
+            futures = [pool.submit(_run_league, league, str(out_dir)) for league in leagues]
+            results = []
+            for future in futures:
+                result = future.result()
+                results.append(result)
+                print(f"  {result['league']:<24} {result['rows']:>5} rows -> {result['path']}")
+                log.info("League %s: %d rows in %.3fs", result["league"], result["rows"], result["wall_s"])
+        record.rows_out = sum(result["rows"] for result in results)
+
+    CACHE.evict()
+    report_path = out_dir / "batch.metrics.json"
+    METRICS.write(report_path, HISTORY_PATH, args=vars(args), startup_s=startup_s, leagues=results)
+    print(f"Wrote {len(results)} league files to {out_dir}/. Run report: {report_path}")
+    log.info("Batch run complete")
+
+
+if __name__ == "__main__":
+    main()
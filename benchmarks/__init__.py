@@ -0,0 +1 @@
+"""Offline benchmarks: stand-in server, synthetic data, fixtures and stage timings."""
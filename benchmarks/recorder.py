@@ -0,0 +1,170 @@
+"""Turn a real ``.http_cache`` into anonymized response fixtures, and load them back.
+
+Recording re-renders every cached Yahoo/NBA response in the minimal shape the
+pipeline reads, with real identities replaced: player keys and NBA ids are
+renumbered and names become generated pseudonyms. NBA names that normalize to
+the same string as a Yahoo name (see ``match.norm``) get the same pseudonym, so
+the fixtures keep their matching behaviour.
+
+    python -m benchmarks.recorder --cache .http_cache --out benchmarks/fixtures
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import GAME_KEY, Universe, pseudonym
+from cache import ResponseCache
+from extract import DRAFT_SCHEMA, draft_columns, game_key, player_columns
+from match import norm
+
+NBA_PARAMS = {"per_mode_detailed": "Totals", "season_type_all_star": "Regular Season"}
+_START = re.compile(r"players;start=(\d+)")
+
+
+def _season_for_key(key: str, first_year: int = 1990, last_year: int = 2040) -> str | None:
+    for year in range(first_year, last_year):
+        season = f"{year}-{(year + 1) % 100:02d}"
+        params = {"season": season, **NBA_PARAMS}
+        if ResponseCache.key("nba", "leaguedashplayerstats", params) == key:
+            return season
+    return None
+
+
+def read_cache(cache_dir: str | Path) -> Tuple[pd.DataFrame, Dict[str, dict], Dict[str, pd.DataFrame]]:
+    """Collect Yahoo players, draft analysis and NBA seasons from a response cache."""
+
+    players = {"player_key": [], "name_full": [], "team": [], "pos": []}
+    pages: List[Tuple[int, dict]] = []
+    draft = {"player_key": [], **{col: [] for col in DRAFT_SCHEMA}}
+    nba: Dict[str, pd.DataFrame] = {}
+    for file in sorted(Path(cache_dir).glob("*/*.json")):
+        entry = json.loads(file.read_text(encoding="utf-8"))
+        body, path = entry.get("body"), entry.get("path", "")
+        if entry.get("namespace") == "nba":
+            season = _season_for_key(file.stem)
+            if season is not None:
+                nba[season] = pd.DataFrame(body["data"], columns=body["columns"])
+        elif "/draft_analysis" in path:
+            draft_columns(body, draft)
+        elif "/players;start=" in path:
+            match = _START.search(path)
+            pages.append((int(match.group(1)) if match else 0, body))
+    for _, body in sorted(pages, key=lambda item: item[0]):
+        player_columns(body, players)
+    yahoo = pd.DataFrame(players).drop_duplicates("player_key")
+    draft_by_key = {
+        key: {DRAFT_SCHEMA[col]: draft[col][pos] for col in DRAFT_SCHEMA}
+        for pos, key in enumerate(draft["player_key"])
+    }
+    return yahoo, draft_by_key, dict(sorted(nba.items(), reverse=True))
+
+
+def anonymize(
+    yahoo: pd.DataFrame,
+    draft: Dict[str, dict],
+    nba: Dict[str, pd.DataFrame],
+    seed: int = 0,
+) -> Universe:
+    rng = np.random.default_rng(seed)
+    aliases: Dict[str, str] = {}
+    used = set()
+
+    def alias(name: str) -> str:
+        key = norm(name)
+        if key not in aliases:
+            while True:
+                fake = pseudonym(rng)
+                if fake not in used:
+                    break
+            used.add(fake)
+            aliases[key] = fake
+        return aliases[key]
+
+    new_keys = {key: f"{GAME_KEY}.p.{3000 + pos}" for pos, key in enumerate(yahoo["player_key"])}
+    anon_yahoo = yahoo.assign(
+        player_key=yahoo["player_key"].map(new_keys),
+        name_full=yahoo["name_full"].map(alias),
+    )
+    anon_draft = {new_keys[key]: values for key, values in draft.items() if key in new_keys}
+
+    ids: Dict[int, int] = {}
+    anon_nba = {}
+    for season, frame in nba.items():
+        frame = frame.copy()
+        frame["PLAYER_ID"] = [ids.setdefault(pid, 1_620_000 + len(ids)) for pid in frame["PLAYER_ID"]]
+        frame["PLAYER_NAME"] = frame["PLAYER_NAME"].map(alias)
+        anon_nba[season] = frame
+    return Universe(yahoo=anon_yahoo.reset_index(drop=True), draft=anon_draft, nba=anon_nba)
+
+
+def write_fixtures(universe: Universe, out_dir: str | Path, page_size: int = 25, draft_batch: int = 20) -> List[Path]:
+    """Write one JSON file per response, paged/batched like the pipeline requests them."""
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    written = []
+
+    def dump(name: str, body: dict) -> None:
+        target = out / name
+        target.write_text(json.dumps(body, separators=(",", ":")), encoding="utf-8")
+        written.append(target)
+
+    dump("game.json", universe.game_body())
+    for start in range(0, len(universe.yahoo) + 1, page_size):
+        dump(f"players_{start:05d}.json", universe.players_body(start, page_size))
+    keys = universe.yahoo["player_key"].tolist()
+    for pos in range(0, len(keys), draft_batch):
+        dump(f"draft_{pos // draft_batch:04d}.json", universe.draft_body(keys[pos : pos + draft_batch]))
+    for season in universe.nba:
+        dump(f"nba_{season}.json", universe.nba_body(season))
+    return written
+
+
+def load_fixtures(fixture_dir: str | Path) -> Universe:
+    """Rebuild a :class:`Universe` from fixture files so the stand-in can replay them."""
+
+    root = Path(fixture_dir)
+    game = json.loads((root / "game.json").read_text(encoding="utf-8"))
+    players = {"player_key": [], "name_full": [], "team": [], "pos": []}
+    for file in sorted(root.glob("players_*.json")):
+        player_columns(json.loads(file.read_text(encoding="utf-8")), players)
+    draft = {"player_key": [], **{col: [] for col in DRAFT_SCHEMA}}
+    for file in sorted(root.glob("draft_*.json")):
+        draft_columns(json.loads(file.read_text(encoding="utf-8")), draft)
+    nba = {}
+    for file in sorted(root.glob("nba_*.json"), reverse=True):
+        body = json.loads(file.read_text(encoding="utf-8"))["resultSets"][0]
+        nba[file.stem[len("nba_") :]] = pd.DataFrame(body["rowSet"], columns=body["headers"])
+    draft_by_key = {
+        key: {DRAFT_SCHEMA[col]: draft[col][pos] for col in DRAFT_SCHEMA}
+        for pos, key in enumerate(draft["player_key"])
+    }
+    return Universe(
+        yahoo=pd.DataFrame(players),
+        draft=draft_by_key,
+        nba=nba,
+        game_key=game_key(game) or GAME_KEY,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record anonymized fixtures from a response cache.")
+    parser.add_argument("--cache", default=".http_cache", help="Response cache directory to read.")
+    parser.add_argument("--out", default=str(Path(__file__).parent / "fixtures"))
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated pseudonyms.")
+    args = parser.parse_args()
+    yahoo, draft, nba = read_cache(args.cache)
+    if yahoo.empty or not nba:
+        raise SystemExit(f"{args.cache} has no Yahoo player pages or NBA seasons to record")
+    written = write_fixtures(anonymize(yahoo, draft, nba, args.seed), args.out)
+    print(f"Wrote {len(written)} fixtures for {len(yahoo)} players, {len(nba)} seasons to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
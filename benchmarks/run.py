@@ -0,0 +1,254 @@
+"""Time every pipeline stage against the local stand-in and compare with a baseline.
+
+    python -m benchmarks.run                         # compare with benchmarks/baseline.json
+    python -m benchmarks.run --players 2000 --seasons 5 --latency-ms 40
+    python -m benchmarks.run --fail-401 0.02 --fail-429 0.02
+    python -m benchmarks.run --fixtures benchmarks/fixtures
+    python -m benchmarks.run --save-baseline         # after an intentional change
+
+Everything runs in a scratch directory with the response cache, checkpoints
+and season store disabled, so each stage does its full work every repeat.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.standin import Faults, StandIn
+from benchmarks.synthetic import Universe
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+STAGES = [
+    "get_all_players",
+    "get_draft",
+    "get_players_with_draft",
+    "pull_totals",
+    "build_availability_metrics",
+    "gp_projections",
+    "load_game_logs",
+    "absence_metrics",
+    "match",
+    "compute",
+    "live_pick",
+]
+# A stage regresses when its median is this much slower than the baseline and
+# at least MIN_REGRESSION_SECONDS slower in absolute terms (filters timer noise).
+REGRESSION_TOLERANCE = 0.25
+MIN_REGRESSION_SECONDS = 0.005
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the Iron-Man pipeline stages offline.")
+    parser.add_argument("--players", type=int, default=600)
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures", help="Replay a recorded fixture directory instead of synthetic data.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the median is reported.")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--fail-401", type=float, default=0.0)
+    parser.add_argument("--fail-429", type=float, default=0.0)
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run.")
+    parser.add_argument("--out", help="Also write this run's report to a JSON file.")
+    parser.add_argument(
+        "--fail-on-regression", action="store_true", help="Exit 1 when any stage regresses."
+    )
+    return parser.parse_args(argv)
+
+
+def _prepare_environment(workdir: Path, client_env: Dict[str, str]) -> None:
+    os.environ.update(client_env)
+    os.environ.setdefault("YH_CLIENT_ID", "benchmark")
+    os.environ.setdefault("YH_CLIENT_SECRET", "benchmark")
+    token_path = workdir / "oauth2.json"
+    token_path.write_text(json.dumps({"access_token": "standin-0", "refresh_token": "standin-refresh"}))
+    os.environ["YH_TOKEN_PATH"] = str(token_path)
+    os.environ["IRONMAN_CACHE_DIR"] = str(workdir / ".http_cache")
+    os.environ["IRONMAN_CHECKPOINT_DIR"] = str(workdir / ".checkpoints")
+    os.environ["IRONMAN_CROSSWALK"] = str(workdir / "player_crosswalk.csv")
+    os.chdir(workdir)  # relative outputs (stores, logs) stay in the scratch directory
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> tuple[Any, List[float]]:
+    timings = []
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def run_stages(universe: Universe, faults: Faults, repeat: int) -> Dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix="ironman-bench-"))
+    with StandIn(universe, faults) as standin:
+        _prepare_environment(workdir, standin.configure_clients())
+        import match
+        import run_pipeline
+        import yfs
+        from cache import CACHE
+        from gamelogs import absence_metrics, load_game_logs
+        from ironman import compute
+        from live import LiveBoard
+        from nba_pull import pull_totals
+        from projection import gp_projections
+
+        # In case yfs was imported before the environment pointed at the stand-in.
+        yfs.BASE = os.environ["YH_API_BASE"]
+        yfs.TOKEN_URL = os.environ["YH_TOKEN_URL"]
+        yfs.TOKENS = yfs.TokenManager(os.environ["YH_TOKEN_PATH"])
+        CACHE.enabled = False
+
+        seasons = list(universe.nba)
+        stages: Dict[str, Dict[str, Any]] = {}
+
+        def record(name: str, fn: Callable[[], Any], rows_in: int) -> Any:
+            result, timings = _time(fn, repeat)
+            # load_game_logs returns (players, schedule); count the player rows.
+            counted = result[0] if isinstance(result, tuple) else result
+            rows_out = len(counted) if hasattr(counted, "__len__") else None
+            stages[name] = {
+                "median_s": statistics.median(timings),
+                "min_s": min(timings),
+                "max_s": max(timings),
+                "runs": len(timings),
+                "rows_in": rows_in,
+                "rows_out": rows_out,
+            }
+            print(f"  {name:<28} {statistics.median(timings) * 1000:9.1f} ms  ({rows_in} -> {rows_out} rows)")
+            return result
+
+        gamekey = run_pipeline.get_gamekey()
+        print(f"Benchmarking {len(universe.yahoo)} players, {len(seasons)} seasons, {repeat} runs per stage:")
+        # Walk the roster as a run with an earlier players checkpoint does.
+        roster = len(universe.yahoo)
+        players = record(
+            "get_all_players",
+            lambda: run_pipeline.get_all_players(gamekey, expected=roster),
+            roster,
+        )
+        draft = record("get_draft", lambda: run_pipeline.get_draft(players), len(players))
+        record(
+            "get_players_with_draft",
+            lambda: run_pipeline.get_players_with_draft(gamekey, expected=roster)[1],
+            roster,
+        )
+        totals = record("pull_totals", lambda: pull_totals(seasons, store_dir=None), len(seasons))
+        availability = record(
+            "build_availability_metrics",
+            lambda: run_pipeline.build_availability_metrics(totals),
+            len(totals),
+        )
+        record("gp_projections", lambda: gp_projections(availability), len(availability))
+        game_logs, schedule = record(
+            "load_game_logs", lambda: load_game_logs(seasons, store_dir=None), len(seasons)
+        )
+        record("absence_metrics", lambda: absence_metrics(game_logs, schedule), len(game_logs))
+        latest = run_pipeline.latest_rows(totals)
+        links = record("match", lambda: match.match(players, latest), len(players))
+        link_df = run_pipeline.player_links(links, latest)
+        merged = run_pipeline.merge_inputs(link_df, players, latest, draft, availability)
+        scored = record("compute", lambda: compute(merged), len(merged))
+        board = LiveBoard(scored)
+        picks = iter(scored["player_key"].tolist())
+        record("live_pick", lambda: board.remove([next(picks)]) and board.scores()[0], len(scored))
+
+        http = dict(standin.counts)
+        http["token_refreshes"] = yfs.TOKENS.refreshes
+    return {"stages": stages, "http": http}
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Print a per-stage comparison and return the names of regressed stages."""
+
+    regressed = []
+    print(f"\n{'stage':<28} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for name in STAGES:
+        now = report["stages"].get(name)
+        then = baseline.get("stages", {}).get(name)
+        if now is None or then is None:
+            continue
+        ratio = now["median_s"] / then["median_s"] if then["median_s"] else float("inf")
+        slow = (
+            ratio > 1 + REGRESSION_TOLERANCE
+            and now["median_s"] - then["median_s"] > MIN_REGRESSION_SECONDS
+        )
+        flag = "  REGRESSION" if slow else ""
+        print(
+            f"{name:<28} {then['median_s'] * 1000:8.1f}ms {now['median_s'] * 1000:8.1f}ms {ratio:6.2f}x{flag}"
+        )
+        if slow:
+            regressed.append(name)
+    shape = lambda config: {key: value for key, value in (config or {}).items() if key != "repeat"}
+    if shape(baseline.get("config")) != shape(report.get("config")):
+        print("note: baseline was recorded with a different configuration:", baseline.get("config"))
+    return regressed
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(argv)
+    repo = Path(__file__).resolve().parent.parent
+    if str(repo) not in sys.path:
+        sys.path.insert(0, str(repo))
+    if args.fixtures:
+        from benchmarks.recorder import load_fixtures
+
+        universe = load_fixtures(Path(args.fixtures).resolve())
+    else:
+        universe = Universe.generate(players=args.players, seasons=args.seasons, seed=args.seed)
+    faults = Faults(args.latency_ms, args.jitter_ms, args.fail_401, args.fail_429, seed=args.seed)
+    baseline_path = Path(args.baseline).resolve()
+    out_path = Path(args.out).resolve() if args.out else None
+
+    result = run_stages(universe, faults, args.repeat)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "players": len(universe.yahoo),
+            "seasons": len(universe.nba),
+            "fixtures": bool(args.fixtures),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "fail_401": args.fail_401,
+            "fail_429": args.fail_429,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        **result,
+    }
+    print(f"Stand-in traffic: {report['http']}")
+
+    if out_path is not None:
+        out_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    regressed: List[str] = []
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Saved baseline to {baseline_path}")
+    elif baseline_path.exists():
+        regressed = compare(report, json.loads(baseline_path.read_text(encoding="utf-8")))
+    else:
+        print(f"No baseline at {baseline_path}; run with --save-baseline to record one.")
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,235 @@
+"""Local stand-in for the Yahoo Fantasy API, its token endpoint and stats.nba.com.
+
+Serves the endpoints the pipeline calls from a :class:`~benchmarks.synthetic.Universe`
+with configurable latency and injected 401/429 responses:
+
+    GET  /fantasy/v2/game/nba
+    GET  /fantasy/v2/game/{key}/players;start={n};count={m}[/draft_analysis]
+    GET  /fantasy/v2/players;player_keys={k1,k2,...}/draft_analysis
+    GET  /fantasy/v2/league/{key}/draftresults   (a draft in ADP order, one pick per ``pick_seconds``)
+    POST /oauth2/get_token
+    GET  /stats/leaguedashplayerstats?Season=2024-25&...
+    GET  /stats/playergamelogs?Season=2024-25&...   (and /stats/leaguegamelog)
+
+Point the pipeline at it with ``YH_API_BASE``/``YH_TOKEN_URL`` and
+``NBAStatsHTTP.base_url`` (see :meth:`StandIn.configure_clients`).
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from benchmarks.synthetic import Universe
+
+_PLAYERS = re.compile(r"^/fantasy/v2/game/[^/]+/players;start=(\d+);count=(\d+)(/draft_analysis)?$")
+_DRAFT = re.compile(r"^/fantasy/v2/players;player_keys=([^/]+)/draft_analysis$")
+_DRAFT_RESULTS = re.compile(r"^/fantasy/v2/league/[^/]+/draftresults$")
+
+
+@dataclass
+class Faults:
+    """Latency and error injection for Yahoo requests (NBA requests get latency only)."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    rate_401: float = 0.0
+    rate_429: float = 0.0
+    retry_after: int = 1
+    seed: int = 0
+
+
+class StandIn:
+    """Threaded local HTTP server; ``counts`` tallies requests by kind and status.
+
+    The simulated draft starts with the first ``draftresults`` request and
+    makes one pick every ``pick_seconds``.
+    """
+
+    def __init__(
+        self,
+        universe: Universe,
+        faults: Optional[Faults] = None,
+        port: int = 0,
+        pick_seconds: float = 1.0,
+    ) -> None:
+        self.universe = universe
+        self.faults = faults or Faults()
+        self.pick_seconds = pick_seconds
+        self._draft_started: Optional[float] = None
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(self.faults.seed)
+        self._token_serial = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandIn":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "StandIn":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def configure_clients(self) -> Dict[str, str]:
+        """Environment for ``yfs`` (set before import) and patch nba_api's base URL."""
+
+        from nba_api.stats.library.http import NBAStatsHTTP
+
+        NBAStatsHTTP.base_url = f"{self.url}/stats/{{endpoint}}"
+        return {"YH_API_BASE": f"{self.url}/fantasy/v2", "YH_TOKEN_URL": f"{self.url}/oauth2/get_token"}
+
+    def _count(self, kind: str) -> None:
+        with self._lock:
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+
+    def _roll(self) -> Tuple[float, float]:
+        with self._lock:
+            return float(self._rng.random()), float(self._rng.random())
+
+    def _delay(self) -> None:
+        faults = self.faults
+        if faults.latency_ms or faults.jitter_ms:
+            jitter = self._roll()[0] * faults.jitter_ms
+            time.sleep((faults.latency_ms + jitter) / 1000.0)
+
+    def _fault(self) -> Optional[Tuple[int, Dict[str, str]]]:
+        fail_401, fail_429 = self._roll()
+        if fail_401 < self.faults.rate_401:
+            return 401, {}
+        if fail_429 < self.faults.rate_429:
+            return 429, {"Retry-After": str(self.faults.retry_after)}
+        return None
+
+    def route(self, method: str, raw_path: str) -> Tuple[int, Any, Dict[str, str]]:
+        parts = urlsplit(raw_path)
+        path = unquote(parts.path)
+        universe = self.universe
+        if method == "POST" and path == "/oauth2/get_token":
+            with self._lock:
+                self._token_serial += 1
+                serial = self._token_serial
+            self._count("token")
+            return 200, {"access_token": f"standin-{serial}", "refresh_token": "standin-refresh", "expires_in": 3600}, {}
+
+        if path.startswith("/stats/"):
+            endpoint = path[len("/stats/"):].lower()
+            season = parse_qs(parts.query).get("Season", [""])[0]
+            self._delay()
+            self._count("nba")
+            if endpoint == "leaguedashplayerstats":
+                return 200, universe.nba_body(season), {}
+            if endpoint in ("playergamelogs", "leaguegamelog"):
+                return 200, universe.game_log_body(endpoint, season), {}
+            return 404, {"error": "not found"}, {}
+
+        if not path.startswith("/fantasy/v2/"):
+            return 404, {"error": "not found"}, {}
+        self._delay()
+        fault = self._fault()
+        if fault is not None:
+            self._count(f"yahoo_{fault[0]}")
+            return fault[0], {"error": {"description": "injected"}}, fault[1]
+
+        self._count("yahoo")
+        if path == "/fantasy/v2/game/nba":
+            return 200, universe.game_body(), {}
+        match = _PLAYERS.match(path)
+        if match:
+            body = universe.players_body(int(match.group(1)), int(match.group(2)), bool(match.group(3)))
+            return 200, body, {}
+        match = _DRAFT.match(path)
+        if match:
+            return 200, universe.draft_body(match.group(1).split(",")), {}
+        if _DRAFT_RESULTS.match(path):
+            with self._lock:
+                if self._draft_started is None:
+                    self._draft_started = time.monotonic()
+                elapsed = time.monotonic() - self._draft_started
+            picks = int(elapsed / self.pick_seconds) if self.pick_seconds > 0 else len(universe.yahoo)
+            return 200, universe.draftresults_body(picks), {}
+        return 404, {"error": "not found"}, {}
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, method: str) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                status, body, headers = standin.route(method, self.path)
+                payload = json.dumps(body, separators=(",", ":")).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self) -> None:
+                self._reply("GET")
+
+            def do_POST(self) -> None:
+                self._reply("POST")
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the local Yahoo/NBA stand-in server.")
+    parser.add_argument("--port", type=int, default=8077)
+    parser.add_argument("--players", type=int, default=600)
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--fixtures", help="Replay a recorded fixture directory instead of synthetic data.")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--fail-401", type=float, default=0.0, help="Share of Yahoo calls answered 401.")
+    parser.add_argument("--fail-429", type=float, default=0.0, help="Share of Yahoo calls answered 429.")
+    parser.add_argument("--pick-seconds", type=float, default=1.0, help="Seconds between simulated draft picks.")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        from benchmarks.recorder import load_fixtures
+
+        universe = load_fixtures(args.fixtures)
+    else:
+        universe = Universe.generate(players=args.players, seasons=args.seasons)
+    faults = Faults(args.latency_ms, args.jitter_ms, args.fail_401, args.fail_429)
+    standin = StandIn(universe, faults, port=args.port, pick_seconds=args.pick_seconds)
+    print(f"Stand-in serving {len(universe.yahoo)} players on {standin.url}")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
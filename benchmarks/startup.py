@@ -0,0 +1,127 @@
+"""Measure how long the entry points take to start, in fresh interpreters.
+
+    python -m benchmarks.startup                      # median of 5 cold starts per probe
+    python -m benchmarks.startup --budget 0.1 --fail-over-budget
+    python -m benchmarks.startup --top 15             # heaviest imports (python -X importtime)
+
+Every probe runs with the Yahoo credentials removed from the environment,
+which also shows that importing the pipeline does not need secrets. The
+pipeline modules import numpy and pandas at the top, so no entry point can
+start faster than ``import numpy, pandas`` (about 0.4s of the 0.45s
+``import run_pipeline`` takes). Probes are therefore budgeted on what they
+add over that floor, timed in the same rounds, which holds on fast and slow
+machines alike. A probe fails when its median overhead exceeds the budget.
+The ``import run_pipeline`` probe also fails if it pulls in a module that
+only network fetches or fuzzy matching need (:data:`DEFERRED_MODULES`).
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+REPO = Path(__file__).resolve().parent.parent
+# Seconds an entry point may add on top of FLOOR_PROBE.
+STARTUP_BUDGET_S = float(os.environ.get("IRONMAN_STARTUP_BUDGET", "0.12"))
+# Loaded on first use only: stats.nba.com fetches, Yahoo HTTP and fuzzy matching.
+DEFERRED_MODULES = ("nba_api", "requests", "rapidfuzz")
+FLOOR_PROBE = "import numpy, pandas"
+PROBES = {
+    "python": ["-c", "pass"],
+    FLOOR_PROBE: ["-c", FLOOR_PROBE],
+    "import run_pipeline": ["-c", "import run_pipeline"],
+    "import batch": ["-c", "import batch"],
+    "run_pipeline.py --help": ["run_pipeline.py", "--help"],
+}
+_LOADED = (
+    "import sys, run_pipeline; "
+    f"print(','.join(sorted({{m.split('.')[0] for m in sys.modules}} & set({DEFERRED_MODULES!r}))))"
+)
+
+
+def _environment() -> Dict[str, str]:
+    env = {key: value for key, value in os.environ.items() if not key.startswith("YH_CLIENT_")}
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def _run(args: List[str]) -> tuple[float, str]:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *args], cwd=REPO, env=_environment(), capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr.strip()}")
+    return elapsed, result.stdout
+
+
+def heaviest_imports(top: int) -> List[tuple[int, str]]:
+    """Top ``top`` modules by cumulative import time (microseconds) for ``import run_pipeline``."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import run_pipeline"],
+        cwd=REPO,
+        env=_environment(),
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Time cold starts of the pipeline entry points.")
+    parser.add_argument("--repeat", type=int, default=5, help="Cold starts per probe; the median is reported.")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=STARTUP_BUDGET_S,
+        help=f"Seconds each entry point may add over '{FLOOR_PROBE}'.",
+    )
+    parser.add_argument("--top", type=int, default=0, help="Also list the N heaviest imports.")
+    parser.add_argument("--fail-over-budget", action="store_true", help="Exit 1 when any probe fails.")
+    args = parser.parse_args(argv)
+
+    # Round-robin, so drift in machine load hits the floor and the probes alike.
+    timings: Dict[str, List[float]] = {name: [] for name in PROBES}
+    for _ in range(max(1, args.repeat)):
+        for name, probe in PROBES.items():
+            timings[name].append(_run(probe)[0])
+    floor = statistics.median(timings[FLOOR_PROBE])
+
+    failed = []
+    print(f"{'probe':<26} {'median':>8} {'min':>8} {'+floor':>8}  (budget +{args.budget:.2f}s)")
+    for name, runs in timings.items():
+        median = statistics.median(runs)
+        entry = name not in ("python", FLOOR_PROBE)
+        over = entry and median - floor > args.budget
+        added = f"{median - floor:>+7.3f}s" if entry else f"{'':>8}"
+        print(f"{name:<26} {median:>7.3f}s {min(runs):>7.3f}s {added}{'  OVER BUDGET' if over else ''}")
+        if over:
+            failed.append(name)
+
+    loaded = _run(["-c", _LOADED])[1].strip()
+    if loaded:
+        print(f"import run_pipeline loaded deferred modules: {loaded}")
+        failed.append("deferred imports")
+    else:
+        print(f"import run_pipeline defers {', '.join(DEFERRED_MODULES)}.")
+
+    if args.top:
+        print(f"\n{'cumulative':>10}  module")
+        for micros, module in heaviest_imports(args.top):
+            print(f"{micros / 1000:>8.1f}ms {module}")
+    return 1 if failed and args.fail_over_budget else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
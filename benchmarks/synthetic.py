@@ -0,0 +1,343 @@
+"""Synthetic Yahoo/NBA data that scales to any player and season count.
+
+A :class:`Universe` is one consistent league: the Yahoo player list, Yahoo
+draft analysis and per-season NBA totals all describe the same people, so the
+full pipeline (including name matching) can run against it. The same seed
+always produces the same universe.
+"""
+
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+GAME_KEY = "466"
+TEAMS = [
+    "ATL", "BOS", "BKN", "CHA", "CHI", "CLE", "DAL", "DEN", "DET", "GSW",
+    "HOU", "IND", "LAC", "LAL", "MEM", "MIA", "MIL", "MIN", "NOP", "NYK",
+    "OKC", "ORL", "PHI", "PHX", "POR", "SAC", "SAS", "TOR", "UTA", "WAS",
+]
+POSITIONS = ["PG", "SG", "SF", "PF", "C", "PG,SG", "SG,SF", "SF,PF", "PF,C", "G", "F"]
+_SYLLABLES = [
+    "an", "bel", "cor", "da", "el", "fin", "gor", "ha", "is", "jo", "ka", "lu",
+    "mar", "ne", "os", "pa", "qui", "ro", "sa", "tu", "ul", "va", "wen", "xa",
+    "yo", "zel", "bri", "ce", "dro", "fa",
+]
+_ACCENTS = str.maketrans({"a": "á", "c": "č", "e": "é", "o": "ö", "u": "ū"})
+NBA_COLUMNS = [
+    "PLAYER_ID", "PLAYER_NAME", "TEAM_ID", "TEAM_ABBREVIATION", "AGE", "GP", "MIN",
+    "FGM", "FGA", "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA", "FT_PCT",
+    "REB", "AST", "TOV", "STL", "BLK", "PTS", "DD2",
+]
+TEAM_GAMES = 82
+SEASON_DAYS = 170
+
+
+def _word(rng: np.random.Generator, low: int, high: int) -> str:
+    parts = rng.choice(_SYLLABLES, size=int(rng.integers(low, high + 1)))
+    return "".join(parts).capitalize()
+
+
+def pseudonym(rng: np.random.Generator) -> str:
+    return f"{_word(rng, 1, 2)} {_word(rng, 2, 3)}"
+
+
+def season_labels(latest: str, count: int) -> List[str]:
+    start = int(latest[:4])
+    return [f"{year}-{(year + 1) % 100:02d}" for year in range(start, start - count, -1)]
+
+
+@dataclass
+class Universe:
+    """One synthetic league.
+
+    ``yahoo`` has ``player_key``/``name_full``/``team``/``pos``; ``draft``
+    maps player keys to their draft-analysis values; ``nba`` maps season
+    labels to frames with :data:`NBA_COLUMNS`.
+    """
+
+    yahoo: pd.DataFrame
+    draft: Dict[str, Dict[str, Optional[float]]]
+    nba: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    game_key: str = GAME_KEY
+
+    @classmethod
+    def generate(
+        cls,
+        players: int = 600,
+        seasons: int = 3,
+        latest: str = "2024-25",
+        seed: int = 0,
+        nba_only_share: float = 0.15,
+        name_noise: float = 0.1,
+    ) -> "Universe":
+        """Build ``players`` Yahoo players and ``seasons`` of NBA totals.
+
+        ``nba_only_share`` adds NBA rows with no Yahoo player, and
+        ``name_noise`` is the share of NBA names spelled differently from
+        Yahoo (accents, suffixes, a dropped letter) so matching has fuzzy work.
+        """
+
+        rng = np.random.default_rng(seed)
+        names: List[str] = []
+        seen = set()
+        total = players + int(players * nba_only_share)
+        while len(names) < total:
+            name = pseudonym(rng)
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+
+        yahoo_names = names[:players]
+        keys = [f"{GAME_KEY}.p.{3000 + i}" for i in range(players)]
+        yahoo = pd.DataFrame(
+            {
+                "player_key": keys,
+                "name_full": yahoo_names,
+                "team": rng.choice(TEAMS, size=players),
+                "pos": rng.choice(POSITIONS, size=players),
+            }
+        )
+
+        draft: Dict[str, Dict[str, Optional[float]]] = {}
+        picks = rng.permutation(players) + 1.0
+        for key, pick in zip(keys, picks.tolist()):
+            drafted = pick <= min(players, 180)
+            draft[key] = {
+                "average_pick": round(pick + rng.normal(0, 3), 1) if drafted else None,
+                "average_round": round(pick / 12 + 1, 1) if drafted else None,
+                "average_cost": round(max(1.0, 60 - pick / 3), 1) if drafted else None,
+                "percent_drafted": round(max(0.0, 1 - pick / 200), 2),
+                "preseason_average_pick": round(pick, 1) if drafted else None,
+                "preseason_average_round": round(pick / 12 + 1, 1) if drafted else None,
+                "preseason_average_cost": round(max(1.0, 62 - pick / 3), 1) if drafted else None,
+                "preseason_percent_drafted": round(max(0.0, 1 - pick / 190), 2),
+            }
+
+        nba_names = list(names)
+        for pos in np.flatnonzero(rng.random(total) < name_noise).tolist():
+            name = nba_names[pos]
+            kind = pos % 3
+            if kind == 0:
+                nba_names[pos] = name.translate(_ACCENTS)
+            elif kind == 1:
+                nba_names[pos] = f"{name} Jr."
+            else:
+                first, last = name.split(" ", 1)
+                nba_names[pos] = f"{first} {last[:-1]}"
+
+        ids = np.arange(total) + 1_620_000
+        skill = rng.uniform(0.2, 1.0, size=total)
+        nba: Dict[str, pd.DataFrame] = {}
+        for age_offset, season in enumerate(season_labels(latest, seasons)):
+            present = rng.random(total) > 0.08 * (age_offset + 1)
+            n = int(present.sum())
+            gp = rng.integers(0, 83, size=n)
+            mpg = rng.uniform(8, 37, size=n) * skill[present]
+            fga = np.round(gp * mpg * rng.uniform(0.3, 0.55, size=n))
+            fg3a = np.round(fga * rng.uniform(0.1, 0.5, size=n))
+            fta = np.round(fga * rng.uniform(0.1, 0.4, size=n))
+            frame = pd.DataFrame(
+                {
+                    "PLAYER_ID": ids[present],
+                    "PLAYER_NAME": np.asarray(nba_names, dtype=object)[present],
+                    "TEAM_ID": rng.integers(1_610_612_737, 1_610_612_767, size=n),
+                    "TEAM_ABBREVIATION": rng.choice(TEAMS, size=n),
+                    "AGE": rng.integers(19, 38, size=n).astype(float),
+                    "GP": gp,
+                    "MIN": np.round(gp * mpg, 1),
+                    "FGM": np.round(fga * rng.uniform(0.38, 0.6, size=n)),
+                    "FGA": fga,
+                    "FG3M": np.round(fg3a * rng.uniform(0.25, 0.42, size=n)),
+                    "FG3A": fg3a,
+                    "FTM": np.round(fta * rng.uniform(0.55, 0.92, size=n)),
+                    "FTA": fta,
+                    "REB": np.round(gp * mpg * rng.uniform(0.08, 0.35, size=n)),
+                    "AST": np.round(gp * mpg * rng.uniform(0.03, 0.3, size=n)),
+                    "TOV": np.round(gp * mpg * rng.uniform(0.02, 0.1, size=n)),
+                    "STL": np.round(gp * mpg * rng.uniform(0.01, 0.05, size=n)),
+                    "BLK": np.round(gp * mpg * rng.uniform(0.0, 0.06, size=n)),
+                    "DD2": np.round(gp * rng.uniform(0, 0.5, size=n) * skill[present]),
+                }
+            )
+            with np.errstate(invalid="ignore", divide="ignore"):
+                frame["FG_PCT"] = np.round(np.where(fga > 0, frame["FGM"] / fga, 0.0), 3)
+                frame["FG3_PCT"] = np.round(np.where(fg3a > 0, frame["FG3M"] / fg3a, 0.0), 3)
+                frame["FT_PCT"] = np.round(np.where(fta > 0, frame["FTM"] / fta, 0.0), 3)
+            frame["PTS"] = 2 * frame["FGM"] + frame["FG3M"] + frame["FTM"]
+            nba[season] = frame[NBA_COLUMNS]
+        return cls(yahoo=yahoo, draft=draft, nba=nba)
+
+    # -- Yahoo/NBA response bodies -------------------------------------------------
+
+    def game_body(self) -> Dict[str, Any]:
+        return {"fantasy_content": {"game": [{"game_key": self.game_key, "code": "nba"}]}}
+
+    def players_body(self, start: int, count: int, draft: bool = False) -> Dict[str, Any]:
+        """One ``/game/{key}/players`` page; ``draft`` adds the ``draft_analysis`` sub-resource."""
+
+        page = self.yahoo.iloc[start : start + count]
+        block: Dict[str, Any] = {}
+        for pos, row in enumerate(page.itertuples(index=False)):
+            entry: List[Any] = [
+                [
+                    {"player_key": row.player_key},
+                    {"name": {"full": row.name_full}},
+                    {"editorial_team_abbr": row.team},
+                    {"display_position": row.pos},
+                ]
+            ]
+            if draft:
+                entry.append({"draft_analysis": self._draft_entries(row.player_key)})
+            block[str(pos)] = {"player": entry}
+        block["count"] = len(page)
+        players = block if len(page) else []
+        return {"fantasy_content": {"game": [{"game_key": self.game_key}, {"players": players}]}}
+
+    def _draft_entries(self, key: str) -> List[Dict[str, str]]:
+        values = self.draft.get(key, {})
+        return [{name: "-" if value is None else str(value)} for name, value in values.items()]
+
+    def draft_body(self, keys: List[str]) -> Dict[str, Any]:
+        block: Dict[str, Any] = {}
+        for pos, key in enumerate(keys):
+            block[str(pos)] = {"player": [[{"player_key": key}], {"draft_analysis": self._draft_entries(key)}]}
+        block["count"] = len(keys)
+        return {"fantasy_content": {"players": block}}
+
+    def draftresults_body(self, picks: int, teams: int = 12) -> Dict[str, Any]:
+        """``/league/{key}/draftresults`` after ``picks`` picks, made in preseason ADP order."""
+
+        def adp(key: str) -> float:
+            value = self.draft.get(key, {}).get("preseason_average_pick")
+            return float("inf") if value is None else value
+
+        order = sorted(self.yahoo["player_key"], key=adp)[: max(0, picks)]
+        block: Dict[str, Any] = {}
+        for pos, key in enumerate(order):
+            block[str(pos)] = {
+                "draft_result": {
+                    "pick": pos + 1,
+                    "round": pos // teams + 1,
+                    "team_key": f"{self.game_key}.l.1.t.{pos % teams + 1}",
+                    "player_key": key,
+                }
+            }
+        block["count"] = len(order)
+        return {"fantasy_content": {"league": [{"league_key": f"{self.game_key}.l.1"}, {"draft_results": block}]}}
+
+    def nba_body(self, season: str) -> Dict[str, Any]:
+        """``leaguedashplayerstats`` JSON for ``season`` (falls back to the first season)."""
+
+        frame = self.nba.get(season)
+        if frame is None:
+            frame = next(iter(self.nba.values()))
+        rows = frame.astype(object).where(frame.notna(), None).values.tolist()
+        return {
+            "resource": "leaguedashplayerstats",
+            "parameters": {"Season": season},
+            "resultSets": [
+                {"name": "LeagueDashPlayerStats", "headers": list(frame.columns), "rowSet": rows}
+            ],
+        }
+
+    @cached_property
+    def _served_logs(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        return self.game_logs()
+
+    def game_log_body(self, endpoint: str, season: str) -> Dict[str, Any]:
+        """``playergamelogs`` or ``leaguegamelog`` JSON for ``season``, from :meth:`game_logs`.
+
+        Only the columns :mod:`gamelogs` reads are filled in; game ids and
+        dates are strings, as stats.nba.com sends them.
+        """
+
+        players, schedule = self._served_logs
+        year = int(season[:4])
+        if endpoint == "playergamelogs":
+            frame, name = players[players["SEASON"] == year], "PlayerGameLogs"
+            columns = {
+                "SEASON_YEAR": np.full(len(frame), season),
+                "PLAYER_ID": frame["PLAYER_ID"].to_numpy(),
+                "TEAM_ID": frame["TEAM_ID"].to_numpy(),
+            }
+        else:
+            frame, name = schedule[schedule["SEASON"] == year], "LeagueGameLog"
+            columns = {
+                "SEASON_ID": np.full(len(frame), f"2{year}"),
+                "TEAM_ID": frame["TEAM_ID"].to_numpy(),
+            }
+        columns["GAME_ID"] = np.char.zfill(frame["GAME_ID"].to_numpy().astype(str), 10)
+        days = frame["GAME_DAY"].to_numpy().astype("datetime64[D]")
+        columns["GAME_DATE"] = np.char.add(days.astype(str), "T00:00:00")
+        if "MIN" in frame.columns:
+            columns["MIN"] = frame["MIN"].to_numpy(dtype=float)
+        rows = pd.DataFrame(columns).astype(object).values.tolist()
+        return {
+            "resource": endpoint,
+            "parameters": {"Season": season},
+            "resultSets": [{"name": name, "headers": list(columns), "rowSet": rows}],
+        }
+
+    def game_logs(self, seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Player game logs and team schedules consistent with the season totals.
+
+        Returns frames shaped like :func:`gamelogs.load_game_logs` output. Each
+        team plays :data:`TEAM_GAMES` games over :data:`SEASON_DAYS` days (so
+        some fall on back-to-backs). A player appears in exactly ``GP`` of
+        their team's games, missing the rest as one long spell plus scattered
+        single games.
+        """
+
+        rng = np.random.default_rng(seed)
+        player_parts, schedule_parts = [], []
+        for season, frame in self.nba.items():
+            year = int(season[:4])
+            opener = (np.datetime64(f"{year}-10-22") - np.datetime64("1970-01-01")).astype(int)
+            team_ids = np.unique(frame["TEAM_ID"].to_numpy(dtype=np.int64))
+            days = np.sort(
+                np.argsort(rng.random((len(team_ids), SEASON_DAYS)), axis=1)[:, :TEAM_GAMES], axis=1
+            ) + opener
+            game_ids = (year % 100) * 1_000_000 + np.arange(days.size).reshape(days.shape)
+            schedule_parts.append(
+                pd.DataFrame(
+                    {
+                        "TEAM_ID": np.repeat(team_ids, TEAM_GAMES),
+                        "GAME_ID": game_ids.ravel(),
+                        "GAME_DAY": days.ravel().astype(np.int32),
+                        "SEASON": np.int16(year),
+                    }
+                )
+            )
+
+            team_pos = np.searchsorted(team_ids, frame["TEAM_ID"].to_numpy(dtype=np.int64))
+            gp = np.minimum(frame["GP"].to_numpy(dtype=np.int64), TEAM_GAMES)
+            missed = TEAM_GAMES - gp
+            spell = (missed * rng.uniform(0.3, 0.9, size=len(gp))).astype(np.int64)
+            spell_start = (rng.random(len(gp)) * (TEAM_GAMES - spell + 1)).astype(np.int64)
+            game = np.arange(TEAM_GAMES)
+            # Rank games by a priority: the spell first, then random single games.
+            priority = rng.random((len(gp), TEAM_GAMES))
+            in_spell = (game >= spell_start[:, None]) & (game < (spell_start + spell)[:, None])
+            priority[in_spell] -= 1.0
+            rank = np.argsort(np.argsort(priority, axis=1), axis=1)
+            played = rank >= missed[:, None]
+            rows, cols = np.nonzero(played)
+            player_parts.append(
+                pd.DataFrame(
+                    {
+                        "PLAYER_ID": frame["PLAYER_ID"].to_numpy(dtype=np.int64)[rows],
+                        "TEAM_ID": team_ids[team_pos[rows]],
+                        "GAME_ID": game_ids[team_pos[rows], cols],
+                        "GAME_DAY": days[team_pos[rows], cols].astype(np.int32),
+                        "MIN": rng.uniform(5, 40, size=len(rows)).astype(np.float32),
+                        "SEASON": np.int16(year),
+                    }
+                )
+            )
+        return (
+            pd.concat(player_parts, ignore_index=True),
+            pd.concat(schedule_parts, ignore_index=True),
+        )
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from metrics import METRICS
+
+log = logging.getLogger("yfs")
+
+CACHE_DIR = os.environ.get("IRONMAN_CACHE_DIR", ".http_cache")
+CACHE_MAX_BYTES = int(os.environ.get("IRONMAN_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+CACHE_MAX_AGE = int(os.environ.get("IRONMAN_CACHE_MAX_AGE", str(400 * 24 * 3600)))
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a response has never been cached."""
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache for decoded JSON responses.
+
+    Entries are keyed by a SHA-256 of ``(namespace, path, params)`` and stored
+    as ``<root>/<key[:2]>/<key>.json`` together with the time they were
+    written. Freshness is decided per lookup from the caller's TTL, so one
+    cache can hold long-lived NBA seasons next to short-lived ADP pulls. In
+    ``offline`` mode TTLs are ignored and a missing entry raises
+    :class:`CacheMiss` instead of touching the network.
+    """
+
+    def __init__(
+        self,
+        root: str = CACHE_DIR,
+        max_bytes: int = CACHE_MAX_BYTES,
+        max_age: int = CACHE_MAX_AGE,
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.enabled = True
+        self.offline = False
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(namespace: str, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        raw = json.dumps([namespace, path, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def load(self, key: str, ttl: Optional[float]) -> Optional[Any]:
+        target = self._file(key)
+        try:
+            with target.open("r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        age = time.time() - float(entry.get("stored_at", 0))
+        if not self.offline and ttl is not None and age > ttl:
+            return None
+        return entry.get("body")
+
+    def store(self, key: str, body: Any, namespace: str, path: str) -> None:
+        target = self._file(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{threading.get_ident()}.tmp")
+        entry = {"stored_at": time.time(), "namespace": namespace, "path": path, "body": body}
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump(entry, fh)
+        os.replace(tmp, target)
+
+    def fetch(
+        self,
+        namespace: str,
+        path: str,
+        params: Optional[Dict[str, Any]],
+        ttl: Optional[float],
+        loader: Callable[[], Any],
+    ) -> Any:
+        """Return a cached body for the request or call ``loader`` and store it."""
+
+        if not self.enabled:
+            return loader()
+        key = self.key(namespace, path, params)
+        body = self.load(key, ttl)
+        if body is not None:
+            with self._lock:
+                self.hits += 1
+            METRICS.count(f"cache.{namespace}.hits")
+            log.debug("Cache hit %s %s", namespace, path)
+            return body
+        with self._lock:
+            self.misses += 1
+        METRICS.count(f"cache.{namespace}.misses")
+        if self.offline:
+            raise CacheMiss(f"No cached response for {namespace} {path} {params or {}}")
+        body = loader()
+        self.store(key, body, namespace, path)
+        return body
+
+    def evict(self) -> int:
+        """Drop entries older than ``max_age`` then the oldest until under ``max_bytes``."""
+
+        if not self.root.exists():
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for file in self.root.glob("*/*.json"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                file.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, file))
+        total = sum(size for _, size, _ in entries)
+        for _, size, file in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            file.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        if removed:
+            log.info("Evicted %d cached responses from %s", removed, self.root)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "offline": self.offline}
+
+
+CACHE = ResponseCache()
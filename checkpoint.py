@@ -0,0 +1,139 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+log = logging.getLogger("yfs")
+
+CHECKPOINT_DIR = os.environ.get("IRONMAN_CHECKPOINT_DIR", ".checkpoints")
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable short hash of a stage's inputs (frames, strings, numbers, tuples)."""
+
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            digest.update(json.dumps([str(col) for col in part.columns]).encode("utf-8"))
+            digest.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        else:
+            digest.update(json.dumps(part, default=str, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class StageStore:
+    """Pickled per-stage outputs tagged with the fingerprint of their inputs.
+
+    Each stage keeps only its latest result: ``<root>/<stage>.pkl`` holds the
+    fingerprint, save time and value together, so a reader can never pair a
+    value with the wrong fingerprint.
+    """
+
+    def __init__(self, root: str = CHECKPOINT_DIR) -> None:
+        self.root = Path(root)
+
+    def _path(self, stage: str) -> Path:
+        return self.root / f"{stage}.pkl"
+
+    def _read(self, stage: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._path(stage).open("rb") as fh:
+                return pickle.load(fh)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def load(self, stage: str, fp: str, max_age: Optional[float] = None) -> Optional[Any]:
+        entry = self._read(stage)
+        if entry is None or entry.get("fingerprint") != fp:
+            return None
+        if max_age is not None and time.time() - entry.get("saved_at", 0) > max_age:
+            return None
+        return entry["value"]
+
+    def latest(self, stage: str) -> Optional[Dict[str, Any]]:
+        """Return the last saved entry regardless of fingerprint or age."""
+
+        return self._read(stage)
+
+    def save(self, stage: str, fp: str, value: Any) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        target = self._path(stage)
+        tmp = target.with_suffix(".tmp")
+        with tmp.open("wb") as fh:
+            pickle.dump({"fingerprint": fp, "saved_at": time.time(), "value": value}, fh)
+        os.replace(tmp, target)
+
+
+class FetchJournal:
+    """Append-only JSON-lines record of finished units of a multi-request fetch.
+
+    A crashed run leaves the journal behind; the next run replays the units it
+    already has and only requests the rest. The first line records the stage
+    fingerprint and creation time: a journal written for other inputs, or
+    older than ``max_age`` seconds (``0`` always, ``None`` never), is discarded
+    instead of replayed. Call :meth:`clear` once the fetch's stage checkpoint
+    has been written.
+    """
+
+    def __init__(self, path: str | Path, fp: str = "", max_age: float | None = None) -> None:
+        self.path = Path(path)
+        self.fp = fp
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Any] = {}
+        header: Optional[Dict[str, Any]] = None
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from an interrupted write
+                    if "key" in entry:
+                        self._entries[entry["key"]] = entry["value"]
+                    elif header is None:
+                        header = entry
+            stale = self._stale(header, max_age)
+            if stale:
+                log.info("Discarding %s (%s)", self.path, stale)
+                self._entries.clear()
+                self.path.unlink(missing_ok=True)
+            elif self._entries:
+                log.info("Resuming %s with %d journaled units", self.path, len(self._entries))
+
+    def _stale(self, header: Optional[Dict[str, Any]], max_age: float | None) -> str:
+        if header is None or header.get("fingerprint") != self.fp:
+            return "written for other inputs"
+        if max_age == 0:
+            return "fresh data requested"
+        if max_age is not None and time.time() - header.get("created_at", 0) > max_age:
+            return "older than its stage allows"
+        return ""
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._entries.get(key)
+
+    def record(self, key: str, value: Any) -> None:
+        line = json.dumps({"key": key, "value": value})
+        with self._lock:
+            self._entries[key] = value
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as fh:
+                if fh.tell() == 0:
+                    fh.write(json.dumps({"fingerprint": self.fp, "created_at": time.time()}) + "\n")
+                fh.write(line + "\n")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.path.unlink(missing_ok=True)
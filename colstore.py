@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+META_FILE = "meta.json"
+
+
+def _column_array(series: pd.Series) -> tuple[np.ndarray, str, np.ndarray | None]:
+    """Fixed-width array, kind and (for text with gaps) the missing-value mask."""
+
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        if series.isna().any() and pd.api.types.is_integer_dtype(series):
+            return series.astype("float64").to_numpy(), "num", None
+        return series.to_numpy(), "num", None
+    numeric = pd.to_numeric(series, errors="coerce")
+    if numeric.notna().sum() == series.notna().sum():
+        return numeric.astype("float64").to_numpy(), "num", None
+    # Unicode arrays have no null, so gaps are stored as "" plus a mask.
+    missing = series.isna().to_numpy()
+    values = np.asarray(series.fillna("").astype(str).to_numpy(), dtype=str)
+    return values, "str", missing if missing.any() else None
+
+
+def write_columns(directory: str | Path, df: pd.DataFrame) -> Path:
+    """Persist ``df`` as one ``.npy`` file per column plus a small manifest.
+
+    Fixed-width numpy arrays (including unicode text) can be memory-mapped
+    back by :func:`read_columns`, so the store never has to be parsed. Text
+    columns with missing values get a boolean mask alongside, so they read
+    back as missing rather than as empty strings. The
+    directory is written next to its final location and swapped in at the end
+    so readers never see a half-written store.
+    """
+
+    target = Path(directory)
+    staging = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    kinds = {}
+    masked = []
+    for position, col in enumerate(df.columns):
+        values, kind, missing = _column_array(df[col])
+        np.save(staging / f"{position}.npy", values, allow_pickle=False)
+        kinds[str(col)] = kind
+        if missing is not None:
+            np.save(staging / f"{position}.missing.npy", missing, allow_pickle=False)
+            masked.append(str(col))
+    meta = {
+        "columns": [str(col) for col in df.columns],
+        "kinds": kinds,
+        "missing": masked,
+        "rows": len(df),
+    }
+    with (staging / META_FILE).open("w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=2)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+    return target
+
+
+def has_columns(directory: str | Path) -> bool:
+    return (Path(directory) / META_FILE).is_file()
+
+
+def read_columns(directory: str | Path, mmap: bool = True) -> pd.DataFrame:
+    """Load a store written by :func:`write_columns`, memory-mapping each column."""
+
+    source = Path(directory)
+    with (source / META_FILE).open("r", encoding="utf-8") as fh:
+        meta = json.load(fh)
+    # Stores written before masks existed saved every gap as "".
+    masked = meta.get("missing")
+    data = {}
+    for position, col in enumerate(meta["columns"]):
+        values = np.load(source / f"{position}.npy", mmap_mode="r" if mmap else None)
+        if meta["kinds"][col] == "str":
+            values = values.astype(object)
+            if masked is None:
+                values[values == ""] = None
+            elif col in masked:
+                values[np.load(source / f"{position}.missing.npy")] = None
+        data[col] = values
+    return pd.DataFrame(data, columns=meta["columns"], copy=False)
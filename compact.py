@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+LOW_MEMORY = os.environ.get("IRONMAN_LOW_MEMORY", "").lower() in ("1", "true", "yes")
+
+# Repeated labels stored once as categories plus small integer codes.
+CATEGORY_COLUMNS = ("SEASON_ID", "TEAM_ABBREVIATION", "team", "pos", "Seasons_Used")
+# Game and season counts; int16 whenever the column has no missing values.
+COUNT_COLUMNS = ("GP", "Seasons_Weighted", "Seasons_Total")
+# Identifiers and join keys keep their exact 64-bit values (float32 cannot hold
+# a 10-digit NBA team id).
+EXACT_COLUMNS = ("PLAYER_ID", "TEAM_ID", "nba_row_index", "SEASON_START_YEAR")
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return ``df`` with categorical labels, int16 counts and float32 rate stats.
+
+    Columns are converted one at a time, so the peak is one extra column
+    rather than a second frame. Already-compact columns pass through.
+    """
+
+    out = df.copy(deep=False)
+    for col in out.columns:
+        series = out[col]
+        if series.dtype == object and col not in CATEGORY_COLUMNS:
+            # Numbers that arrived as objects (e.g. concat with an empty season).
+            numeric = pd.to_numeric(series, errors="coerce")
+            if numeric.notna().sum() == series.notna().sum():
+                series = numeric.astype("float64")
+                out[col] = series
+        if col in CATEGORY_COLUMNS:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                out[col] = series.astype("category")
+        elif col in EXACT_COLUMNS:
+            if series.dtype == np.float64 and not series.isna().any():
+                out[col] = series.astype(np.int64)
+        elif col in COUNT_COLUMNS and pd.api.types.is_numeric_dtype(series):
+            values = series.to_numpy(dtype=float)
+            if not np.isnan(values).any() and (np.abs(values) < np.iinfo(np.int16).max).all():
+                out[col] = values.astype(np.int16)
+            else:
+                out[col] = values.astype(np.float32)
+        elif series.dtype == np.float64:
+            out[col] = series.astype(np.float32)
+    return out
+
+
+def frame_mb(df: pd.DataFrame) -> float:
+    """Deep memory footprint of ``df`` (including string payloads) in MiB."""
+
+    return round(float(df.memory_usage(deep=True, index=True).sum()) / (1024 * 1024), 3)
@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+try:  # optional: the CSV and JSON bundle do not need it
+    import pyarrow  # noqa: F401
+except ImportError:
+    pyarrow = None
+
+log = logging.getLogger("yfs")
+
+BUNDLE_VERSION = 1
+# Columns the table UI can sort by. Strings compare case-insensitively with
+# missing values as ""; numbers keep missing values last in both directions.
+SORT_COLUMNS = ["name_full", "team", "pos", "GP", "MPG", "ADP", "IronMan_Score", "Good_IronMan_Score"]
+FACET_COLUMNS = {"team": None, "pos": ","}
+
+
+def _round_half_up(value: float) -> float:
+    # Number.prototype.toFixed(1) semantics, which the UI uses for MPG.
+    return float(Decimal(value).quantize(Decimal("0.1"), rounding=ROUND_HALF_UP))
+
+
+def _with_mpg(df: pd.DataFrame) -> pd.DataFrame:
+    gp = pd.to_numeric(df["GP"], errors="coerce").fillna(0.0).tolist()
+    minutes = pd.to_numeric(df["MIN"], errors="coerce").fillna(0.0).tolist()
+    mpg = [_round_half_up(m / g) if g > 0 else 0.0 for g, m in zip(gp, minutes)]
+    return df.assign(MPG=mpg)
+
+
+def sort_orders(series: pd.Series) -> Dict[str, List[int]]:
+    """Stable ascending and descending row orders for one column.
+
+    Ties keep row order in both directions, matching ``Array.prototype.sort``
+    over the CSV rows.
+    """
+
+    if not pd.api.types.is_numeric_dtype(series):
+        # Accent-folded first so "Čančar" sorts with "C", as localeCompare does.
+        lowered = [str(value).lower() for value in series.fillna("").tolist()]
+        keys = [(unidecode(value), value) for value in lowered]
+        rows = range(len(keys))
+        return {
+            "asc": sorted(rows, key=keys.__getitem__),
+            "desc": sorted(rows, key=keys.__getitem__, reverse=True),
+        }
+    values = pd.to_numeric(series, errors="coerce").reset_index(drop=True)
+    orders = {}
+    for direction, ascending in (("asc", True), ("desc", False)):
+        ordered = values.sort_values(ascending=ascending, kind="stable", na_position="last")
+        orders[direction] = ordered.index.tolist()
+    return orders
+
+
+def facets(series: pd.Series, sep: str | None = None) -> Dict[str, List[int]]:
+    """Map each distinct value (each ``sep``-separated token) to its row ids."""
+
+    index: Dict[str, List[int]] = {}
+    for row, value in enumerate(series.tolist()):
+        if not isinstance(value, str) or not value:
+            continue
+        tokens = value.split(sep) if sep else [value]
+        for token in dict.fromkeys(token.strip() for token in tokens):
+            if token:
+                index.setdefault(token, []).append(row)
+    return dict(sorted(index.items()))
+
+
+def _json_column(series: pd.Series) -> List[Any]:
+    if pd.api.types.is_integer_dtype(series) and not series.isna().any():
+        return series.astype("int64").tolist()
+    if pd.api.types.is_numeric_dtype(series):
+        values = series.astype(float).to_numpy()
+        return [None if np.isnan(v) else v for v in values.tolist()]
+    return [None if pd.isna(v) else str(v) for v in series.tolist()]
+
+
+def build_bundle(df: pd.DataFrame) -> Dict[str, Any]:
+    """Columnar rows plus precomputed sort orders and facet indexes."""
+
+    frame = _with_mpg(df.reset_index(drop=True))
+    return {
+        "version": BUNDLE_VERSION,
+        "rows": len(frame),
+        "columns": {col: _json_column(frame[col]) for col in df.columns},
+        "orders": {col: sort_orders(frame[col]) for col in SORT_COLUMNS if col in frame.columns},
+        "facets": {
+            col: facets(frame[col], sep) for col, sep in FACET_COLUMNS.items() if col in frame.columns
+        },
+    }
+
+
+def _replace(tmp: Path, target: Path) -> Path:
+    os.replace(tmp, target)
+    return target
+
+
+def write_bundle(df: pd.DataFrame, path: str | Path) -> Path:
+    target = Path(path)
+    tmp = target.with_name(target.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        json.dump(build_bundle(df), fh, separators=(",", ":"), allow_nan=False)
+    return _replace(tmp, target)
+
+
+def write_columnar(df: pd.DataFrame, stem: str | Path) -> List[Path]:
+    """Write ``<stem>.parquet`` and ``<stem>.arrow`` (Arrow IPC / Feather v2).
+
+    Needs pyarrow; without it nothing is written and an empty list returned.
+    """
+
+    if pyarrow is None:
+        log.info("pyarrow not installed; skipping Parquet/Arrow rankings export")
+        return []
+    from pyarrow import feather
+
+    stem = Path(stem)
+    frame = df.reset_index(drop=True)
+    parquet = stem.with_suffix(".parquet")
+    arrow = stem.with_suffix(".arrow")
+    frame.to_parquet(parquet.with_name(parquet.name + ".tmp"), index=False, compression="zstd")
+    feather.write_feather(frame, arrow.with_name(arrow.name + ".tmp"), compression="zstd")
+    return [
+        _replace(parquet.with_name(parquet.name + ".tmp"), parquet),
+        _replace(arrow.with_name(arrow.name + ".tmp"), arrow),
+    ]
+
+
+def export_rankings(df: pd.DataFrame, stem: str | Path = "ironmen_rankings") -> List[Path]:
+    """Write the columnar files and the ``<stem>.index.json`` UI bundle."""
+
+    written = write_columnar(df, stem)
+    written.append(write_bundle(df, Path(f"{stem}.index.json")))
+    return written
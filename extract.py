@@ -1,8 +1,77 @@
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
 
 log = logging.getLogger("yfs")
 
+# Output column -> (Yahoo metadata key, nested key or None, keep first occurrence).
+PLAYER_SCHEMA: Dict[str, Tuple[str, Optional[str], bool]] = {
+    "player_key": ("player_key", None, False),
+    "name_full": ("name", "full", True),
+    "team": ("editorial_team_abbr", None, True),
+    "pos": ("display_position", None, True),
+}
+# Output column -> Yahoo draft_analysis key. Add fields here; parsing cost stays
+# one dict lookup per entry.
+DRAFT_SCHEMA: Dict[str, str] = {
+    "avg_pick": "average_pick",
+    "avg_round": "average_round",
+    "avg_cost": "average_cost",
+    "pct_drafted": "percent_drafted",
+    "pre_avg_pick": "preseason_average_pick",
+    "pre_avg_round": "preseason_average_round",
+    "pre_avg_cost": "preseason_average_cost",
+    "pre_pct_drafted": "preseason_percent_drafted",
+}
+
+PLAYER_COLUMNS = list(PLAYER_SCHEMA)
+DRAFT_COLUMNS = list(DRAFT_SCHEMA)
+_PLAYER_SLOTS = {
+    source: (slot, nested, first)
+    for slot, (source, nested, first) in enumerate(PLAYER_SCHEMA.values())
+}
+_DRAFT_SLOTS = {source: slot for slot, source in enumerate(DRAFT_SCHEMA.values())}
+
+
+def _num(val: Any) -> Optional[float]:
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return None
+
+
+def _scan_meta(items: Iterable[Any]) -> List[Optional[str]]:
+    values: List[Optional[str]] = [None] * len(PLAYER_COLUMNS)
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        for source, raw in item.items():
+            spec = _PLAYER_SLOTS.get(source)
+            if spec is None:
+                continue
+            slot, nested, first = spec
+            if nested is not None:
+                raw = raw.get(nested) if isinstance(raw, dict) else None
+                if raw is None:
+                    continue
+            if first and values[slot] is not None:
+                continue
+            values[slot] = raw
+    return values
+
+
+def _player_entries(block: Any) -> Iterable[list]:
+    if not isinstance(block, dict):
+        return
+    for value in block.values():
+        if isinstance(value, dict) and isinstance(value.get("player"), list):
+            yield value["player"]
+
+
+def empty_columns(columns: List[str]) -> Dict[str, list]:
+    return {col: [] for col in columns}
+
 
 def game_key(data: Dict[str, Any]) -> Optional[str]:
     try:
@@ -12,100 +81,157 @@ def game_key(data: Dict[str, Any]) -> Optional[str]:
         return None
 
 
-def players(data: Dict[str, Any]) -> List[Dict[str, Optional[str]]]:
-    out: List[Dict[str, Optional[str]]] = []
+def player_count(data: Dict[str, Any]) -> Optional[int]:
+    """Return the raw ``count`` Yahoo reports for a ``/players`` page."""
     try:
-        players_block = data["fantasy_content"]["game"][1]["players"]
-        for _, value in players_block.items():
-            if not isinstance(value, dict) or "player" not in value:
-                continue
-            arr = value["player"]
-            if not isinstance(arr, list):
-                continue
-            # Yahoo sometimes nests the payload inside another singleton list.
-            if arr and isinstance(arr[0], list):
-                arr = arr[0]
-            if not isinstance(arr, list):
-                continue
+        return int(data["fantasy_content"]["game"][1]["players"].get("count", 0))
+    except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+        return None
 
-            key = None
-            name = None
-            team = None
-            pos = None
-            for item in arr:
-                if not isinstance(item, dict):
-                    continue
-                if "player_key" in item:
-                    key = item.get("player_key")
-                name_block = item.get("name")
-                if isinstance(name_block, dict) and name is None:
-                    name = name_block.get("full")
-                if "editorial_team_abbr" in item and team is None:
-                    team = item.get("editorial_team_abbr")
-                if "display_position" in item and pos is None:
-                    pos = item.get("display_position")
-            if key and name:
-                out.append({
-                    "player_key": key,
-                    "name_full": name,
-                    "team": team,
-                    "pos": pos,
-                })
+
+def _players_block(data: Dict[str, Any]) -> Any:
+    content = data["fantasy_content"]
+    if "players" in content:
+        return content["players"]
+    return content["game"][1]["players"]
+
+
+def _split_entry(arr: list) -> Tuple[list, Optional[list]]:
+    """Metadata items and ``draft_analysis`` block (if requested) of one player entry."""
+
+    meta: Optional[list] = None
+    draft: Optional[list] = None
+    for item in arr:
+        if isinstance(item, list):
+            meta = item
+        elif isinstance(item, dict) and isinstance(item.get("draft_analysis"), list):
+            draft = item["draft_analysis"]
+    # A bare /players page lists the metadata items directly.
+    return (arr if meta is None else meta), draft
+
+
+def _scan_draft(block: list) -> List[Optional[float]]:
+    values: List[Optional[float]] = [None] * len(DRAFT_COLUMNS)
+    for entry in block:
+        if not isinstance(entry, dict):
+            continue
+        for source, raw in entry.items():
+            slot = _DRAFT_SLOTS.get(source)
+            if slot is not None:
+                values[slot] = _num(raw)
+    return values
+
+
+def _extract(
+    data: Dict[str, Any],
+    players_out: Optional[Dict[str, list]],
+    draft_out: Optional[Dict[str, list]],
+) -> None:
+    """Single pass over a players response, filling whichever column sets are given.
+
+    Works for ``/game/{key}/players`` pages and ``/players;player_keys=...``
+    responses alike, with or without the ``/draft_analysis`` sub-resource.
+    """
+
+    player_cols = [players_out[col] for col in PLAYER_COLUMNS] if players_out is not None else None
+    draft_keys = draft_out["player_key"] if draft_out is not None else None
+    draft_cols = [draft_out[col] for col in DRAFT_COLUMNS] if draft_out is not None else None
+    for arr in _player_entries(_players_block(data)):
+        meta, draft_block = _split_entry(arr)
+        values = _scan_meta(meta)
+        if player_cols is not None and values[0] and values[1]:
+            for column, value in zip(player_cols, values):
+                column.append(value)
+        if draft_cols is not None and values[0] and draft_block:
+            draft_keys.append(values[0])
+            for column, value in zip(draft_cols, _scan_draft(draft_block)):
+                column.append(value)
+
+
+def player_columns(data: Dict[str, Any], out: Optional[Dict[str, list]] = None) -> Dict[str, list]:
+    """Append every player on a ``/game/{key}/players`` page to column lists.
+
+    Passing the previous page's ``out`` concatenates pages without building
+    intermediate per-player records.
+    """
+
+    out = out if out is not None else empty_columns(PLAYER_COLUMNS)
+    try:
+        _extract(data, out, None)
     except Exception:
         log.exception("players parse error")
     return out
 
 
-def draft_analysis(data: Dict[str, Any]) -> Dict[str, Dict[str, Optional[float]]]:
-    res: Dict[str, Dict[str, Optional[float]]] = {}
+def draft_columns(data: Dict[str, Any], out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Append ``draft_analysis`` values for every player in a response to column lists."""
+
+    out = out if out is not None else empty_columns(["player_key"] + DRAFT_COLUMNS)
     try:
-        plist = data["fantasy_content"]["players"]
-        for _, value in plist.items():
-            if not isinstance(value, dict) or "player" not in value:
-                continue
-            arr = value["player"]
-            if not isinstance(arr, list):
-                continue
+        _extract(data, None, out)
+    except Exception:
+        log.exception("draft_analysis parse error")
+    return out
 
-            player_meta: List[Dict[str, Any]] = []
-            draft_block: Optional[List[Dict[str, Any]]] = None
-            for item in arr:
-                if isinstance(item, list):
-                    player_meta = item
-                elif isinstance(item, dict) and "draft_analysis" in item:
-                    block = item.get("draft_analysis")
-                    if isinstance(block, list):
-                        draft_block = block
-
-            key = None
-            for meta in player_meta:
-                if isinstance(meta, dict) and "player_key" in meta:
-                    key = meta.get("player_key")
-                    break
-            if not key or not draft_block:
-                continue
 
-            da_dict: Dict[str, Any] = {}
-            for entry in draft_block:
-                if isinstance(entry, dict):
-                    da_dict.update(entry)
-
-            def num(val: Any) -> Optional[float]:
-                try:
-                    return float(val)
-                except (TypeError, ValueError):
-                    return None
-
-            res[key] = {
-                "avg_pick": num(da_dict.get("average_pick")),
-                "avg_round": num(da_dict.get("average_round")),
-                "avg_cost": num(da_dict.get("average_cost")),
-                "pct_drafted": num(da_dict.get("percent_drafted")),
-                "pre_avg_pick": num(da_dict.get("preseason_average_pick")),
-                "pre_avg_round": num(da_dict.get("preseason_average_round")),
-                "pre_avg_cost": num(da_dict.get("preseason_average_cost")),
-                "pre_pct_drafted": num(da_dict.get("preseason_percent_drafted")),
-            }
+def player_draft_columns(
+    data: Dict[str, Any],
+    players_out: Optional[Dict[str, list]] = None,
+    draft_out: Optional[Dict[str, list]] = None,
+) -> Tuple[Dict[str, list], Dict[str, list]]:
+    """Player and draft columns from one ``/game/{key}/players;.../draft_analysis`` page."""
+
+    players_out = players_out if players_out is not None else empty_columns(PLAYER_COLUMNS)
+    draft_out = draft_out if draft_out is not None else empty_columns(["player_key"] + DRAFT_COLUMNS)
+    try:
+        _extract(data, players_out, draft_out)
     except Exception:
-        log.exception("draft_analysis parse error")
-    return res
+        log.exception("players/draft_analysis parse error")
+    return players_out, draft_out
+
+
+def draft_picks(data: Dict[str, Any]) -> List[Tuple[int, str]]:
+    """``(pick, player_key)`` for every made pick in a ``/league/{key}/draftresults`` response.
+
+    Yahoo lists every slot of a scheduled draft; slots without a
+    ``player_key`` have not been picked yet and are skipped.
+    """
+
+    picks: List[Tuple[int, str]] = []
+    try:
+        league = data["fantasy_content"]["league"]
+        results = league[1]["draft_results"] if len(league) > 1 else {}
+        if not isinstance(results, dict):
+            return picks
+        for value in results.values():
+            result = value.get("draft_result") if isinstance(value, dict) else None
+            if isinstance(result, dict) and result.get("player_key"):
+                picks.append((int(result.get("pick") or 0), result["player_key"]))
+    except Exception:
+        log.exception("draftresults parse error")
+    picks.sort()
+    return picks
+
+
+def draft_arrays(columns: Dict[str, list]) -> Dict[str, Any]:
+    """Convert draft column lists to float64 arrays (``None`` -> NaN)."""
+
+    typed: Dict[str, Any] = {"player_key": columns["player_key"]}
+    for col in DRAFT_COLUMNS:
+        typed[col] = np.array(
+            [np.nan if value is None else value for value in columns[col]], dtype=float
+        )
+    return typed
+
+
+def players(data: Dict[str, Any]) -> List[Dict[str, Optional[str]]]:
+    cols = player_columns(data)
+    return [dict(zip(PLAYER_COLUMNS, row)) for row in zip(*(cols[col] for col in PLAYER_COLUMNS))]
+
+
+def draft_analysis(data: Dict[str, Any]) -> Dict[str, Dict[str, Optional[float]]]:
+    cols = draft_columns(data)
+    return {
+        key: dict(zip(DRAFT_COLUMNS, values))
+        for key, *values in zip(cols["player_key"], *(cols[col] for col in DRAFT_COLUMNS))
+    }
@@ -0,0 +1,264 @@
+import os
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cache import CACHE
+from colstore import has_columns, read_columns, write_columns
+from metrics import METRICS, StagePool
+from nba_pull import COMPLETED_SEASON_TTL, CURRENT_SEASON_TTL, season_completed
+
+GAME_LOGS = os.environ.get("IRONMAN_GAME_LOGS", "").lower() in ("1", "true", "yes")
+GAMELOG_STORE_DIR = os.environ.get("NBA_GAMELOG_STORE", "nba_gamelogs")
+GAMELOG_FETCH_WORKERS = 4
+# "Games missed in the last N days" counts back from the newest game in the logs.
+RECENT_ABSENCE_DAYS = 30
+
+# Everything is reduced to fixed-width numbers on ingest so the store
+# memory-maps without parsing: days are days since 1970-01-01.
+PLAYER_LOG_COLUMNS = ["PLAYER_ID", "TEAM_ID", "GAME_ID", "GAME_DAY", "MIN"]
+SCHEDULE_COLUMNS = ["TEAM_ID", "GAME_ID", "GAME_DAY"]
+ABSENCE_COLUMNS = [
+    "PLAYER_ID",
+    "Games_Eligible",
+    "Games_Missed",
+    "Longest_Absence",
+    "Absence_Spells",
+    "B2B_Missed",
+    "Missed_Last30",
+]
+
+
+def _load(endpoint: str, params: dict, season: str) -> pd.DataFrame:
+    def load() -> dict:
+        # Imported on a cache miss only, as in nba_pull.
+        from nba_api.stats import endpoints
+
+        started = time.perf_counter()
+        result = getattr(endpoints, endpoint)(**params)
+        METRICS.count("nba.requests")
+        METRICS.count("nba.seconds", time.perf_counter() - started)
+        METRICS.count("nba.bytes", len(result.nba_response.get_response() or ""))
+        # As in nba_pull: to_json would round floats to 10 decimals.
+        return result.get_data_frames()[0].to_dict(orient="split", index=False)
+
+    ttl = COMPLETED_SEASON_TTL if season_completed(season) else CURRENT_SEASON_TTL
+    payload = CACHE.fetch("nba", endpoint.lower(), params, ttl, load)
+    return pd.DataFrame(payload["data"], columns=payload["columns"])
+
+
+def _game_days(dates: pd.Series) -> np.ndarray:
+    parsed = pd.to_datetime(dates.astype(str).str.slice(0, 10), format="%Y-%m-%d")
+    return parsed.to_numpy().astype("datetime64[D]").astype(np.int32)
+
+
+def _numeric_logs(frame: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    if frame.empty:
+        return pd.DataFrame({col: np.empty(0, dtype=np.int32 if col == "GAME_DAY" else np.int64) for col in columns})
+    out = {}
+    for col in columns:
+        if col == "GAME_DAY":
+            out[col] = _game_days(frame["GAME_DATE"])
+        elif col == "MIN":
+            out[col] = pd.to_numeric(frame[col], errors="coerce").fillna(0.0).to_numpy(dtype=np.float32)
+        else:
+            out[col] = pd.to_numeric(frame[col], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+    return pd.DataFrame(out, columns=columns)
+
+
+def _fetch_season_logs(season: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """One season's player game logs and team schedule (both in a single request each)."""
+
+    players = _load(
+        "PlayerGameLogs",
+        {"season_nullable": season, "season_type_nullable": "Regular Season"},
+        season,
+    )
+    schedule = _load(
+        "LeagueGameLog",
+        {"season": season, "player_or_team_abbreviation": "T", "season_type_all_star": "Regular Season"},
+        season,
+    )
+    return (
+        _numeric_logs(players, PLAYER_LOG_COLUMNS),
+        _numeric_logs(schedule, SCHEDULE_COLUMNS).drop_duplicates(["TEAM_ID", "GAME_ID"]),
+    )
+
+
+def _season_path(season: str, store_dir: str) -> Path:
+    return Path(store_dir) / season
+
+
+def load_game_logs(
+    seasons: Sequence[str],
+    workers: int = GAMELOG_FETCH_WORKERS,
+    store_dir: str | None = GAMELOG_STORE_DIR,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Player game logs and team schedules for ``seasons``, stacked with a ``SEASON`` start year.
+
+    Completed seasons are written once to ``store_dir/<season>/{players,schedule}``
+    as memory-mapped columns (see :mod:`colstore`) and read back from there;
+    the in-progress season is always refetched. ``None`` disables the store.
+    """
+
+    season_list = list(seasons)
+    frames: dict[str, tuple[pd.DataFrame, pd.DataFrame]] = {}
+    to_fetch = []
+    for season in season_list:
+        path = _season_path(season, store_dir) if store_dir else None
+        if (
+            path is not None
+            and season_completed(season)
+            and has_columns(path / "players")
+            and has_columns(path / "schedule")
+        ):
+            frames[season] = (read_columns(path / "players"), read_columns(path / "schedule"))
+            METRICS.count("nba.gamelog_seasons_from_store")
+        else:
+            to_fetch.append(season)
+
+    if to_fetch:
+        with StagePool(max_workers=max(1, min(int(workers), len(to_fetch)))) as pool:
+            for season, (players, schedule) in zip(to_fetch, pool.map(_fetch_season_logs, to_fetch)):
+                frames[season] = (players, schedule)
+                METRICS.count("nba.gamelog_seasons_fetched")
+                if store_dir and season_completed(season):
+                    write_columns(_season_path(season, store_dir) / "players", players)
+                    write_columns(_season_path(season, store_dir) / "schedule", schedule)
+
+    stacked = []
+    for part in range(2):
+        pieces = []
+        for season in season_list:
+            frame = frames[season][part]
+            pieces.append(frame.assign(SEASON=np.full(len(frame), int(season[:4]), dtype=np.int16)))
+        stacked.append(pd.concat(pieces, ignore_index=True) if pieces else pd.DataFrame())
+    return stacked[0], stacked[1]
+
+
+def _empty_absences() -> pd.DataFrame:
+    return pd.DataFrame({col: np.empty(0, dtype=np.int64) for col in ABSENCE_COLUMNS})
+
+
+def absence_metrics(
+    players: pd.DataFrame, schedule: pd.DataFrame, recent_days: int = RECENT_ABSENCE_DAYS
+) -> pd.DataFrame:
+    """Per-player absence profile from game logs, as flat array passes.
+
+    A player is *eligible* for every game their team played during each stint
+    with it. The first stint of a season starts at the team's opener and the
+    last one runs to the team's latest game, so injuries at either end count.
+    Gaps between teams after a trade are not counted. A game the player is
+    eligible for but has no log row for is *missed*. Per player across all
+    seasons given:
+
+    - ``Longest_Absence``: longest run of consecutive missed team games.
+    - ``Absence_Spells``: number of such runs.
+    - ``B2B_Missed``: missed games that were either night of a back-to-back.
+    - ``Missed_Last30``: missed games in the ``recent_days`` before the newest
+      game in the logs.
+    """
+
+    if players.empty or schedule.empty:
+        return _empty_absences()
+
+    # Team schedule, one slot per (team, game), ordered by team then day.
+    teams, sched_team = np.unique(schedule["TEAM_ID"].to_numpy(dtype=np.int64), return_inverse=True)
+    sched_day = schedule["GAME_DAY"].to_numpy(dtype=np.int64)
+    day0 = sched_day.min()
+    span = int(sched_day.max() - day0) + 1
+    sched_key, first_idx = np.unique(sched_team * span + (sched_day - day0), return_index=True)
+    sched_day = sched_day[first_idx]
+    sched_team = sched_team[first_idx]
+    sched_season = schedule["SEASON"].to_numpy(dtype=np.int64)[first_idx]
+    n_slots = len(sched_key)
+
+    group_start = np.ones(n_slots, dtype=bool)
+    group_start[1:] = (sched_team[1:] != sched_team[:-1]) | (sched_season[1:] != sched_season[:-1])
+    group = np.cumsum(group_start) - 1
+    group_first = np.flatnonzero(group_start)
+    group_last = np.append(group_first[1:] - 1, n_slots - 1)
+    gap_before = np.full(n_slots, np.iinfo(np.int64).max)
+    gap_before[1:] = np.where(group_start[1:], gap_before[1:], sched_day[1:] - sched_day[:-1])
+    gap_after = np.append(gap_before[1:], np.iinfo(np.int64).max)
+    gap_after[group_last] = np.iinfo(np.int64).max
+    back_to_back = (gap_before == 1) | (gap_after == 1)
+
+    # Map each appearance onto its team's schedule slot.
+    log_team = np.searchsorted(teams, players["TEAM_ID"].to_numpy(dtype=np.int64))
+    log_day = players["GAME_DAY"].to_numpy(dtype=np.int64)
+    log_key = np.minimum(log_team, len(teams) - 1) * span + (log_day - day0)
+    slot = np.minimum(np.searchsorted(sched_key, log_key), n_slots - 1)
+    found = np.flatnonzero((log_team < len(teams)) & (sched_key[slot] == log_key))
+    if not len(found):
+        return _empty_absences()
+    log_id = players["PLAYER_ID"].to_numpy(dtype=np.int64)[found]
+    order = np.lexsort((log_day[found], log_id))
+    log_id, slot = log_id[order], slot[found][order]
+    new_player = np.ones(len(slot), dtype=bool)
+    new_player[1:] = log_id[1:] != log_id[:-1]
+    player_ids = log_id[new_player]
+    log_player = np.cumsum(new_player) - 1
+
+    # Stints: consecutive appearances for one team within one season.
+    log_group = group[slot]
+    new_player_season = new_player.copy()
+    new_player_season[1:] |= sched_season[slot[1:]] != sched_season[slot[:-1]]
+    new_stint = new_player_season.copy()
+    new_stint[1:] |= log_group[1:] != log_group[:-1]
+    stint = np.cumsum(new_stint) - 1
+    stint_first = np.flatnonzero(new_stint)
+    stint_last = np.append(stint_first[1:] - 1, len(slot) - 1)
+    season_opens = new_player_season[stint_first]
+    season_closes = np.append(new_player_season[stint_first[1:]], True)
+    stint_group = log_group[stint_first]
+    begin = np.where(season_opens, group_first[stint_group], slot[stint_first])
+    end = np.where(season_closes, group_last[stint_group], slot[stint_last])
+    stint_player = log_player[stint_first]
+
+    # Expand every stint into its eligible slots and mark the games played.
+    lengths = end - begin + 1
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    slot_pos = np.arange(int(lengths.sum())) + np.repeat(begin - offsets, lengths)
+    slot_player = np.repeat(stint_player, lengths)
+    missed = np.ones(len(slot_pos), dtype=bool)
+    missed[offsets[stint] + slot - begin[stint]] = False
+
+    n_players = len(player_ids)
+    missed_player = slot_player[missed]
+    missed_pos = slot_pos[missed]
+    recent = sched_day[missed_pos] > sched_day.max() - recent_days
+    eligible = np.bincount(slot_player, minlength=n_players)
+    games_missed = np.bincount(missed_player, minlength=n_players)
+    b2b_missed = np.bincount(missed_player[back_to_back[missed_pos]], minlength=n_players)
+    missed_recent = np.bincount(missed_player[recent], minlength=n_players)
+
+    # Absence runs never cross a stint boundary.
+    stint_edge = np.zeros(len(slot_pos) + 1, dtype=bool)
+    stint_edge[offsets] = True
+    stint_edge[-1] = True
+    run_start = np.flatnonzero(missed & (stint_edge[:-1] | ~np.roll(missed, 1)))
+    run_end = np.flatnonzero(missed & (stint_edge[1:] | ~np.roll(missed, -1)))
+    run_length = run_end - run_start + 1
+    run_player = slot_player[run_start]
+    spells = np.bincount(run_player, minlength=n_players)
+    longest = np.zeros(n_players, dtype=np.int64)
+    if len(run_length):
+        first_run = np.flatnonzero(np.concatenate(([True], run_player[1:] != run_player[:-1])))
+        longest[run_player[first_run]] = np.maximum.reduceat(run_length, first_run)
+
+    return pd.DataFrame(
+        {
+            "PLAYER_ID": player_ids,
+            "Games_Eligible": eligible,
+            "Games_Missed": games_missed,
+            "Longest_Absence": longest,
+            "Absence_Spells": spells,
+            "B2B_Missed": b2b_missed,
+            "Missed_Last30": missed_recent,
+        },
+        columns=ABSENCE_COLUMNS,
+    )
@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+
 import numpy as np
 import pandas as pd
 
@@ -5,6 +7,44 @@ import pandas as pd
 MIN_GAMES_FULL_WEIGHT = 40
 MIN_MINUTES_FULL_WEIGHT = 500
 
+PER_GAME_FALLBACKS = {
+    "PTS_PG": "PTS",
+    "REB_PG": "REB",
+    "AST_PG": "AST",
+    "STL_PG": "STL",
+    "BLK_PG": "BLK",
+    "FG3M_PG": "FG3M",
+    "TOV_PG": "TOV",
+    "DD2_PG": "DD2",
+}
+PER_GAME_STATS = [
+    "PTS_PG",
+    "REB_PG",
+    "AST_PG",
+    "STL_PG",
+    "BLK_PG",
+    "FG3M_PG",
+    "FG_PCT",
+    "FT_PCT",
+]
+Z_COLUMNS = PER_GAME_STATS + ["FG3_PCT", "TOV_PG_NEG", "DD2_PG"]
+VALUE_COLUMNS = PER_GAME_STATS + ["TOV_PG_NEG"]
+PRODUCTION_METRICS = ["PTS_PG", "REB_PG", "AST_PG", "STL_PG", "BLK_PG", "FG3M_PG", "DD2_PG"]
+EFFICIENCY_METRICS = ["FG_PCT", "FT_PCT", "FG3_PCT", "TOV_PG_NEG"]
+# Game-log absence profile (see gamelogs.absence_metrics); higher means less available.
+ABSENCE_METRICS = ["Longest_Absence", "B2B_Missed", "Missed_Last30"]
+
+# "absence" only applies when the game-log metrics are present, and is then
+# carved out of the durability weight so each blend still sums to one.
+IRONMAN_WEIGHTS = {
+    "durability": 0.40,
+    "minutes": 0.20,
+    "value": 0.30,
+    "value_vs_adp": 0.10,
+    "absence": 0.10,
+}
+GOOD_IRONMAN_WEIGHTS = {"durability": 0.40, "production": 0.40, "efficiency": 0.20, "absence": 0.10}
+
 
 def z(series: pd.Series) -> pd.Series:
     s = pd.to_numeric(series, errors="coerce")
@@ -15,118 +55,249 @@ def z(series: pd.Series) -> pd.Series:
     return (s - mean) / std
 
 
-def compute(df: pd.DataFrame) -> pd.DataFrame:
-    data = df.copy()
-    data["GP"] = pd.to_numeric(data["GP"], errors="coerce").fillna(0)
-    data["MIN"] = pd.to_numeric(data["MIN"], errors="coerce").fillna(0)
-    data["MPG"] = np.where(data["GP"] > 0, data["MIN"] / data["GP"], 0.0)
-
-    per_game_fallbacks = {
-        "PTS_PG": "PTS",
-        "REB_PG": "REB",
-        "AST_PG": "AST",
-        "STL_PG": "STL",
-        "BLK_PG": "BLK",
-        "FG3M_PG": "FG3M",
-        "TOV_PG": "TOV",
-        "DD2_PG": "DD2",
-    }
-    for pg_col, total_col in per_game_fallbacks.items():
-        if pg_col not in data.columns:
-            totals = pd.to_numeric(data.get(total_col), errors="coerce").fillna(0.0)
-            data[pg_col] = np.where(data["GP"] > 0, totals / data["GP"], 0.0)
-        else:
-            data[pg_col] = pd.to_numeric(data[pg_col], errors="coerce").fillna(0.0)
-
-    data["FG_PCT"] = pd.to_numeric(data.get("FG_PCT"), errors="coerce").fillna(0.0)
-    data["FT_PCT"] = pd.to_numeric(data.get("FT_PCT"), errors="coerce").fillna(0.0)
-    data["FG3_PCT"] = pd.to_numeric(data.get("FG3_PCT"), errors="coerce").fillna(0.0)
-    data["DD2_PG"] = pd.to_numeric(data.get("DD2_PG"), errors="coerce").fillna(0.0)
-
-    data["Weighted_GP"] = pd.to_numeric(data.get("Weighted_GP"), errors="coerce")
-    data["GP_Median"] = pd.to_numeric(data.get("GP_Median"), errors="coerce")
-    data["GP_Variance"] = pd.to_numeric(data.get("GP_Variance"), errors="coerce")
-    data["Durability_Penalty"] = (
-        pd.to_numeric(data.get("Durability_Penalty"), errors="coerce").fillna(0.0)
-    )
+def z_columns(matrix: np.ndarray) -> np.ndarray:
+    """Column-wise :func:`z` for a 2D float array (NaNs ignored, zero-variance -> 0)."""
+
+    counts = np.sum(~np.isnan(matrix), axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(matrix, axis=0) / counts
+        std = np.sqrt(np.nansum((matrix - mean) ** 2, axis=0) / counts)
+        scores = (matrix - mean) / std
+    flat = (std == 0) | np.isnan(std)
+    scores[:, flat] = 0.0
+    return scores
+
+
+def rank_desc(values: np.ndarray) -> np.ndarray:
+    """``Series.rank(ascending=False, method="min")`` for a NaN-free float array."""
+
+    order = np.argsort(-values, kind="stable")
+    ordered = values[order]
+    starts = np.empty(len(ordered), dtype=bool)
+    starts[:1] = True
+    starts[1:] = ordered[1:] != ordered[:-1]
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.maximum.accumulate(np.where(starts, np.arange(1, len(values) + 1), 0))
+    return ranks
+
+
+def _numeric(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+
+@dataclass
+class ScoringInputs:
+    """Cleaned scoring inputs held as float arrays.
+
+    ``stats`` is a column-major ``(players, len(Z_COLUMNS))`` matrix so every
+    per-column reduction runs over contiguous memory. ``columns`` holds the
+    cleaned copies of input columns that :func:`compute` writes back.
+    ``absence`` is the ``(players, len(ABSENCE_METRICS))`` game-log matrix
+    (NaN for players without logs), or ``None`` when the frame has none.
+    """
+
+    stats: np.ndarray
+    gp: np.ndarray
+    minutes: np.ndarray
+    mpg: np.ndarray
+    durability: np.ndarray
+    adp: np.ndarray | None
+    columns: dict
+    absence: np.ndarray | None = None
+
+    def take(self, rows: np.ndarray) -> "ScoringInputs":
+        return ScoringInputs(
+            stats=np.asfortranarray(self.stats[rows]),
+            gp=self.gp[rows],
+            minutes=self.minutes[rows],
+            mpg=self.mpg[rows],
+            durability=self.durability[rows],
+            adp=None if self.adp is None else self.adp[rows],
+            columns={col: values[rows] for col, values in self.columns.items()},
+            absence=None if self.absence is None else np.asfortranarray(self.absence[rows]),
+        )
+
+
+def prepare(df: pd.DataFrame) -> ScoringInputs:
+    """Coerce every column :func:`compute` needs into float arrays exactly once."""
+
+    gp = np.nan_to_num(_numeric(df, "GP"), nan=0.0)
+    minutes = np.nan_to_num(_numeric(df, "MIN"), nan=0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mpg = np.where(gp > 0, minutes / gp, 0.0)
+
+        columns = {"GP": gp, "MIN": minutes, "MPG": mpg}
+        for pg_col, total_col in PER_GAME_FALLBACKS.items():
+            if pg_col in df.columns:
+                columns[pg_col] = np.nan_to_num(_numeric(df, pg_col), nan=0.0)
+            else:
+                totals = np.nan_to_num(_numeric(df, total_col), nan=0.0)
+                columns[pg_col] = np.where(gp > 0, totals / gp, 0.0)
+    for col in ("FG_PCT", "FT_PCT", "FG3_PCT"):
+        columns[col] = np.nan_to_num(_numeric(df, col), nan=0.0)
+    for col in ("Weighted_GP", "GP_Median", "GP_Variance"):
+        columns[col] = _numeric(df, col)
+    columns["Durability_Penalty"] = np.nan_to_num(_numeric(df, "Durability_Penalty"), nan=0.0)
 
     # Durability composite comes from a 70/30 blend of weighted GP (recency bias)
     # and median GP, minus a variance-scaled penalty derived upstream.
-    durability_composite = pd.to_numeric(
-        data.get("Durability_Composite"), errors="coerce"
+    composite = _numeric(df, "Durability_Composite")
+    fallback = np.where(np.isnan(columns["Weighted_GP"]), gp, columns["Weighted_GP"])
+    durability = np.nan_to_num(np.where(np.isnan(composite), fallback, composite), nan=0.0)
+    columns["Durability_Composite"] = durability
+    columns["TOV_PG_NEG"] = -columns["TOV_PG"]
+
+    stats = np.empty((len(df), len(Z_COLUMNS)), dtype=float, order="F")
+    for pos, col in enumerate(Z_COLUMNS):
+        stats[:, pos] = columns[col]
+
+    adp = None
+    if "ADP" in df.columns and df["ADP"].notna().any():
+        adp = _numeric(df, "ADP")
+    absence = None
+    if all(col in df.columns for col in ABSENCE_METRICS):
+        absence = np.asfortranarray(np.column_stack([_numeric(df, col) for col in ABSENCE_METRICS]))
+    return ScoringInputs(stats, gp, minutes, mpg, durability, adp, columns, absence)
+
+
+def score(
+    inputs: ScoringInputs,
+    ironman_weights: dict = IRONMAN_WEIGHTS,
+    good_weights: dict = GOOD_IRONMAN_WEIGHTS,
+    value_columns: list = VALUE_COLUMNS,
+) -> dict:
+    """Compute every z-score, composite and rank as array operations.
+
+    ``value_columns`` picks the :data:`Z_COLUMNS` averaged into ``ValueZ``
+    (a league's scoring categories). Returns an ordered ``{column: array}``
+    mapping in the column order :func:`compute` has always produced.
+    """
+
+    durability_minutes = z_columns(
+        np.asfortranarray(np.column_stack([inputs.durability, inputs.mpg]))
     )
-    durability_fallback = data["Weighted_GP"].where(
-        data["Weighted_GP"].notna(), data["GP"]
+    return blend_scores(
+        inputs,
+        z_columns(inputs.stats),
+        durability_minutes[:, 0],
+        durability_minutes[:, 1],
+        None if inputs.adp is None else z_columns(-inputs.adp[:, None])[:, 0],
+        None if inputs.absence is None else z_columns(inputs.absence),
+        ironman_weights,
+        good_weights,
+        value_columns,
     )
-    data["Durability_Composite"] = durability_composite.where(
-        durability_composite.notna(), durability_fallback
-    ).fillna(0.0)
-
-    per_game_stats = [
-        "PTS_PG",
-        "REB_PG",
-        "AST_PG",
-        "STL_PG",
-        "BLK_PG",
-        "FG3M_PG",
-        "FG_PCT",
-        "FT_PCT",
-    ]
-    data["TOV_PG_NEG"] = -data["TOV_PG"]
-    zcols = per_game_stats + ["FG3_PCT", "TOV_PG_NEG", "DD2_PG"]
-    for col in zcols:
-        data[f"z_{col}"] = z(pd.to_numeric(data[col], errors="coerce").fillna(0))
-    value_components = [f"z_{col}" for col in per_game_stats] + ["z_TOV_PG_NEG"]
-    data["ValueZ_raw"] = data[value_components].mean(axis=1)
+
+
+def blend_scores(
+    inputs: ScoringInputs,
+    zs: np.ndarray,
+    durability_z: np.ndarray,
+    minutes_z: np.ndarray,
+    adp_z: np.ndarray | None,
+    absence_zs: np.ndarray | None,
+    ironman_weights: dict = IRONMAN_WEIGHTS,
+    good_weights: dict = GOOD_IRONMAN_WEIGHTS,
+    value_columns: list = VALUE_COLUMNS,
+) -> dict:
+    """Composites and ranks of :func:`score` from already computed z-scores.
+
+    ``zs`` holds the :data:`Z_COLUMNS` z-scores and ``absence_zs`` those of
+    :data:`ABSENCE_METRICS`. Split out so :mod:`live` can z-score from running
+    sums and still blend exactly like a full rescore.
+    """
+
+    position = {col: pos for pos, col in enumerate(Z_COLUMNS)}
+    value_idx = [position[col] for col in value_columns]
+    production_idx = [position[col] for col in PRODUCTION_METRICS]
+    efficiency_idx = [position[col] for col in EFFICIENCY_METRICS]
+
+    out = {f"z_{col}": zs[:, pos] for pos, col in enumerate(Z_COLUMNS)}
+    value_raw = zs[:, value_idx].mean(axis=1)
+    out["ValueZ_raw"] = value_raw
 
     games_factor = np.clip(
-        np.where(data["GP"] > 0, data["GP"] / MIN_GAMES_FULL_WEIGHT, 0.0), 0.0, 1.0
+        np.where(inputs.gp > 0, inputs.gp / MIN_GAMES_FULL_WEIGHT, 0.0), 0.0, 1.0
     )
     minutes_factor = np.clip(
-        np.where(data["MIN"] > 0, data["MIN"] / MIN_MINUTES_FULL_WEIGHT, 0.0), 0.0, 1.0
+        np.where(inputs.minutes > 0, inputs.minutes / MIN_MINUTES_FULL_WEIGHT, 0.0), 0.0, 1.0
     )
-    sample_strength = np.maximum(games_factor, minutes_factor)
-    data["ValueZ"] = data["ValueZ_raw"] * sample_strength
+    value_z = value_raw * np.maximum(games_factor, minutes_factor)
+    out["ValueZ"] = value_z
 
-    data["DurabilityZ"] = z(data["Durability_Composite"])
-    data["MinutesZ"] = z(data["MPG"])
+    out["DurabilityZ"] = durability_z
+    out["MinutesZ"] = minutes_z
 
-    if "ADP" in data.columns and data["ADP"].notna().any():
-        data["ADP_INV"] = -data["ADP"]
-        data["ADPz"] = z(data["ADP_INV"])
-        value_vs_adp = data["ValueZ"] - data["ADPz"]
+    if adp_z is not None:
+        out["ADP_INV"] = -inputs.adp
+        out["ADPz"] = adp_z
+        value_vs_adp = value_z - adp_z
     else:
-        value_vs_adp = pd.Series(0.0, index=data.index)
-
-    production_metrics = [
-        "PTS_PG",
-        "REB_PG",
-        "AST_PG",
-        "STL_PG",
-        "BLK_PG",
-        "FG3M_PG",
-        "DD2_PG",
-    ]
-    efficiency_metrics = ["FG_PCT", "FT_PCT", "FG3_PCT", "TOV_PG_NEG"]
-    production_cols = [f"z_{metric}" for metric in production_metrics]
-    efficiency_cols = [f"z_{metric}" for metric in efficiency_metrics]
-    data["ProductionZ"] = data[production_cols].mean(axis=1)
-    data["EfficiencyZ"] = data[efficiency_cols].mean(axis=1)
-
-    data["IronMan_Score"] = (
-        0.40 * data["DurabilityZ"]
-        + 0.20 * data["MinutesZ"]
-        + 0.30 * data["ValueZ"]
-        + 0.10 * value_vs_adp
-    )
-    data["IronMan_Score"] = data["IronMan_Score"].fillna(0)
-    data["IronMan_Rank"] = data["IronMan_Score"].rank(ascending=False, method="min").astype(int)
+        value_vs_adp = np.zeros(len(value_z))
+
+    out["ProductionZ"] = zs[:, production_idx].mean(axis=1)
+    out["EfficiencyZ"] = zs[:, efficiency_idx].mean(axis=1)
 
-    data["Good_IronMan_Score"] = (
-        0.40 * data["DurabilityZ"] + 0.40 * data["ProductionZ"] + 0.20 * data["EfficiencyZ"]
+    # Players without game logs get a neutral AbsenceZ of zero.
+    absence_z = None
+    if absence_zs is not None:
+        absence_z = np.nan_to_num(absence_zs.mean(axis=1), nan=0.0)
+        out["AbsenceZ"] = absence_z
+
+    def availability(weights: dict) -> np.ndarray:
+        if absence_z is None:
+            return weights["durability"] * out["DurabilityZ"]
+        absence = weights.get("absence", 0.0)
+        return (weights["durability"] - absence) * out["DurabilityZ"] - absence * absence_z
+
+    ironman = np.nan_to_num(
+        availability(ironman_weights)
+        + ironman_weights["minutes"] * out["MinutesZ"]
+        + ironman_weights["value"] * value_z
+        + ironman_weights["value_vs_adp"] * value_vs_adp,
+        nan=0.0,
     )
-    data["Good_IronMan_Score"] = data["Good_IronMan_Score"].fillna(0.0)
-    data["Good_IronMan_Rank"] = (
-        data["Good_IronMan_Score"].rank(ascending=False, method="min").astype(int)
+    out["IronMan_Score"] = ironman
+    out["IronMan_Rank"] = rank_desc(ironman)
+
+    good = np.nan_to_num(
+        availability(good_weights)
+        + good_weights["production"] * out["ProductionZ"]
+        + good_weights["efficiency"] * out["EfficiencyZ"],
+        nan=0.0,
     )
-    return data.sort_values("IronMan_Rank")
+    out["Good_IronMan_Score"] = good
+    out["Good_IronMan_Rank"] = rank_desc(good)
+    return out
+
+
+def _like(df: pd.DataFrame, col: str, values: np.ndarray) -> np.ndarray:
+    """Give a cleaned copy the input column's integer or compact dtype.
+
+    Cleaning works in float64, but an integer column (GP) had no missing
+    values to fill, so it goes back to integers and is written as ``72``
+    rather than ``72.0``. float32 columns come from :mod:`compact`.
+    """
+
+    if col in df.columns and (df[col].dtype.kind in "iu" or df[col].dtype == np.float32):
+        return values.astype(df[col].dtype)
+    return values
+
+
+def compute(
+    df: pd.DataFrame,
+    ironman_weights: dict = IRONMAN_WEIGHTS,
+    good_weights: dict = GOOD_IRONMAN_WEIGHTS,
+    value_columns: list = VALUE_COLUMNS,
+) -> pd.DataFrame:
+    inputs = prepare(df)
+    results = score(inputs, ironman_weights, good_weights, value_columns)
+
+    added = {**inputs.columns, **results}
+    columns = list(df.columns) + [col for col in added if col not in df.columns]
+    data = {col: _like(df, col, added[col]) if col in added else df[col] for col in columns}
+    frame = pd.DataFrame(data, index=df.index, columns=columns)
+    order = np.argsort(results["IronMan_Rank"], kind="quicksort")
+    return frame.take(order)
@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+import time
+from collections.abc import Callable, Iterable, Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from checkpoint import StageStore
+from extract import draft_picks
+from ironman import GOOD_IRONMAN_WEIGHTS, IRONMAN_WEIGHTS, VALUE_COLUMNS, blend_scores, prepare
+from yfs import configure_logging, get, log
+
+LIVE_POLL_SECONDS = float(os.environ.get("IRONMAN_LIVE_POLL", "3"))
+LIVE_TOP = 15
+LIVE_COLUMNS = [
+    "name_full",
+    "team",
+    "pos",
+    "ADP",
+    "IronMan_Rank",
+    "Good_IronMan_Rank",
+    "IronMan_Score",
+    "Good_IronMan_Score",
+]
+# A column whose remaining values all agree scores 0, as in ironman.z_columns.
+# Running sums leave rounding noise where a recompute would give exactly 0.
+FLAT_STD_TOLERANCE = 1e-9
+
+
+class LiveBoard:
+    """A scored player pool that re-ranks in place as players are drafted.
+
+    Every z-score needs only its column's count, sum and sum of squares over
+    the players still available. A pick subtracts the drafted rows from those
+    running sums, and the composites and ranks are re-blended from the updated
+    means and deviations with :func:`ironman.blend_scores`, the same code a
+    full rescore uses. Sums are kept around each column's starting mean so
+    that removing players does not cost precision.
+    """
+
+    def __init__(
+        self,
+        frame: pd.DataFrame,
+        ironman_weights: dict = IRONMAN_WEIGHTS,
+        good_weights: dict = GOOD_IRONMAN_WEIGHTS,
+        value_columns: Sequence[str] = VALUE_COLUMNS,
+    ) -> None:
+        self.frame = frame.reset_index(drop=True)
+        self.weights = (ironman_weights, good_weights, list(value_columns))
+        self.inputs = prepare(self.frame)
+        inputs = self.inputs
+        parts = [inputs.stats, inputs.durability[:, None], inputs.mpg[:, None]]
+        self._adp_col = self._absence_cols = None
+        if inputs.adp is not None:
+            self._adp_col = sum(part.shape[1] for part in parts)
+            parts.append(-inputs.adp[:, None])
+        if inputs.absence is not None:
+            start = sum(part.shape[1] for part in parts)
+            self._absence_cols = slice(start, start + inputs.absence.shape[1])
+            parts.append(inputs.absence)
+        matrix = np.hstack(parts)
+
+        present = ~np.isnan(matrix)
+        counts = present.sum(axis=0)
+        self._shift = np.where(present, matrix, 0.0).sum(axis=0) / np.maximum(counts, 1)
+        self._values = np.asfortranarray(matrix - self._shift)
+        filled = np.where(present, self._values, 0.0)
+        self._count = counts.astype(float)
+        self._sum = filled.sum(axis=0)
+        self._sumsq = (filled * filled).sum(axis=0)
+        self.available = np.ones(len(self.frame), dtype=bool)
+        self._keys = self.frame["player_key"].to_numpy()
+        self._row = {key: row for row, key in enumerate(self._keys.tolist())}
+
+    def remove(self, player_keys: Iterable[str]) -> list[str]:
+        """Take drafted players off the board; returns the keys that were still available."""
+
+        rows = []
+        for key in dict.fromkeys(player_keys):
+            row = self._row.get(key)
+            if row is not None and self.available[row]:
+                rows.append(row)
+        if not rows:
+            return []
+        rows = np.asarray(rows)
+        self.available[rows] = False
+        values = self._values[rows]
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        self._count -= present.sum(axis=0)
+        self._sum -= filled.sum(axis=0)
+        self._sumsq -= (filled * filled).sum(axis=0)
+        return self._keys[rows].tolist()
+
+    def scores(self) -> tuple[np.ndarray, dict]:
+        """Board rows still available and their :func:`ironman.score` columns."""
+
+        rows = np.flatnonzero(self.available)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self._sum / self._count
+            std = np.sqrt(np.maximum(self._sumsq / self._count - mean * mean, 0.0))
+            zs = (self._values[rows] - mean) / std
+        flat = ~(std > FLAT_STD_TOLERANCE * np.maximum(np.abs(self._shift + mean), 1.0))
+        zs[:, flat] = 0.0
+
+        stats_cols = self.inputs.stats.shape[1]
+        ironman_weights, good_weights, value_columns = self.weights
+        results = blend_scores(
+            self.inputs.take(rows),
+            zs[:, :stats_cols],
+            zs[:, stats_cols],
+            zs[:, stats_cols + 1],
+            None if self._adp_col is None else zs[:, self._adp_col],
+            None if self._absence_cols is None else zs[:, self._absence_cols],
+            ironman_weights,
+            good_weights,
+            value_columns,
+        )
+        return rows, results
+
+    def table(self, columns: Sequence[str] = LIVE_COLUMNS, top: int | None = None) -> pd.DataFrame:
+        """Available players with live scores and ranks, best ``IronMan_Rank`` first."""
+
+        rows, results = self.scores()
+        board = self.frame.iloc[rows].copy()
+        for col, values in results.items():
+            if col in columns:
+                board[col] = values
+        board = board.sort_values("IronMan_Rank", kind="stable")
+        board = board[[col for col in columns if col in board.columns]]
+        return board if top is None else board.head(top)
+
+
+def load_pool(store: StageStore | None = None) -> pd.DataFrame:
+    """The scored pool from the last pipeline run's ``scored`` checkpoint."""
+
+    entry = (store or StageStore()).latest("scored")
+    if entry is None:
+        raise SystemExit("No scored checkpoint found. Run run_pipeline.py first.")
+    return entry["value"]
+
+
+def yahoo_picks(league_key: str) -> Callable[[], list[str]]:
+    """Drafted player keys in pick order, polled from a league's Yahoo draft results."""
+
+    def poll() -> list[str]:
+        return [key for _, key in draft_picks(get(f"/league/{league_key}/draftresults", max_age=0))]
+
+    return poll
+
+
+def file_picks(path: str) -> Callable[[], list[str]]:
+    """Drafted player keys from a local JSON file, re-read on every poll.
+
+    The file holds either a list of player keys or a saved Yahoo
+    ``draftresults`` response, so a draft can be replayed or typed in by hand.
+    """
+
+    def poll() -> list[str]:
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return []
+        if isinstance(data, list):
+            return [str(key) for key in data]
+        return [key for _, key in draft_picks(data)]
+
+    return poll
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-rank the Iron-Man board live during a draft.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--league", help="Yahoo league key to poll, e.g. 466.l.12345.")
+    source.add_argument("--picks-file", help="JSON list of drafted player keys (or a saved draftresults response).")
+    parser.add_argument("--poll", type=float, default=LIVE_POLL_SECONDS, help="Seconds between polls.")
+    parser.add_argument("--top", type=int, default=LIVE_TOP, help="Suggestions shown after each pick.")
+    parser.add_argument("--out", help="Also rewrite this CSV with the full live board after each pick.")
+    parser.add_argument("--once", action="store_true", help="Apply the current picks, print the board and exit.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(argv)
+    configure_logging()
+    board = LiveBoard(load_pool())
+    if args.league:
+        from run_pipeline import bearer
+
+        bearer()
+        poll = yahoo_picks(args.league)
+    else:
+        poll = file_picks(args.picks_file)
+    print(f"Live board loaded with {len(board.frame)} players.")
+    log.info("Live draft board started with %d players", len(board.frame))
+
+    shown = False
+    try:
+        while True:
+            picks = poll()
+            started = time.perf_counter()
+            removed = board.remove(picks)
+            table = board.table(top=args.top)
+            elapsed = time.perf_counter() - started
+            if removed or not shown:
+                if removed:
+                    per_pick = elapsed / len(removed) * 1000
+                    print(
+                        f"\n{len(picks)} picks made; removed {len(removed)} "
+                        f"({per_pick:.1f} ms per pick), {int(board.available.sum())} players left."
+                    )
+                    log.info("Removed %d drafted players in %.1f ms", len(removed), elapsed * 1000)
+                print(table.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+                if args.out:
+                    board.table(columns=list(board.frame.columns)).to_csv(f"{args.out}.tmp", index=False)
+                    os.replace(f"{args.out}.tmp", args.out)
+                shown = True
+            if args.once or not board.available.any():
+                break
+            time.sleep(args.poll)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
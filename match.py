@@ -1,13 +1,20 @@
-from typing import List, Sequence, Tuple
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
-from rapidfuzz import fuzz, process
 from unidecode import unidecode
 
 OVERRIDES = {
     # "yahoo_name": "NBA_API_NAME",
 }
 
+MATCH_CHUNK_ROWS = 512
+CROSSWALK_PATH = os.environ.get("IRONMAN_CROSSWALK", "player_crosswalk.csv")
+CROSSWALK_COLUMNS = ["player_key", "PLAYER_ID", "name_full", "PLAYER_NAME", "score", "matched_at"]
+
 
 def norm(text: str) -> str:
     cleaned = unidecode((text or "").lower())
@@ -16,31 +23,230 @@ def norm(text: str) -> str:
     return " ".join(cleaned.split())
 
 
+def _token_key(name: str) -> str:
+    # token_sort_ratio scores 100 exactly when the sorted tokens are equal.
+    return " ".join(sorted(name.split()))
+
+
 def build_index(nba_df: pd.DataFrame) -> Tuple[Sequence[str], dict]:
     keys = nba_df["PLAYER_NAME"].map(norm).tolist()
-    lookup = {
-        norm(row.PLAYER_NAME): idx
-        for idx, row in nba_df.reset_index().iterrows()
-    }
+    lookup = {key: idx for idx, key in enumerate(keys)}
     return keys, lookup
 
 
-def match(yahoo_df: pd.DataFrame, nba_df: pd.DataFrame, cutoff: int = 91) -> List[Tuple[str, int]]:
+def _exact_index(keys: Sequence[str]) -> Dict[str, str]:
+    exact: Dict[str, str] = {}
+    for key in keys:
+        exact.setdefault(_token_key(key), key)
+    return exact
+
+
+def _best_matches(
+    queries: Sequence[str],
+    choices: Sequence[str],
+    cutoff: int,
+    workers: int,
+) -> List[Optional[Tuple[int, float]]]:
+    """Score ``queries`` against ``choices`` in batched matrices.
+
+    Returns the first best choice position per query (the same tie-break as
+    ``process.extractOne``) or ``None`` when nothing reaches ``cutoff``.
+    """
+
+    # Only runs for names the crosswalk and exact pass left over.
+    from rapidfuzz import fuzz, process
+
+    best: List[Optional[Tuple[int, float]]] = []
+    if not choices:
+        return [None] * len(queries)
+    for start in range(0, len(queries), MATCH_CHUNK_ROWS):
+        scores = process.cdist(
+            queries[start : start + MATCH_CHUNK_ROWS],
+            choices,
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=cutoff,
+            dtype=np.float64,
+            workers=workers,
+        )
+        top = scores.argmax(axis=1)
+        top_scores = scores[np.arange(len(top)), top]
+        for pos, score in zip(top.tolist(), top_scores.tolist()):
+            best.append((pos, score) if score >= cutoff and score > 0 else None)
+    return best
+
+
+def _blocked_matches(
+    queries: Sequence[str],
+    keys: Sequence[str],
+    cutoff: int,
+    workers: int,
+) -> List[Optional[Tuple[int, float]]]:
+    """Score each query only against NBA names that share its last-name token."""
+
+    by_token: Dict[str, List[int]] = defaultdict(list)
+    for pos, key in enumerate(keys):
+        for token in set(key.split()):
+            by_token[token].append(pos)
+
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for qpos, query in enumerate(queries):
+        tokens = query.split()
+        blocks[tokens[-1] if tokens else ""].append(qpos)
+
+    best: List[Optional[Tuple[int, float]]] = [None] * len(queries)
+    for token, members in blocks.items():
+        candidates = by_token.get(token, [])
+        found = _best_matches(
+            [queries[q] for q in members], [keys[c] for c in candidates], cutoff, workers
+        )
+        for qpos, hit in zip(members, found):
+            if hit is not None:
+                best[qpos] = (candidates[hit[0]], hit[1])
+    return best
+
+
+def link_scores(
+    yahoo_df: pd.DataFrame,
+    nba_df: pd.DataFrame,
+    cutoff: int = 91,
+    blocking: bool = False,
+    workers: int = 1,
+) -> List[Tuple[str, int, float]]:
+    """Link Yahoo players to NBA rows, returning ``(player_key, nba_row_index, score)``.
+
+    Names go through three tiers: ``OVERRIDES``, an exact hash hit on the
+    normalized token set (score 100), then one batched RapidFuzz score
+    matrix for whatever is left. ``blocking`` restricts the fuzzy tier to NBA
+    names sharing the Yahoo last-name token, which is much cheaper on large
+    multi-season tables but can miss matches the full matrix would find.
+    ``workers`` is passed to RapidFuzz (``-1`` uses every core).
+    """
+
     keys, lookup = build_index(nba_df)
-    links: List[Tuple[str, int]] = []
-    for _, row in yahoo_df.iterrows():
-        name = row.get("name_full")
-        if not name:
+    exact = _exact_index(keys)
+    names = yahoo_df["name_full"].tolist() if "name_full" in yahoo_df.columns else []
+    player_keys = yahoo_df["player_key"].tolist() if names else []
+
+    resolved: List[Optional[Tuple[int, float]]] = [None] * len(names)
+    fuzzy_rows: List[int] = []
+    fuzzy_queries: List[str] = []
+    for row, name in enumerate(names):
+        if not name or not isinstance(name, str):
             continue
         override = OVERRIDES.get(name)
         if override:
             idx = lookup.get(norm(override))
             if idx is not None:
-                links.append((row["player_key"], idx))
+                resolved[row] = (idx, 100.0)
             continue
-        best = process.extractOne(norm(name), keys, scorer=fuzz.token_sort_ratio, score_cutoff=cutoff)
-        if best:
-            idx = lookup.get(best[0])
-            if idx is not None:
-                links.append((row["player_key"], idx))
-    return links
+        query = norm(name)
+        hit = exact.get(_token_key(query)) if query else None
+        if hit is not None:
+            resolved[row] = (lookup[hit], 100.0)
+        else:
+            fuzzy_rows.append(row)
+            fuzzy_queries.append(query)
+
+    if fuzzy_queries:
+        engine = _blocked_matches if blocking else _best_matches
+        for row, found in zip(fuzzy_rows, engine(fuzzy_queries, keys, cutoff, workers)):
+            if found is not None:
+                resolved[row] = (lookup[keys[found[0]]], found[1])
+
+    return [
+        (player_keys[row], hit[0], hit[1])
+        for row, hit in enumerate(resolved)
+        if hit is not None
+    ]
+
+
+def match(
+    yahoo_df: pd.DataFrame,
+    nba_df: pd.DataFrame,
+    cutoff: int = 91,
+    blocking: bool = False,
+    workers: int = 1,
+) -> List[Tuple[str, int]]:
+    return [
+        (player_key, idx)
+        for player_key, idx, _ in link_scores(yahoo_df, nba_df, cutoff, blocking, workers)
+    ]
+
+
+def load_crosswalk(path: str = CROSSWALK_PATH) -> pd.DataFrame:
+    """Read the persisted Yahoo ``player_key`` to NBA ``PLAYER_ID`` crosswalk."""
+
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=CROSSWALK_COLUMNS)
+    crosswalk = pd.read_csv(path, dtype={"player_key": str})
+    return crosswalk.reindex(columns=CROSSWALK_COLUMNS)
+
+
+def save_crosswalk(crosswalk: pd.DataFrame, path: str = CROSSWALK_PATH) -> None:
+    tmp = f"{path}.tmp"
+    crosswalk[CROSSWALK_COLUMNS].sort_values("player_key").to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def match_with_crosswalk(
+    yahoo_df: pd.DataFrame,
+    nba_df: pd.DataFrame,
+    crosswalk: pd.DataFrame,
+    cutoff: int = 91,
+    blocking: bool = False,
+    workers: int = 1,
+) -> Tuple[List[Tuple[str, int]], pd.DataFrame]:
+    """Link players through the crosswalk first and fuzzy-match only the rest.
+
+    A crosswalk entry is used when its ``PLAYER_ID`` is present in ``nba_df``
+    and the Yahoo name has no entry in ``OVERRIDES`` (overrides always win).
+    Every other player goes through :func:`link_scores`; new links are added
+    to the returned crosswalk with their score and a UTC timestamp, replacing
+    any stale entry for the same ``player_key``.
+    """
+
+    row_by_id = {pid: idx for idx, pid in enumerate(nba_df["PLAYER_ID"].tolist())}
+    known = dict(zip(crosswalk["player_key"].tolist(), crosswalk["PLAYER_ID"].tolist()))
+
+    resolved: Dict[str, int] = {}
+    pending: List[int] = []
+    for row, (player_key, name) in enumerate(
+        zip(yahoo_df["player_key"].tolist(), yahoo_df["name_full"].tolist())
+    ):
+        pid = known.get(player_key)
+        if name not in OVERRIDES and pid is not None and pid in row_by_id:
+            resolved[player_key] = row_by_id[pid]
+        else:
+            pending.append(row)
+
+    new_links = link_scores(yahoo_df.iloc[pending], nba_df, cutoff, blocking, workers)
+    stamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    names = dict(zip(yahoo_df["player_key"].tolist(), yahoo_df["name_full"].tolist()))
+    additions = pd.DataFrame(
+        [
+            {
+                "player_key": player_key,
+                "PLAYER_ID": nba_df["PLAYER_ID"].iat[idx],
+                "name_full": names.get(player_key),
+                "PLAYER_NAME": nba_df["PLAYER_NAME"].iat[idx],
+                "score": score,
+                "matched_at": stamp,
+            }
+            for player_key, idx, score in new_links
+        ],
+        columns=CROSSWALK_COLUMNS,
+    )
+    for player_key, idx, _ in new_links:
+        resolved[player_key] = idx
+
+    kept = crosswalk[~crosswalk["player_key"].isin(additions["player_key"])]
+    updated = pd.concat([df for df in (kept, additions) if not df.empty], ignore_index=True)
+    if updated.empty:
+        updated = pd.DataFrame(columns=CROSSWALK_COLUMNS)
+
+    links = [
+        (player_key, resolved[player_key])
+        for player_key in yahoo_df["player_key"].tolist()
+        if player_key in resolved
+    ]
+    return links, updated
@@ -0,0 +1,217 @@
+import contextvars
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak memory is reported as None
+    resource = None
+
+log = logging.getLogger("yfs")
+
+REPORT_PATH = os.environ.get("IRONMAN_METRICS_REPORT", "ironmen_rankings.metrics.json")
+HISTORY_PATH = os.environ.get("IRONMAN_METRICS_HISTORY", "run_metrics.jsonl")
+
+# Counter dicts of the stages open in the current context; see RunMetrics.stage.
+_ACTIVE_STAGES: contextvars.ContextVar[tuple] = contextvars.ContextVar("metrics_stages", default=())
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MiB."""
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident set size in MiB (Linux only; ``None`` elsewhere)."""
+
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as fh:
+            pages = int(fh.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+def process_age_s() -> Optional[float]:
+    """Seconds since this process started (Linux only; ``None`` elsewhere).
+
+    Taken at the top of ``main`` this is the interpreter plus import cost, i.e.
+    the startup time a short-lived cron container pays before any work.
+    """
+
+    try:
+        with open("/proc/self/stat", "r", encoding="ascii") as fh:
+            # Field 22 (starttime, in clock ticks since boot); the command name
+            # in field 2 may contain spaces, so count from its closing paren.
+            started = int(fh.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r", encoding="ascii") as fh:
+            uptime = float(fh.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(max(uptime - started / os.sysconf("SC_CLK_TCK"), 0.0), 3)
+
+
+class StageRecord:
+    """Mutable handle yielded by :meth:`RunMetrics.stage` for row counts and notes."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.rows_in: Optional[int] = None
+        self.rows_out: Optional[int] = None
+        self.notes: Dict[str, Any] = {}
+
+
+class RunMetrics:
+    """Thread-safe counters plus per-stage wall/CPU/memory timings for one run.
+
+    Code anywhere in the pipeline bumps named counters (``http.requests``,
+    ``yahoo.retries``, ``cache.yahoo.hits`` ...). Each :meth:`stage` block
+    records its wall and process CPU time, its offset from the run start, the
+    counters bumped inside it and the process current and peak RSS at its end.
+    Counters are attributed through a context variable, so stages running
+    concurrently on different threads each see only their own traffic; work
+    fanned out to worker threads must go through :class:`StagePool` to count
+    toward its stage. Process CPU time covers every thread, so overlapping
+    stages share it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.run_id = uuid.uuid4().hex[:12]
+            self.started_at = time.time()
+            self._wall0 = time.perf_counter()
+            self._cpu0 = time.process_time()
+            self.counters: Dict[str, float] = {}
+            self.stages: List[Dict[str, Any]] = []
+
+    def count(self, name: str, amount: float = 1) -> None:
+        active = _ACTIVE_STAGES.get()
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+            for counters in active:
+                counters[name] = counters.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self.counters)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        record = StageRecord(name)
+        counters: Dict[str, float] = {}
+        token = _ACTIVE_STAGES.set(_ACTIVE_STAGES.get() + (counters,))
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        status = "ok"
+        try:
+            yield record
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+            _ACTIVE_STAGES.reset(token)
+            with self._lock:
+                delta = {key: round(value, 6) for key, value in sorted(counters.items()) if value}
+            entry = {
+                "stage": name,
+                "status": status,
+                "start_s": round(wall0 - self._wall0, 4),
+                "wall_s": round(wall, 4),
+                "cpu_s": round(cpu, 4),
+                "rows_in": record.rows_in,
+                "rows_out": record.rows_out,
+                "rss_mb": rss_mb(),
+                "peak_rss_mb": peak_rss_mb(),
+                "counters": delta,
+                **record.notes,
+            }
+            with self._lock:
+                self.stages.append(entry)
+            log.info(
+                "Stage %s %s in %.3fs wall / %.3fs cpu (%s)", name, status, wall, cpu, delta or "no I/O"
+            )
+
+    def report(self, **extra: Any) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "run_id": self.run_id,
+                "started_at": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(
+                    timespec="seconds"
+                ),
+                "wall_s": round(time.perf_counter() - self._wall0, 4),
+                "cpu_s": round(time.process_time() - self._cpu0, 4),
+                "peak_rss_mb": peak_rss_mb(),
+                "python": platform.python_version(),
+                **extra,
+                "counters": dict(sorted(self.counters.items())),
+                "stages": list(self.stages),
+            }
+
+    def write(
+        self,
+        path: str | Path = REPORT_PATH,
+        history: str | Path | None = HISTORY_PATH,
+        **extra: Any,
+    ) -> Dict[str, Any]:
+        """Write the report as JSON and append it as one line to ``history``."""
+
+        report = self.report(**extra)
+        target = Path(path)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp, target)
+        if history:
+            with open(history, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(report, separators=(",", ":")) + "\n")
+        return report
+
+
+METRICS = RunMetrics()
+
+
+class StagePool(ThreadPoolExecutor):
+    """``ThreadPoolExecutor`` whose tasks count toward the submitting thread's stage."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def summary_lines(report: Dict[str, Any]) -> List[str]:
+    """Human-readable per-stage table for the end-of-run printout."""
+
+    lines = [
+        f"{'stage':<14} {'start s':>8} {'wall s':>8} {'cpu s':>8} {'reqs':>6} {'MiB in':>8} {'rows':>7} "
+        f"{'frame MiB':>9} {'RSS MiB':>8}"
+    ]
+    for entry in report["stages"]:
+        counters = entry["counters"]
+        requests = counters.get("http.requests", 0) + counters.get("nba.requests", 0)
+        mib = (counters.get("http.bytes", 0) + counters.get("nba.bytes", 0)) / (1024 * 1024)
+        rows = entry["rows_out"] if entry["rows_out"] is not None else ""
+        frame = f"{entry['frame_mb']:.2f}" if entry.get("frame_mb") is not None else ""
+        rss = f"{entry['rss_mb']:.0f}" if entry.get("rss_mb") is not None else ""
+        lines.append(
+            f"{entry['stage']:<14} {entry.get('start_s', 0):>8.2f} {entry['wall_s']:>8.2f} {entry['cpu_s']:>8.2f} "
+            f"{int(requests):>6} {mib:>8.2f} {rows:>7} {frame:>9} {rss:>8}"
+        )
+    return lines
@@ -1,11 +1,54 @@
+import os
+import time
 from collections.abc import Sequence
+from datetime import date
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
-from nba_api.stats.endpoints import leaguedashplayerstats
+
+from cache import CACHE, DAY, HOUR
+from colstore import has_columns, read_columns, write_columns
+from compact import compact_frame
+from metrics import METRICS, StagePool
 
 
 DEFAULT_SEASON = "2024-25"
+COMPLETED_SEASON_TTL = 365 * DAY
+CURRENT_SEASON_TTL = 6 * HOUR
+SEASON_FETCH_WORKERS = 4
+SEASON_STORE_DIR = os.environ.get("NBA_SEASON_STORE", "nba_seasons")
+
+
+def season_completed(season: str, today: date | None = None) -> bool:
+    """A season is final once the July after its end year has started."""
+
+    today = today or date.today()
+    return today >= date(int(season[:4]) + 1, 7, 1)
+
+
+def _fetch_season(season: str) -> pd.DataFrame:
+    params = {
+        "season": season,
+        "per_mode_detailed": "Totals",
+        "season_type_all_star": "Regular Season",
+    }
+
+    def load() -> dict:
+        # nba_api loads every endpoint module on import; only pay for it on a cache miss.
+        from nba_api.stats.endpoints import leaguedashplayerstats
+
+        started = time.perf_counter()
+        result = leaguedashplayerstats.LeagueDashPlayerStats(**params)
+        METRICS.count("nba.requests")
+        METRICS.count("nba.seconds", time.perf_counter() - started)
+        METRICS.count("nba.bytes", len(result.nba_response.get_response() or ""))
+        # to_json would round floats to 10 decimals; json keeps every digit.
+        return result.get_data_frames()[0].to_dict(orient="split", index=False)
+
+    ttl = COMPLETED_SEASON_TTL if season_completed(season) else CURRENT_SEASON_TTL
+    payload = CACHE.fetch("nba", "leaguedashplayerstats", params, ttl, load)
+    return pd.DataFrame(payload["data"], columns=payload["columns"])
 
 
 def _ensure_list(seasons: Sequence[str] | str) -> list[str]:
@@ -14,7 +57,68 @@ def _ensure_list(seasons: Sequence[str] | str) -> list[str]:
     return list(seasons)
 
 
-def pull_totals(seasons: Sequence[str] | str = DEFAULT_SEASON) -> pd.DataFrame:
+KEEP_COLUMNS = [
+    "SEASON_ID",
+    "PLAYER_ID",
+    "PLAYER_NAME",
+    "TEAM_ID",
+    "TEAM_ABBREVIATION",
+    "GP",
+    "MIN",
+    "PTS",
+    "REB",
+    "AST",
+    "STL",
+    "BLK",
+    "TOV",
+    "FG_PCT",
+    "FG3_PCT",
+    "FT_PCT",
+    "FG3M",
+    "DD2",
+]
+PER_GAME_STATS = ["PTS", "REB", "AST", "STL", "BLK", "FG3M", "TOV"]
+
+
+def _season_totals(season: str) -> pd.DataFrame:
+    frame = _fetch_season(season)
+    if "SEASON_ID" not in frame.columns:
+        frame["SEASON_ID"] = str(season)
+    if "TEAM_ID" not in frame.columns:
+        frame["TEAM_ID"] = pd.NA
+    missing_columns = [col for col in KEEP_COLUMNS if col not in frame.columns]
+    for col in missing_columns:
+        frame[col] = pd.NA
+    frame = frame[KEEP_COLUMNS].copy()
+    frame["SEASON_ID"] = frame["SEASON_ID"].astype(str)
+    return frame
+
+
+def _derive_per_game(frame: pd.DataFrame) -> pd.DataFrame:
+    gp_numeric = pd.to_numeric(frame["GP"], errors="coerce")
+    gp_nonzero = gp_numeric.replace(0, np.nan)
+    for stat in PER_GAME_STATS:
+        stat_numeric = pd.to_numeric(frame[stat], errors="coerce")
+        frame[f"{stat}_PG"] = stat_numeric.div(gp_nonzero).fillna(0.0)
+
+    dd2_numeric = pd.to_numeric(frame["DD2"], errors="coerce")
+    frame["DD2"] = dd2_numeric.fillna(0.0)
+    frame["DD2_PG"] = dd2_numeric.div(gp_nonzero).fillna(0.0)
+
+    frame["FG3_PCT"] = pd.to_numeric(frame["FG3_PCT"], errors="coerce").fillna(0.0)
+    return frame
+
+
+def _season_path(season: str, store_dir: str) -> Path:
+    return Path(store_dir) / season
+
+
+def pull_totals(
+    seasons: Sequence[str] | str = DEFAULT_SEASON,
+    workers: int = SEASON_FETCH_WORKERS,
+    store_dir: str | None = SEASON_STORE_DIR,
+    compact: bool = False,
+) -> pd.DataFrame:
     """Fetch regular-season totals for one or more seasons.
 
     Parameters
@@ -24,73 +128,44 @@ def pull_totals(seasons: Sequence[str] | str = DEFAULT_SEASON) -> pd.DataFrame:
         seasons. When multiple seasons are provided, the returned DataFrame is
         stacked with a `SEASON_ID` column indicating which campaign each row
         belongs to.
+    workers
+        Maximum number of seasons requested from stats.nba.com at once.
+    store_dir
+        Directory holding completed seasons as memory-mapped column files
+        (see :mod:`colstore`). Completed seasons are read from here and only
+        fetched once; the in-progress season is always refetched. ``None``
+        disables the store.
+    compact
+        Return categorical season/team labels, int16 GP and float32 stats
+        (see :func:`compact.compact_frame`). The season store is unaffected.
     """
 
-    frames: list[pd.DataFrame] = []
-    for season in _ensure_list(seasons):
-        result = leaguedashplayerstats.LeagueDashPlayerStats(
-            season=season,
-            per_mode_detailed="Totals",
-            season_type_all_star="Regular Season",
-        )
-        df = result.get_data_frames()[0]
-        keep = [
-            "SEASON_ID",
-            "PLAYER_ID",
-            "PLAYER_NAME",
-            "TEAM_ID",
-            "TEAM_ABBREVIATION",
-            "GP",
-            "MIN",
-            "PTS",
-            "REB",
-            "AST",
-            "STL",
-            "BLK",
-            "TOV",
-            "FG_PCT",
-            "FG3_PCT",
-            "FT_PCT",
-            "FG3M",
-            "DD2",
-        ]
-        frame = df.copy()
-        if "SEASON_ID" not in frame.columns:
-            frame["SEASON_ID"] = str(season)
-        if "TEAM_ID" not in frame.columns:
-            frame["TEAM_ID"] = pd.NA
-        missing_columns = [col for col in keep if col not in frame.columns]
-        for col in missing_columns:
-            frame[col] = pd.NA
-        frame = frame[keep].copy()
-        frame["SEASON_ID"] = frame["SEASON_ID"].astype(str)
-
-        gp_numeric = pd.to_numeric(frame["GP"], errors="coerce")
-        gp_nonzero = gp_numeric.replace(0, np.nan)
-        per_game_stats = ["PTS", "REB", "AST", "STL", "BLK", "FG3M", "TOV"]
-        for stat in per_game_stats:
-            stat_numeric = pd.to_numeric(frame[stat], errors="coerce")
-            per_game = stat_numeric.div(gp_nonzero)
-            frame[f"{stat}_PG"] = per_game.fillna(0.0)
-
-        if "DD2" in frame.columns:
-            dd2_numeric = pd.to_numeric(frame["DD2"], errors="coerce")
-            frame["DD2"] = dd2_numeric.fillna(0.0)
-            dd2_per_game = dd2_numeric.div(gp_nonzero)
-            frame["DD2_PG"] = dd2_per_game.fillna(0.0)
+    season_list = _ensure_list(seasons)
+    frames: dict[str, pd.DataFrame] = {}
+    to_fetch = []
+    for season in season_list:
+        path = _season_path(season, store_dir) if store_dir else None
+        if path is not None and season_completed(season) and has_columns(path):
+            frames[season] = read_columns(path)
+            METRICS.count("nba.seasons_from_store")
         else:
-            frame["DD2"] = 0.0
-            frame["DD2_PG"] = 0.0
-
-        frame["FG3_PCT"] = (
-            pd.to_numeric(frame.get("FG3_PCT"), errors="coerce").fillna(0.0)
-        )
+            to_fetch.append(season)
 
-        frames.append(frame)
+    if to_fetch:
+        with StagePool(max_workers=max(1, min(int(workers), len(to_fetch)))) as pool:
+            for season, frame in zip(to_fetch, pool.map(_season_totals, to_fetch)):
+                frames[season] = frame
+                METRICS.count("nba.seasons_fetched")
+                if store_dir and season_completed(season):
+                    write_columns(_season_path(season, store_dir), frame)
 
-    combined = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    ordered = [frames[season] for season in season_list]
+    combined = pd.concat(ordered, ignore_index=True) if ordered else pd.DataFrame()
     if not combined.empty:
+        combined = _derive_per_game(combined)
         combined["SEASON_START_YEAR"] = pd.to_numeric(
             combined["SEASON_ID"].str.slice(0, 4), errors="coerce"
         ).astype("Int64")
+        if compact:
+            combined = compact_frame(combined)
     return combined
@@ -0,0 +1,111 @@
+import os
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+from availability import MEDIAN_GP_SHARE, WEIGHTED_GP_SHARE
+
+GP_PROJECTION = os.environ.get("IRONMAN_GP_PROJECTION", "").lower() in ("1", "true", "yes")
+PROJECTION_SIMS = int(os.environ.get("IRONMAN_PROJECTION_SIMS", "10000"))
+PROJECTION_SEED = int(os.environ.get("IRONMAN_PROJECTION_SEED", "0"))
+SEASON_GAMES = 82
+PROJECTION_PERCENTILES = (10, 50, 90)
+# P(GP >= threshold); 65 games is the NBA's awards eligibility line.
+GP_THRESHOLDS = (50, 65)
+# Bounds on the season-to-season correlation of games played. The floor keeps
+# one-season or unusually steady players from getting binomial-tight bands;
+# the cap keeps both beta parameters away from zero.
+MIN_GP_DISPERSION = 0.05
+MAX_GP_DISPERSION = 0.95
+# Appended to the rankings CSV with --gp-projection.
+PROJECTION_COLUMNS = [
+    *(f"GP_P{q}" for q in PROJECTION_PERCENTILES),
+    *(f"P_GP{games}" for games in GP_THRESHOLDS),
+]
+
+
+def fit_gp_distribution(
+    availability: pd.DataFrame, season_games: int = SEASON_GAMES
+) -> tuple[np.ndarray, np.ndarray]:
+    """Beta-binomial ``(alpha, beta)`` per player from the availability metrics.
+
+    The mean is the durability anchor (recency-weighted GP blended with the
+    median GP, before the variance penalty) and the spread is ``GP_Variance``
+    across the season stack, matched by the method of moments. Players
+    without an anchor come back NaN.
+    """
+
+    weighted = availability["Weighted_GP"].to_numpy(dtype=float)
+    median = availability["GP_Median"].to_numpy(dtype=float)
+    variance = availability["GP_Variance"].to_numpy(dtype=float)
+    anchor = weighted * WEIGHTED_GP_SHARE + median * MEDIAN_GP_SHARE
+    rate = np.clip(anchor, 0.5, season_games - 0.5) / season_games
+    binomial_var = season_games * rate * (1.0 - rate)
+    dispersion = (np.nan_to_num(variance) / binomial_var - 1.0) / (season_games - 1)
+    dispersion = np.clip(dispersion, MIN_GP_DISPERSION, MAX_GP_DISPERSION)
+    total = 1.0 / dispersion - 1.0
+    return rate * total, (1.0 - rate) * total
+
+
+def beta_binomial_pmf(alpha: np.ndarray, beta: np.ndarray, season_games: int = SEASON_GAMES) -> np.ndarray:
+    """Probabilities of 0..``season_games`` games played, one row per player.
+
+    Built from the ratio of consecutive terms, so it needs no gamma function;
+    NaN parameters give NaN rows.
+    """
+
+    games = np.arange(season_games)
+    a, b = alpha[:, None], beta[:, None]
+    with np.errstate(invalid="ignore"):
+        ratios = (season_games - games) / (games + 1) * (games + a) / (season_games - games - 1 + b)
+        log_pmf = np.concatenate([np.zeros((len(alpha), 1)), np.cumsum(np.log(ratios), axis=1)], axis=1)
+        pmf = np.exp(log_pmf - log_pmf.max(axis=1, keepdims=True))
+    return pmf / pmf.sum(axis=1, keepdims=True)
+
+
+def simulate_gp(
+    pmf: np.ndarray, sims: int = PROJECTION_SIMS, seed: int = PROJECTION_SEED
+) -> np.ndarray:
+    """Games-played tallies from ``sims`` simulated seasons per player.
+
+    A season's games played can only take ``season_games + 1`` values, so the
+    tally of ``sims`` independent draws is itself one multinomial draw over
+    those outcomes. Sampling the tallies directly gives the same distribution
+    as drawing every season and counting, for every player at once, without
+    a players x sims matrix. Rows of ``pmf`` containing NaN tally to zero.
+    """
+
+    valid = ~np.isnan(pmf).any(axis=1)
+    counts = np.zeros(pmf.shape, dtype=np.int64)
+    counts[valid] = np.random.default_rng(seed).multinomial(sims, pmf[valid])
+    return counts
+
+
+def gp_projections(
+    availability: pd.DataFrame,
+    sims: int = PROJECTION_SIMS,
+    seed: int = PROJECTION_SEED,
+    percentiles: Sequence[int] = PROJECTION_PERCENTILES,
+    thresholds: Sequence[int] = GP_THRESHOLDS,
+    season_games: int = SEASON_GAMES,
+) -> pd.DataFrame:
+    """Monte Carlo games-played percentiles and threshold odds per player.
+
+    Percentiles are read off each player's cumulative tally (the smallest GP
+    reaching the share), so nothing is sorted; the same ``seed`` and
+    availability frame always give the same projections.
+    """
+
+    alpha, beta = fit_gp_distribution(availability, season_games)
+    counts = simulate_gp(beta_binomial_pmf(alpha, beta, season_games), sims, seed)
+    cumulative = counts.cumsum(axis=1)
+    simulated = cumulative[:, -1] > 0
+    out = {"PLAYER_ID": availability["PLAYER_ID"].to_numpy()}
+    for q in percentiles:
+        gp = (cumulative < q / 100 * sims).sum(axis=1).astype(float)
+        out[f"GP_P{q}"] = np.where(simulated, gp, np.nan)
+    for games in thresholds:
+        share = (sims - cumulative[:, games - 1]) / sims if games > 0 else np.ones(len(counts))
+        out[f"P_GP{games}"] = np.where(simulated, share, np.nan)
+    return pd.DataFrame(out)
@@ -0,0 +1,174 @@
+import email.utils
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+log = logging.getLogger("yfs")
+
+MAX_RETRY_AFTER = 120.0
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP-date)."""
+
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = when.timestamp() - (now if now is not None else datetime.now(timezone.utc).timestamp())
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class AdaptiveLimiter:
+    """Token bucket plus an AIMD concurrency window shared by every caller.
+
+    ``rate`` tokens per second refill a bucket of ``burst`` tokens; each
+    request takes one. ``rate=None`` leaves the bucket off until the first
+    throttle, which sets it to half the success rate observed in the seconds
+    just before (or leaves it off when there is too little history).
+    At most ``floor(window)`` requests are in flight. A successful response
+    grows the window by ``1/window`` (about +1 per full window) and the rate
+    by ``rate_step/rate`` (about +``rate_step`` per second at that rate). A throttle response (429/999) halves both, at most once
+    per ``cooldown``, and when the server sent ``Retry-After`` holds every
+    caller until that moment. All state sits behind one condition variable.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        min_rate: float = 0.5,
+        burst: float = 10.0,
+        window: float = 4.0,
+        max_window: float = 16.0,
+        rate_step: float = 0.5,
+        cooldown: float = 1.0,
+        clock=time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.window = window
+        self.max_window = max_window
+        self.rate_step = rate_step
+        self.cooldown = cooldown
+        self._clock = clock
+        self._tokens = burst
+        self._stamp = clock()
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._cut_until = 0.0
+        self._succeeded: deque = deque(maxlen=64)
+        self._cond = threading.Condition()
+        self.throttles = 0
+        self.waited = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self.rate is None:
+            self._stamp = now
+            return
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def _delay(self, now: float) -> float:
+        """Seconds until a slot may open, or 0 if one is available now."""
+
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._in_flight >= max(1, int(self.window)):
+            return 0.05  # woken early by release()
+        if self.rate is not None and self._tokens < 1.0:
+            return (1.0 - self._tokens) / self.rate
+        return 0.0
+
+    def acquire(self) -> None:
+        started = self._clock()
+        with self._cond:
+            while True:
+                now = self._clock()
+                self._refill(now)
+                delay = self._delay(now)
+                if delay <= 0:
+                    if self.rate is not None:
+                        self._tokens -= 1.0
+                    self._in_flight += 1
+                    break
+                self._cond.wait(delay)
+            self.waited += self._clock() - started
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._succeeded.append(self._clock())
+            self.window = min(self.max_window, self.window + 1.0 / max(self.window, 1.0))
+            if self.rate is not None:
+                self.rate += self.rate_step / max(self.rate, 1.0)
+                if self.max_rate is not None:
+                    self.rate = min(self.max_rate, self.rate)
+            self._cond.notify()
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        with self._cond:
+            now = self._clock()
+            self.throttles += 1
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            # Requests already in flight when we cut will report their own
+            # throttles; count one decrease per cooldown, as TCP does per RTT.
+            if now < self._cut_until:
+                return
+            self._cut_until = now + max(retry_after or 0.0, self.cooldown)
+            self.window = max(1.0, self.window / 2)
+            current = self.rate or self._observed_rate(now)
+            if current is not None:
+                self.rate = max(self.min_rate, current / 2)
+            self._tokens = min(self._tokens, 0.0)
+            log.warning(
+                "Throttled by Yahoo; window=%.1f rate=%s/s retry_after=%s",
+                self.window,
+                f"{self.rate:.2f}" if self.rate is not None else "unlimited",
+                retry_after,
+            )
+
+    def _observed_rate(self, now: float, horizon: float = 5.0) -> Optional[float]:
+        """Successful requests per second over the last ``horizon`` seconds (lock held)."""
+
+        recent = [stamp for stamp in self._succeeded if now - stamp <= horizon]
+        if len(recent) < 2 or recent[-1] <= recent[0]:
+            return None
+        return (len(recent) - 1) / (recent[-1] - recent[0])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "rate": round(self.rate, 2) if self.rate is not None else None,
+                "window": round(self.window, 2),
+                "in_flight": self._in_flight,
+                "throttles": self.throttles,
+                "waited_s": round(self.waited, 3),
+            }
@@ -1,18 +1,76 @@
-import json
+import argparse
+import os
 from collections.abc import Sequence
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import partial
 from pathlib import Path
 
-import numpy as np
 import pandas as pd
 
-from extract import draft_analysis, game_key, players
+from availability import AVAILABILITY_WEIGHTS, DURABILITY_PENALTY_FACTOR, build_availability_metrics
+from extract import (
+    DRAFT_COLUMNS,
+    PLAYER_COLUMNS,
+    draft_arrays,
+    draft_columns,
+    empty_columns,
+    game_key,
+    player_columns,
+    player_count,
+    player_draft_columns,
+)
+from cache import CACHE
+from checkpoint import CHECKPOINT_DIR, FetchJournal, StageStore, fingerprint
+from compact import LOW_MEMORY, compact_frame, frame_mb
+from export import export_rankings
+from gamelogs import (
+    GAME_LOGS,
+    GAMELOG_STORE_DIR,
+    RECENT_ABSENCE_DAYS,
+    absence_metrics,
+    load_game_logs,
+)
 from ironman import compute
-from match import match
-from nba_pull import DEFAULT_SEASON, pull_totals
-from yfs import get, log
+from match import OVERRIDES, load_crosswalk, match_with_crosswalk, save_crosswalk
+from metrics import HISTORY_PATH, METRICS, REPORT_PATH, StagePool, process_age_s, summary_lines
+from nba_pull import (
+    COMPLETED_SEASON_TTL,
+    CURRENT_SEASON_TTL,
+    DEFAULT_SEASON,
+    SEASON_STORE_DIR,
+    pull_totals,
+    season_completed,
+)
+from projection import (
+    GP_PROJECTION,
+    GP_THRESHOLDS,
+    PROJECTION_COLUMNS,
+    PROJECTION_PERCENTILES,
+    PROJECTION_SEED,
+    PROJECTION_SIMS,
+    SEASON_GAMES,
+    gp_projections,
+)
+from scheduler import StageGraph
+from yfs import (
+    HTTP,
+    LIMITER,
+    TOKENS,
+    ApiError,
+    cache_ttl,
+    client_credentials,
+    configure_logging,
+    get,
+    log,
+)
 RECENT_SEASON_COUNT = 3
-AVAILABILITY_WEIGHTS = (0.60, 0.30, 0.10)
-DURABILITY_PENALTY_FACTOR = 0.05
+PLAYER_PAGE_SIZE = 25
+PLAYER_FETCH_WORKERS = 8
+DRAFT_BATCH_SIZE = 20
+DRAFT_FETCH_WORKERS = 8
+# Ask for draft analysis on every player page instead of in separate
+# player_keys= chunks afterwards (--combined-fetch).
+COMBINED_FETCH = os.environ.get("IRONMAN_COMBINED_FETCH", "").lower() in ("1", "true", "yes")
 
 
 def recent_seasons(latest: str, count: int = RECENT_SEASON_COUNT) -> list[str]:
@@ -24,97 +82,23 @@ def recent_seasons(latest: str, count: int = RECENT_SEASON_COUNT) -> list[str]:
     return seasons
 
 
-def build_availability_metrics(
-    nba_df: pd.DataFrame,
-    weights: Sequence[float] = AVAILABILITY_WEIGHTS,
-    penalty_factor: float = DURABILITY_PENALTY_FACTOR,
-) -> pd.DataFrame:
-    if nba_df.empty:
-        return pd.DataFrame(
-            columns=
-            [
-                "PLAYER_ID",
-                "Weighted_GP",
-                "GP_Median",
-                "GP_Variance",
-                "Durability_Composite",
-                "Durability_Penalty",
-                "Seasons_Weighted",
-                "Seasons_Total",
-            ]
-        )
-
-    records = []
-    base_weights = np.asarray(weights, dtype=float)
-    if base_weights.ndim != 1 or base_weights.size == 0:
-        raise ValueError("weights must be a non-empty 1D sequence")
-
-    for player_id, group in nba_df.groupby("PLAYER_ID"):
-        ordered = group.sort_values(
-            ["SEASON_START_YEAR", "SEASON_ID"], ascending=[False, False], na_position="last"
-        )
-        gp_all = pd.to_numeric(ordered["GP"], errors="coerce").fillna(0.0)
-        if gp_all.empty:
-            total_seasons = 0
-            median_gp = 0.0
-            variance_gp = 0.0
-        else:
-            total_seasons = int(gp_all.count())
-            median_gp = float(gp_all.median())
-            variance_gp = float(gp_all.var(ddof=0))
-
-        considered = ordered.head(base_weights.size)
-        gp_considered = pd.to_numeric(considered["GP"], errors="coerce").fillna(0.0).to_numpy()
-        seasons_used = considered["SEASON_ID"].tolist()
-        weights_used = base_weights[: gp_considered.size]
-        if weights_used.size == 0:
-            weighted_gp = 0.0
-            seasons_weighted = 0
-        else:
-            weight_sum = weights_used.sum()
-            if weight_sum == 0:
-                weights_norm = np.full_like(weights_used, 1 / weights_used.size)
-            else:
-                weights_norm = weights_used / weight_sum
-            weighted_gp = float(np.dot(gp_considered, weights_norm))
-            seasons_weighted = int(weights_used.size)
-
-        availability_anchor = (weighted_gp * 0.7) + (median_gp * 0.3)
-        stability_penalty = variance_gp * penalty_factor
-        durability_composite = max(availability_anchor - stability_penalty, 0.0)
-
-        records.append(
-            {
-                "PLAYER_ID": player_id,
-                "Weighted_GP": weighted_gp,
-                "GP_Median": median_gp,
-                "GP_Variance": variance_gp,
-                "Durability_Composite": durability_composite,
-                "Durability_Penalty": stability_penalty,
-                "Seasons_Weighted": seasons_weighted,
-                "Seasons_Total": total_seasons,
-                "Seasons_Used": ",".join(seasons_used),
-            }
-        )
-
-    return pd.DataFrame.from_records(records)
-
-
-TOK_PATH = Path("oauth2.json")
-
-
 def bearer() -> str:
+    """Check the OAuth client credentials and token file before any online work."""
+
     try:
-        with TOK_PATH.open("r", encoding="utf-8") as fh:
-            return json.load(fh)["access_token"]
+        client_credentials()
+    except ApiError as exc:
+        raise SystemExit(str(exc)) from exc
+    try:
+        return TOKENS.access_token()
     except FileNotFoundError as exc:
-        raise SystemExit("oauth2.json not found. Run auth_init.py first.") from exc
+        raise SystemExit(f"{TOKENS.path} not found. Run auth_init.py first.") from exc
     except KeyError as exc:
-        raise SystemExit("oauth2.json missing access_token") from exc
+        raise SystemExit(f"{TOKENS.path} missing access_token") from exc
 
 
 def get_gamekey() -> str:
-    data = get("/game/nba", bearer())
+    data = get("/game/nba")
     gk = game_key(data)
     if not gk:
         raise SystemExit("Failed to resolve game_key from /game/nba")
@@ -122,40 +106,189 @@ def get_gamekey() -> str:
     return gk
 
 
-def get_all_players(gamekey: str) -> pd.DataFrame:
-    print("Pulling Yahoo player list in batches of 25...")
-    log.info("Fetching Yahoo player list in batches of 25")
-    rows = []
-    start = 0
-    while True:
-        data = get(f"/game/{gamekey}/players;start={start};count=25", bearer())
-        batch = players(data)
-        if not batch:
-            print("No additional players returned; finished fetching Yahoo roster.")
-            log.debug("No player batch returned at start=%d; stopping", start)
-            break
-        print(f"Fetched {len(batch)} players at offset {start}")
-        log.debug("Fetched %d players at start=%d", len(batch), start)
-        rows.extend(batch)
-        start += 25
-    df = pd.DataFrame(rows).drop_duplicates(subset=["player_key"])
+def _fetch_player_page(
+    gamekey: str, start: int, journal: FetchJournal | None = None, with_draft: bool = False
+) -> tuple[int, dict[str, list], dict[str, list] | None, int]:
+    saved = journal.get(str(start)) if journal is not None else None
+    if saved is not None:
+        return start, saved["columns"], saved.get("draft"), saved["count"]
+    path = f"/game/{gamekey}/players;start={start};count={PLAYER_PAGE_SIZE}"
+    if with_draft:
+        data = get(f"{path}/draft_analysis")
+        batch, draft = player_draft_columns(data)
+    else:
+        data = get(path)
+        batch, draft = player_columns(data), None
+    count = player_count(data)
+    count = len(batch["player_key"]) if count is None else count
+    if journal is not None:
+        entry = {"columns": batch, "count": count}
+        if draft is not None:
+            entry["draft"] = draft
+        journal.record(str(start), entry)
+    return start, batch, draft, count
+
+
+def _walk_player_pages(
+    gamekey: str,
+    workers: int,
+    journal: FetchJournal | None,
+    with_draft: bool,
+    expected: int | None = None,
+) -> list[tuple[dict[str, list], dict[str, list] | None]]:
+    """Fetch player pages up to the roster's final page; returns them in offset order.
+
+    Pages are requested through a sliding window of up to ``workers``
+    concurrent calls. Yahoo does not expose a total player count, so the
+    per-page ``count`` is used instead: the first short page marks the end of
+    the roster, no further offsets are scheduled and queued pages past it are
+    cancelled. ``expected`` (the previous roster size) narrows the window near
+    the end: offsets at or beyond it are probed one page at a time, so a
+    roster of unchanged size costs one trailing request rather than a full
+    window of empty ones. Pages already recorded in ``journal`` (from an
+    interrupted run) are replayed instead of refetched.
+    """
+
+    pages: dict[int, tuple[dict[str, list], dict[str, list] | None]] = {}
+    errors: dict[int, Exception] = {}
+    last_start: int | None = None
+    next_start = 0
+    with StagePool(max_workers=workers) as pool:
+        pending: dict = {}
+
+        def can_schedule() -> bool:
+            if last_start is not None or errors or len(pending) >= workers:
+                return False
+            if expected is None or next_start < expected:
+                return True
+            return all(offset < expected for offset in pending.values())
+
+        while True:
+            while can_schedule():
+                future = pool.submit(_fetch_player_page, gamekey, next_start, journal, with_draft)
+                pending[future] = next_start
+                next_start += PLAYER_PAGE_SIZE
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                offset = pending.pop(future)
+                try:
+                    start, batch, draft, count = future.result()
+                except Exception as exc:
+                    # Pages past the end are speculative; only fail for real ones.
+                    errors[offset] = exc
+                    continue
+                pages[start] = (batch, draft)
+                fetched = len(batch["player_key"])
+                print(f"Fetched {fetched} players at offset {start}")
+                log.debug("Fetched %d players at start=%d (count=%d)", fetched, start, count)
+                if count < PLAYER_PAGE_SIZE and (last_start is None or start < last_start):
+                    last_start = start
+                    for queued, offset in list(pending.items()):
+                        if offset > start and queued.cancel():
+                            del pending[queued]
+    for offset in sorted(errors):
+        if last_start is None or offset <= last_start:
+            raise errors[offset]
+    print("Reached the final player page; finished fetching Yahoo roster.")
+    log.debug("Final player page at start=%s", last_start)
+    return [pages[start] for start in sorted(pages) if last_start is None or start <= last_start]
+
+
+def _player_frame(pages: list[tuple[dict[str, list], dict[str, list] | None]]) -> pd.DataFrame:
+    columns = empty_columns(PLAYER_COLUMNS)
+    for batch, _ in pages:
+        for col in PLAYER_COLUMNS:
+            columns[col].extend(batch[col])
+    df = pd.DataFrame(columns, columns=PLAYER_COLUMNS).drop_duplicates(subset=["player_key"])
     print(f"Collected {len(df)} unique Yahoo players.")
     log.info("Pulled %d players", len(df))
     return df
 
 
-def get_draft(game_df: pd.DataFrame) -> pd.DataFrame:
-    keys = game_df["player_key"].tolist()
-    out = {}
-    for i in range(0, len(keys), 20):
-        chunk = ",".join(keys[i : i + 20])
-        data = get(f"/players;player_keys={chunk}/draft_analysis", bearer())
-        out.update(draft_analysis(data))
-    adp = (
-        pd.DataFrame.from_dict(out, orient="index")
-        .reset_index()
-        .rename(columns={"index": "player_key"})
+def get_all_players(
+    gamekey: str,
+    workers: int = PLAYER_FETCH_WORKERS,
+    journal: FetchJournal | None = None,
+    expected: int | None = None,
+) -> pd.DataFrame:
+    """Fetch every Yahoo player for ``gamekey`` (see :func:`_walk_player_pages`)."""
+
+    workers = max(1, int(workers))
+    print(f"Pulling Yahoo player list in batches of {PLAYER_PAGE_SIZE} ({workers} concurrent)...")
+    log.info(
+        "Fetching Yahoo player list in batches of %d with %d workers", PLAYER_PAGE_SIZE, workers
+    )
+    return _player_frame(_walk_player_pages(gamekey, workers, journal, False, expected))
+
+
+def get_players_with_draft(
+    gamekey: str,
+    workers: int = PLAYER_FETCH_WORKERS,
+    journal: FetchJournal | None = None,
+    expected: int | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Fetch every Yahoo player for ``gamekey`` together with its draft analysis.
+
+    Each page asks for the ``draft_analysis`` sub-resource, so one request
+    returns metadata and ADP for 25 players and the separate
+    ``player_keys=`` draft chunks are not needed.
+    """
+
+    workers = max(1, int(workers))
+    print(
+        f"Pulling Yahoo players with draft analysis in batches of {PLAYER_PAGE_SIZE} "
+        f"({workers} concurrent)..."
     )
+    log.info(
+        "Fetching Yahoo players with draft analysis in batches of %d with %d workers",
+        PLAYER_PAGE_SIZE,
+        workers,
+    )
+    pages = _walk_player_pages(gamekey, workers, journal, True, expected)
+    df = _player_frame(pages)
+    columns = empty_columns(["player_key"] + DRAFT_COLUMNS)
+    for _, draft in pages:
+        for col, values in draft.items():
+            columns[col].extend(values)
+    adp = _draft_frame(columns)
+    return df, adp[adp["player_key"].isin(df["player_key"])].reset_index(drop=True)
+
+
+def _fetch_draft_chunk(
+    keys: list[str], journal: FetchJournal | None = None, max_age: float | None = None
+) -> dict:
+    joined = ",".join(keys)
+    saved = journal.get(joined) if journal is not None else None
+    if saved is not None:
+        return saved
+    parsed = draft_columns(get(f"/players;player_keys={joined}/draft_analysis", max_age=max_age))
+    if journal is not None:
+        journal.record(joined, parsed)
+    return parsed
+
+
+def get_draft(
+    game_df: pd.DataFrame,
+    workers: int = DRAFT_FETCH_WORKERS,
+    journal: FetchJournal | None = None,
+    max_age: float | None = None,
+) -> pd.DataFrame:
+    keys = game_df["player_key"].tolist()
+    chunks = [keys[i : i + DRAFT_BATCH_SIZE] for i in range(0, len(keys), DRAFT_BATCH_SIZE)]
+    log.info("Fetching draft analysis in %d chunks with %d workers", len(chunks), workers)
+    columns = empty_columns(["player_key"] + DRAFT_COLUMNS)
+    with StagePool(max_workers=max(1, int(workers))) as pool:
+        fetch = partial(_fetch_draft_chunk, journal=journal, max_age=max_age)
+        for parsed in pool.map(fetch, chunks):
+            for col, values in parsed.items():
+                columns[col].extend(values)
+    return _draft_frame(columns)
+
+
+def _draft_frame(columns: dict[str, list]) -> pd.DataFrame:
+    adp = pd.DataFrame(draft_arrays(columns)).drop_duplicates("player_key", keep="last")
     adp["ADP"] = adp["pre_avg_pick"].where(adp["pre_avg_pick"].notna(), adp["avg_pick"])
     log.info(
         "Draft analysis rows: %d (with ADP: %d)",
@@ -165,29 +298,141 @@ def get_draft(game_df: pd.DataFrame) -> pd.DataFrame:
     return adp
 
 
-def main() -> None:
-    print("Starting IronMen pipeline run...")
-    log.info("Starting ironmen pipeline run")
-    gamekey = get_gamekey()
-    print(f"Yahoo NBA game key resolved: {gamekey}")
-    log.info("Fetching Yahoo players for game %s", gamekey)
-    print("Fetching Yahoo players from Yahoo Fantasy Sports...")
-    yahoo_players = get_all_players(gamekey)
-    print("Pulling draft analysis data from Yahoo...")
-    log.info("Pulling draft analysis for %d players", len(yahoo_players))
-    draft = get_draft(yahoo_players)
-
-    season_list = recent_seasons(DEFAULT_SEASON, RECENT_SEASON_COUNT)
-    print(f"Requesting NBA statistics for seasons: {', '.join(season_list)}")
-    log.info("Pulling NBA totals for seasons: %s", ", ".join(season_list))
-    nba_totals = pull_totals(season_list)
-    print(f"Retrieved {len(nba_totals)} NBA stat rows. Building availability metrics...")
-    log.info("Retrieved %d NBA total rows", len(nba_totals))
-    log.info("Building availability metrics")
-    availability = build_availability_metrics(nba_totals)
-    print(f"Computed availability metrics for {len(availability)} players.")
-    log.info("Computed availability metrics for %d players", len(availability))
-
+OUTPUT_COLUMNS = [
+    "name_full",
+    "IronMan_Rank",
+    "Good_IronMan_Rank",
+    "team",
+    "pos",
+    "ADP",
+    "Good_IronMan_Score",
+    "IronMan_Score",
+    "DurabilityZ",
+    "ProductionZ",
+    "EfficiencyZ",
+    "MinutesZ",
+    "ValueZ",
+    "GP",
+    "MIN",
+    "Weighted_GP",
+    "GP_Median",
+    "Durability_Composite",
+    "Durability_Penalty",
+    "Seasons_Used",
+    "PTS_PG",
+    "REB_PG",
+    "AST_PG",
+    "STL_PG",
+    "BLK_PG",
+    "FG3M_PG",
+    "FG3_PCT",
+    "FT_PCT",
+    "TOV_PG",
+    "DD2_PG",
+]
+# Appended to the CSV when game-log absence metrics were merged in (--game-logs).
+GAMELOG_OUTPUT_COLUMNS = [
+    "AbsenceZ",
+    "Games_Missed",
+    "Longest_Absence",
+    "Absence_Spells",
+    "B2B_Missed",
+    "Missed_Last30",
+]
+ADP_ONLY_STAGES = ("players", "nba_totals", "availability", "links")
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the Yahoo NBA Iron-Man rankings.")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Replay every Yahoo/NBA response from the local cache without touching the network.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the response cache and stage checkpoints; always hit Yahoo and stats.nba.com.",
+    )
+    parser.add_argument(
+        "--rematch",
+        action="store_true",
+        help="Ignore the saved player crosswalk and fuzzy-match every Yahoo player again.",
+    )
+    parser.add_argument(
+        "--refresh-adp-only",
+        action="store_true",
+        help="Reuse the last players/NBA/availability/match checkpoints; refetch ADP and rescore.",
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        default=LOW_MEMORY,
+        help="Hold NBA, availability and merged frames with categorical labels, int16 counts and float32 stats.",
+    )
+    parser.add_argument(
+        "--combined-fetch",
+        action="store_true",
+        default=COMBINED_FETCH,
+        help="Fetch draft analysis with each player page (one request per 25 players) instead of separately.",
+    )
+    parser.add_argument(
+        "--game-logs",
+        action="store_true",
+        default=GAME_LOGS,
+        help="Ingest per-game NBA logs and blend absence metrics (longest absence, missed back-to-backs) into the scores.",
+    )
+    parser.add_argument(
+        "--gp-projection",
+        action="store_true",
+        default=GP_PROJECTION,
+        help="Simulate next season's games played per player and add percentile and P(GP >= N) columns.",
+    )
+    return parser.parse_args(argv)
+
+
+class _Stages:
+    """Runs pipeline stages, reusing checkpoints whose input fingerprint matches."""
+
+    def __init__(self, store: StageStore, reuse: bool, offline: bool) -> None:
+        self.store = store
+        self.reuse = reuse
+        self.offline = offline
+
+    def run(self, stage: str, fp: str, build, max_age: float | None = None, rows_in: int | None = None):
+        with METRICS.stage(stage) as record:
+            record.rows_in = rows_in
+            record.notes["checkpoint"] = "reused"
+            value = None
+            if self.reuse:
+                value = self.store.load(stage, fp, None if self.offline else max_age)
+                if value is not None:
+                    print(f"Reusing {stage} checkpoint ({fp}).")
+                    log.info("Reusing %s checkpoint %s", stage, fp)
+            if value is None:
+                record.notes["checkpoint"] = "built"
+                value = build()
+                self.store.save(stage, fp, value)
+                log.info("Saved %s checkpoint %s", stage, fp)
+            record.rows_out = len(value) if hasattr(value, "__len__") and not isinstance(value, str) else None
+            if isinstance(value, pd.DataFrame):
+                record.notes["frame_mb"] = frame_mb(value)
+        return value
+
+    def journal(self, name: str, fp: str, max_age: float | None = None) -> FetchJournal:
+        """Fetch journal for a stage with fingerprint ``fp``, kept as long as its checkpoint would be.
+
+        ``--no-cache`` discards journals like checkpoints; ``--offline`` keeps any age.
+        """
+
+        if not self.reuse:
+            max_age = 0
+        elif self.offline:
+            max_age = None
+        return FetchJournal(Path(CHECKPOINT_DIR) / f"{name}.journal.jsonl", fp, max_age)
+
+
+def latest_rows(nba_totals: pd.DataFrame) -> pd.DataFrame:
     nba_latest = (
         nba_totals.sort_values(
             ["PLAYER_ID", "SEASON_START_YEAR", "SEASON_ID"],
@@ -196,62 +441,443 @@ def main() -> None:
         )
         .drop_duplicates("PLAYER_ID", keep="last")
     )
-    nba_latest = nba_latest.reset_index(drop=True)
+    return nba_latest.reset_index(drop=True)
 
-    links = match(yahoo_players, nba_latest)
-    log.info("Matched %d players", len(links))
-    print(f"Matched {len(links)} Yahoo players to NBA stats.")
 
-    nba_idx = nba_latest.reset_index().rename(columns={"index": "nba_row_index"})
-    link_df = pd.DataFrame(links, columns=["player_key", "nba_row_index"])
+def merge_inputs(
+    link_df: pd.DataFrame,
+    yahoo_players: pd.DataFrame,
+    nba_latest: pd.DataFrame,
+    draft: pd.DataFrame,
+    availability: pd.DataFrame,
+    absences: pd.DataFrame | None = None,
+    projections: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Join matched players with their Yahoo row, latest NBA row, ADP, availability
+    and (when given) game-log absences and games-played projections.
+
+    ``link_df`` pairs ``player_key`` with ``PLAYER_ID`` (see :func:`player_links`),
+    so links stay valid when ``nba_latest`` gains rows or changes order.
+    """
 
     merged = (
         link_df.merge(yahoo_players, on="player_key", how="left")
-        .merge(nba_idx, on="nba_row_index", how="left")
+        .merge(nba_latest, on="PLAYER_ID", how="left")
         .merge(draft[["player_key", "ADP"]], on="player_key", how="left")
         .merge(availability, on="PLAYER_ID", how="left")
     )
+    if absences is not None:
+        merged = merged.merge(absences, on="PLAYER_ID", how="left")
+    if projections is not None:
+        merged = merged.merge(projections, on="PLAYER_ID", how="left")
+    return merged
+
+
+def player_links(links: list[tuple[str, int]], nba_latest: pd.DataFrame) -> pd.DataFrame:
+    """``(player_key, nba_row_index)`` pairs as a ``player_key``/``PLAYER_ID`` frame."""
+
+    keys = [player_key for player_key, _ in links]
+    rows = [idx for _, idx in links]
+    return pd.DataFrame(
+        {"player_key": keys, "PLAYER_ID": nba_latest["PLAYER_ID"].to_numpy()[rows]},
+        columns=["player_key", "PLAYER_ID"],
+    )
+
+
+def _link(yahoo_players: pd.DataFrame, nba_latest: pd.DataFrame, rematch: bool) -> pd.DataFrame:
+    crosswalk = load_crosswalk()
+    if rematch:
+        crosswalk = crosswalk.iloc[0:0]
+    known_links = len(crosswalk)
+    links, crosswalk = match_with_crosswalk(yahoo_players, nba_latest, crosswalk)
+    save_crosswalk(crosswalk)
+    log.info("Crosswalk now holds %d players (%d before this run)", len(crosswalk), known_links)
+    return player_links(links, nba_latest)
+
+
+def _pull_draft(
+    yahoo_players: pd.DataFrame, journal: FetchJournal, max_age: float | None = None
+) -> pd.DataFrame:
+    draft = get_draft(yahoo_players, journal=journal, max_age=max_age)
+    journal.clear()
+    return draft
+
+
+def start_run(args: argparse.Namespace) -> _Stages:
+    """Reset run metrics, apply the cache flags and return the stage runner."""
+
+    METRICS.reset()
+    CACHE.offline = args.offline
+    CACHE.enabled = not args.no_cache or args.offline
+    return _Stages(StageStore(), reuse=CACHE.enabled, offline=args.offline)
+
+
+def pull_players(
+    stages: _Stages, combined: bool = False
+) -> tuple[pd.DataFrame, pd.DataFrame | None]:
+    """Resolve the game key, then fetch the Yahoo player list.
+
+    With ``combined`` the player pages also carry draft analysis, which is
+    returned alongside the players. Otherwise (or when the players checkpoint
+    was reused) the second element is ``None`` and :func:`pull_draft` fetches it.
+    """
+
+    gamekey = stages.run("gamekey", fingerprint("gamekey"), get_gamekey, cache_ttl("/game/nba"))
+    print(f"Yahoo NBA game key resolved: {gamekey}")
+    log.info("Fetching Yahoo players for game %s", gamekey)
+    print("Fetching Yahoo players from Yahoo Fantasy Sports...")
+
+    prefetched: list[pd.DataFrame] = []
+    players_fp = fingerprint(gamekey)
+    players_ttl = cache_ttl(f"/game/{gamekey}/players")
+
+    def build() -> pd.DataFrame:
+        # The last roster, however old, tells the page walk where to stop speculating.
+        previous = stages.store.latest("players")
+        expected = len(previous["value"]) if previous is not None else None
+        if combined:
+            journal = stages.journal(f"players_draft_{gamekey}", players_fp, players_ttl)
+            df, draft = get_players_with_draft(gamekey, journal=journal, expected=expected)
+            prefetched.append(draft)
+        else:
+            journal = stages.journal(f"players_{gamekey}", players_fp, players_ttl)
+            df = get_all_players(gamekey, journal=journal, expected=expected)
+        journal.clear()
+        return df
+
+    yahoo_players = stages.run("players", players_fp, build, players_ttl)
+    return yahoo_players, prefetched[0] if prefetched else None
+
+
+def pull_draft(
+    stages: _Stages, yahoo_players: pd.DataFrame, prefetched: pd.DataFrame | None = None
+) -> pd.DataFrame:
+    """Fetch Yahoo draft analysis for ``yahoo_players`` (checkpointed).
+
+    ``prefetched`` draft analysis from a combined player fetch is checkpointed
+    as is, in place of any older checkpoint.
+    """
+
+    draft_fp = fingerprint(yahoo_players)
+    if prefetched is not None:
+        log.info("Using draft analysis fetched with the player pages")
+        return stages.run("draft", draft_fp, lambda: prefetched, 0, rows_in=len(yahoo_players))
+    print("Pulling draft analysis data from Yahoo...")
+    log.info("Pulling draft analysis for %d players", len(yahoo_players))
+    draft_ttl = cache_ttl("/players;player_keys=/draft_analysis")
+    return stages.run(
+        "draft",
+        draft_fp,
+        lambda: _pull_draft(yahoo_players, stages.journal("draft", draft_fp, draft_ttl)),
+        draft_ttl,
+        rows_in=len(yahoo_players),
+    )
+
+
+def pull_nba(
+    stages: _Stages, season_list: list[str], compact: bool = False
+) -> tuple[pd.DataFrame, str]:
+    """Fetch NBA totals for ``season_list``; returns the rows and their fingerprint.
+
+    The fingerprint hashes the rows themselves, not the season names, so the
+    links and availability built on them are rebuilt whenever an in-progress
+    season is refetched with new numbers or players.
+    """
+
+    print(f"Requesting NBA statistics for seasons: {', '.join(season_list)}")
+    log.info("Pulling NBA totals for seasons: %s", ", ".join(season_list))
+    nba_fp = fingerprint(season_list, "compact") if compact else fingerprint(season_list)
+    nba_totals = stages.run(
+        "nba_totals",
+        nba_fp,
+        # --no-cache also bypasses the completed-season store.
+        lambda: pull_totals(
+            season_list, store_dir=SEASON_STORE_DIR if CACHE.enabled else None, compact=compact
+        ),
+        _nba_max_age(season_list),
+        len(season_list),
+    )
+    print(f"Retrieved {len(nba_totals)} NBA stat rows.")
+    log.info("Retrieved %d NBA total rows", len(nba_totals))
+    return nba_totals, fingerprint(nba_totals)
+
+
+def _nba_max_age(season_list: list[str]) -> float:
+    if all(season_completed(season) for season in season_list):
+        return COMPLETED_SEASON_TTL
+    return CURRENT_SEASON_TTL
+
+
+def pull_absences(stages: _Stages, season_list: list[str]) -> pd.DataFrame:
+    """Ingest NBA game logs for ``season_list`` and reduce them to per-player absences."""
+
+    print(f"Loading NBA game logs for seasons: {', '.join(season_list)}")
+    log.info("Loading NBA game logs for seasons: %s", ", ".join(season_list))
+
+    def build() -> pd.DataFrame:
+        # Like the season store, the game-log store is skipped with --no-cache.
+        players, schedule = load_game_logs(
+            season_list, store_dir=GAMELOG_STORE_DIR if CACHE.enabled else None
+        )
+        log.info("Loaded %d game-log rows and %d team games", len(players), len(schedule))
+        return absence_metrics(players, schedule)
+
+    absences = stages.run(
+        "absences",
+        fingerprint(season_list, RECENT_ABSENCE_DAYS),
+        build,
+        _nba_max_age(season_list),
+        len(season_list),
+    )
+    print(f"Computed game-log absences for {len(absences)} players.")
+    log.info("Computed game-log absences for %d players", len(absences))
+    return absences
+
+
+def link_players(
+    stages: _Stages,
+    yahoo_players: pd.DataFrame,
+    nba_latest: pd.DataFrame,
+    nba_fp: str,
+    rematch: bool = False,
+) -> pd.DataFrame:
+    """Match Yahoo players to NBA rows through the crosswalk (checkpointed)."""
+
+    # Hand edits to the crosswalk change the links, so its pairs are an input too.
+    crosswalk = load_crosswalk()[["player_key", "PLAYER_ID"]]
+    link_fp = fingerprint(yahoo_players, nba_fp, sorted(OVERRIDES.items()), crosswalk)
+    if rematch:
+        with METRICS.stage("links") as record:
+            record.rows_in = len(yahoo_players)
+            link_df = _link(yahoo_players, nba_latest, rematch=True)
+            stages.store.save("links", link_fp, link_df)
+            record.rows_out = len(link_df)
+        return link_df
+    return stages.run(
+        "links",
+        link_fp,
+        lambda: _link(yahoo_players, nba_latest, False),
+        rows_in=len(yahoo_players),
+    )
+
+
+def pull_availability(
+    stages: _Stages, nba_totals: pd.DataFrame, nba_fp: str, compact: bool = False
+) -> pd.DataFrame:
+    """Build per-player availability metrics from NBA totals (checkpointed)."""
+
+    print("Building availability metrics...")
+    log.info("Building availability metrics")
+
+    def build() -> pd.DataFrame:
+        metrics = build_availability_metrics(nba_totals)
+        return compact_frame(metrics) if compact else metrics
+
+    availability = stages.run(
+        "availability",
+        fingerprint(nba_fp, AVAILABILITY_WEIGHTS, DURABILITY_PENALTY_FACTOR),
+        build,
+        rows_in=len(nba_totals),
+    )
+    print(f"Computed availability metrics for {len(availability)} players.")
+    log.info("Computed availability metrics for %d players", len(availability))
+    return availability
+
+
+def pull_projections(stages: _Stages, availability: pd.DataFrame) -> pd.DataFrame:
+    """Simulate next season's games played from the availability metrics (checkpointed)."""
+
+    print(f"Simulating {PROJECTION_SIMS} seasons of games played per player...")
+    log.info("Simulating %d seasons per player (seed %d)", PROJECTION_SIMS, PROJECTION_SEED)
+    projections = stages.run(
+        "projections",
+        fingerprint(
+            availability,
+            PROJECTION_SIMS,
+            PROJECTION_SEED,
+            PROJECTION_PERCENTILES,
+            GP_THRESHOLDS,
+            SEASON_GAMES,
+        ),
+        lambda: gp_projections(availability),
+        rows_in=len(availability),
+    )
+    print(f"Projected games played for {len(projections)} players.")
+    log.info("Projected games played for %d players", len(projections))
+    return projections
+
+
+def input_graph(
+    stages: _Stages,
+    season_list: list[str],
+    compact: bool = False,
+    rematch: bool = False,
+    combined: bool = False,
+) -> StageGraph:
+    """Fetch and link steps as a dependency graph.
+
+    The Yahoo branch (game key, players, draft analysis) and the NBA branch
+    (season totals) share nothing, so they run concurrently and join only at
+    ``links``, which needs the Yahoo players and the latest NBA rows. A cold
+    run therefore waits for the slower branch rather than both in turn, and
+    draft analysis keeps downloading while players are matched. With
+    ``combined`` the player pages carry draft analysis and ``draft`` makes no
+    requests of its own. Callers may add further steps (availability,
+    absences) before running it.
+    """
+
+    graph = StageGraph()
+    graph.add("roster", lambda: pull_players(stages, combined))
+    graph.add("players", lambda roster: roster[0], ["roster"])
+    graph.add("draft", lambda roster: pull_draft(stages, *roster), ["roster"])
+    graph.add("nba", lambda: pull_nba(stages, season_list, compact))
+    graph.add("nba_latest", lambda nba: latest_rows(nba[0]), ["nba"])
+    graph.add(
+        "links",
+        lambda players, nba, nba_latest: link_players(stages, players, nba_latest, nba[1], rematch),
+        ["players", "nba", "nba_latest"],
+    )
+    return graph
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    startup_s = process_age_s()
+    args = parse_args(argv)
+    configure_logging()
+    stages = start_run(args)
+    print("Starting IronMen pipeline run...")
+    if startup_s is not None:
+        log.info("Process startup took %.3fs", startup_s)
+    log.info(
+        "Starting ironmen pipeline run (offline=%s, cache=%s, adp_only=%s, low_memory=%s, "
+        "game_logs=%s, combined_fetch=%s, gp_projection=%s)",
+        args.offline,
+        CACHE.enabled,
+        args.refresh_adp_only,
+        args.low_memory,
+        args.game_logs,
+        args.combined_fetch,
+        args.gp_projection,
+    )
+    if not args.offline:
+        bearer()
+
+    absences = projections = None
+    if args.refresh_adp_only:
+        needed = ADP_ONLY_STAGES + ("absences",) if args.game_logs else ADP_ONLY_STAGES
+        saved = {stage: stages.store.latest(stage) for stage in needed}
+        missing = [stage for stage, entry in saved.items() if entry is None]
+        if missing:
+            raise SystemExit(
+                "--refresh-adp-only needs checkpoints from a full run; missing: " + ", ".join(missing)
+            )
+        yahoo_players, nba_totals, availability, link_df = (
+            saved[stage]["value"] for stage in ADP_ONLY_STAGES
+        )
+        if "PLAYER_ID" not in link_df.columns:
+            raise SystemExit(
+                "--refresh-adp-only needs links saved by a newer full run; run the pipeline once without it"
+            )
+        if args.game_logs:
+            absences = saved["absences"]["value"]
+        print(f"Reusing {len(yahoo_players)} Yahoo players and {len(nba_totals)} NBA rows from checkpoints.")
+        print("Pulling fresh draft analysis data from Yahoo...")
+        log.info("Refreshing draft analysis only for %d players", len(yahoo_players))
+        # Saved as the draft checkpoint, so the next full run starts from this ADP.
+        # A journal left by a crashed run is not fresh ADP either, unless offline.
+        draft_fp = fingerprint(yahoo_players)
+        draft = stages.run(
+            "draft",
+            draft_fp,
+            lambda: _pull_draft(
+                yahoo_players, stages.journal("draft", draft_fp, 0), None if args.offline else 0
+            ),
+            0,
+            rows_in=len(yahoo_players),
+        )
+        nba_latest = latest_rows(nba_totals)
+        if args.gp_projection:
+            projections = pull_projections(stages, availability)
+    else:
+        season_list = recent_seasons(DEFAULT_SEASON, RECENT_SEASON_COUNT)
+        graph = input_graph(
+            stages, season_list, args.low_memory, args.rematch, args.combined_fetch
+        )
+        graph.add(
+            "availability",
+            lambda nba: pull_availability(stages, nba[0], nba[1], args.low_memory),
+            ["nba"],
+        )
+        if args.game_logs:
+            graph.add("absences", lambda: pull_absences(stages, season_list))
+        if args.gp_projection:
+            graph.add("projections", partial(pull_projections, stages), ["availability"])
+        inputs = graph.run()
+        yahoo_players, draft, nba_latest = inputs["players"], inputs["draft"], inputs["nba_latest"]
+        availability, link_df = inputs["availability"], inputs["links"]
+        absences, projections = inputs.get("absences"), inputs.get("projections")
+
+    log.info("Matched %d players", len(link_df))
+    print(f"Matched {len(link_df)} Yahoo players to NBA stats.")
+
+    with METRICS.stage("merge") as record:
+        record.rows_in = len(link_df)
+        merged = merge_inputs(
+            link_df, yahoo_players, nba_latest, draft, availability, absences, projections
+        )
+        if args.low_memory:
+            full_mb = frame_mb(merged)
+            merged = compact_frame(merged)
+            record.notes["frame_mb_full"] = full_mb
+            print(f"Low-memory mode: merged frame {full_mb:.2f} MiB -> {frame_mb(merged):.2f} MiB.")
+        record.notes["frame_mb"] = frame_mb(merged)
+        record.rows_out = len(merged)
 
     print("Computing IronMen scores and rankings...")
     log.info("Computing IronMan scores")
-    scored = compute(merged)
-    cols = [
-        "name_full",
-        "IronMan_Rank",
-        "Good_IronMan_Rank",
-        "team",
-        "pos",
-        "ADP",
-        "Good_IronMan_Score",
-        "IronMan_Score",
-        "DurabilityZ",
-        "ProductionZ",
-        "EfficiencyZ",
-        "MinutesZ",
-        "ValueZ",
-        "GP",
-        "MIN",
-        "Weighted_GP",
-        "GP_Median",
-        "Durability_Composite",
-        "Durability_Penalty",
-        "Seasons_Used",
-        "PTS_PG",
-        "REB_PG",
-        "AST_PG",
-        "STL_PG",
-        "BLK_PG",
-        "FG3M_PG",
-        "FG3_PCT",
-        "FT_PCT",
-        "TOV_PG",
-        "DD2_PG",
-    ]
+    scored = stages.run("scored", fingerprint(merged), lambda: compute(merged), rows_in=len(merged))
+    columns = OUTPUT_COLUMNS + GAMELOG_OUTPUT_COLUMNS if absences is not None else OUTPUT_COLUMNS
+    if projections is not None:
+        columns = columns + PROJECTION_COLUMNS
     print("Writing results to ironmen_rankings.csv...")
     log.info("Writing rankings CSV to ironmen_rankings.csv")
-    scored[cols].to_csv("ironmen_rankings.csv", index=False, encoding="utf-8-sig")
+    with METRICS.stage("write") as record:
+        record.rows_in = len(scored)
+        # Write-then-rename so readers (the rankings server) never see a partial file.
+        scored[columns].to_csv("ironmen_rankings.csv.tmp", index=False, encoding="utf-8-sig")
+        os.replace("ironmen_rankings.csv.tmp", "ironmen_rankings.csv")
+        log.info("Wrote ironmen_rankings.csv (%d rows)", len(scored))
+        exported = export_rankings(scored[columns], "ironmen_rankings")
+        record.rows_out = len(scored)
+    print(f"Exported {', '.join(path.name for path in exported)}.")
+    log.info("Exported rankings to %s", ", ".join(str(path) for path in exported))
     print(f"Saved {len(scored)} rows to ironmen_rankings.csv. Run complete!\n")
-    log.info("Wrote ironmen_rankings.csv (%d rows)", len(scored))
+    http_stats = HTTP.stats()
+    print(
+        f"Yahoo HTTP: {http_stats['requests']} requests over "
+        f"{http_stats['connections_opened']} connections "
+        f"({http_stats['reuse_ratio']:.0%} reused)."
+    )
+    log.info("Yahoo HTTP stats: %s", http_stats)
+    limiter_stats = LIMITER.stats()
+    if limiter_stats["throttles"]:
+        print(
+            f"Yahoo throttled {limiter_stats['throttles']} times; settled at "
+            f"{limiter_stats['window']:.1f} in flight, rate {limiter_stats['rate'] or 'uncapped'}/s."
+        )
+    log.info("Rate limiter stats: %s", limiter_stats)
+    cache_stats = CACHE.stats()
+    print(f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses.")
+    log.info("Response cache stats: %s", cache_stats)
+    CACHE.evict()
+    report = METRICS.write(
+        args=vars(args),
+        rows=len(scored),
+        startup_s=startup_s,
+        rate_limiter=limiter_stats,
+    )
+    print("\n".join(summary_lines(report)))
+    print(f"Run report: {REPORT_PATH} (history appended to {HISTORY_PATH}).")
     log.info("Ironmen pipeline run complete")
 
 
@@ -0,0 +1,64 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Sequence
+
+from metrics import StagePool
+
+log = logging.getLogger("yfs")
+
+
+class StageGraph:
+    """Pipeline steps that start as soon as the steps they depend on finish.
+
+    Each step's callable receives its dependencies' results as positional
+    arguments, in the order the dependencies were listed. Steps can only
+    depend on steps added before them, so the graph cannot contain a cycle.
+    Independent branches (the Yahoo and stats.nba.com fetches) run on their
+    own threads and join only where a step needs both. The first failure
+    stops new steps from starting and is re-raised once the running ones
+    have finished.
+    """
+
+    def __init__(self) -> None:
+        self._steps: Dict[str, tuple[Callable[..., Any], tuple[str, ...]]] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Sequence[str] = ()) -> "StageGraph":
+        if name in self._steps:
+            raise ValueError(f"Step {name!r} is already in the graph")
+        unknown = [dep for dep in deps if dep not in self._steps]
+        if unknown:
+            raise ValueError(f"Step {name!r} depends on unknown steps: {', '.join(unknown)}")
+        self._steps[name] = (fn, tuple(deps))
+        return self
+
+    def run(self) -> Dict[str, Any]:
+        """Run every step and return their results by name."""
+
+        results: Dict[str, Any] = {}
+        waiting = dict(self._steps)
+        running: dict = {}
+        error: BaseException | None = None
+        started = time.perf_counter()
+        with StagePool(max_workers=max(1, len(self._steps))) as pool:
+            while running or (waiting and error is None):
+                if error is None:
+                    for name, (fn, deps) in list(waiting.items()):
+                        if all(dep in results for dep in deps):
+                            del waiting[name]
+                            running[pool.submit(fn, *(results[dep] for dep in deps))] = name
+                            log.debug("Started step %s", name)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except BaseException as exc:
+                        log.error("Step %s failed: %s", name, exc)
+                        if error is None:
+                            error = exc
+                        continue
+                    log.info("Step %s finished at %.2fs", name, time.perf_counter() - started)
+        if error is not None:
+            raise error
+        return results
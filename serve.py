@@ -0,0 +1,354 @@
+import argparse
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from flask import Flask, Response, jsonify, request
+
+from export import facets, sort_orders
+
+log = logging.getLogger("yfs")
+
+RANKINGS_PATH = os.environ.get("IRONMAN_RANKINGS", "ironmen_rankings.csv")
+RELOAD_INTERVAL = float(os.environ.get("IRONMAN_RELOAD_INTERVAL", "2"))
+RESPONSE_CACHE_SIZE = int(os.environ.get("IRONMAN_RESPONSE_CACHE", "256"))
+SERVE_THREADS = int(os.environ.get("IRONMAN_SERVE_THREADS", "16"))
+DEFAULT_SORT = "IronMan_Rank"
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 1000
+GZIP_MIN_BYTES = 1024
+# Query parameters with their own meaning; any other ``min_<col>``/``max_<col>``
+# is a numeric range filter.
+RESERVED_PARAMS = {"team", "pos", "q", "min_gp", "sort", "order", "page", "per_page", "columns"}
+
+
+class QueryError(ValueError):
+    """Raised for a malformed rankings query; reported as HTTP 400."""
+
+
+def read_rankings(path: str | Path) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    if path.suffix in (".arrow", ".feather"):
+        return pd.read_feather(path)
+    return pd.read_csv(path, encoding="utf-8-sig")
+
+
+@dataclass
+class Snapshot:
+    """One immutable load of the rankings file plus its lookup structures.
+
+    Readers grab ``store.snapshot`` once per request and never see a
+    half-swapped reload.
+    """
+
+    frame: pd.DataFrame
+    version: str
+    loaded_at: float
+    numeric: Dict[str, np.ndarray] = field(default_factory=dict)
+    orders: Dict[str, Dict[str, np.ndarray]] = field(default_factory=dict)
+    facets: Dict[str, Dict[str, np.ndarray]] = field(default_factory=dict)
+    names: Optional[np.ndarray] = None
+
+    @classmethod
+    def build(cls, frame: pd.DataFrame, version: str) -> "Snapshot":
+        frame = frame.reset_index(drop=True)
+        snap = cls(frame=frame, version=version, loaded_at=time.time())
+        for col in frame.columns:
+            if pd.api.types.is_numeric_dtype(frame[col]):
+                snap.numeric[col] = frame[col].to_numpy(dtype=float)
+        for col in frame.columns:
+            snap.orders[col] = {
+                direction: np.asarray(order, dtype=np.int64)
+                for direction, order in sort_orders(frame[col]).items()
+            }
+        for col, sep in (("team", None), ("pos", ",")):
+            if col in frame.columns:
+                snap.facets[col] = {
+                    key: np.asarray(rows, dtype=np.int64)
+                    for key, rows in facets(frame[col], sep).items()
+                }
+        if "name_full" in frame.columns:
+            snap.names = frame["name_full"].fillna("").astype(str).str.lower().to_numpy()
+        return snap
+
+    def _facet_mask(self, col: str, raw: str) -> np.ndarray:
+        mask = np.zeros(len(self.frame), dtype=bool)
+        index = self.facets.get(col, {})
+        for value in (part.strip() for part in raw.split(",")):
+            rows = index.get(value)
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+    def _numeric(self, col: str) -> np.ndarray:
+        values = self.numeric.get(col)
+        if values is None:
+            raise QueryError(f"unknown or non-numeric column: {col}")
+        return values
+
+    def query(self, args: Dict[str, str]) -> Dict[str, Any]:
+        """Filter, sort and paginate; ``args`` is a flat query-string mapping."""
+
+        mask = np.ones(len(self.frame), dtype=bool)
+        if args.get("team"):
+            mask &= self._facet_mask("team", args["team"])
+        if args.get("pos"):
+            mask &= self._facet_mask("pos", args["pos"])
+        if args.get("q") and self.names is not None:
+            needle = args["q"].lower()
+            mask &= np.fromiter((needle in name for name in self.names), bool, len(self.names))
+        bounds = [("min_GP", args["min_gp"])] if args.get("min_gp") else []
+        bounds += [(key, value) for key, value in args.items() if key not in RESERVED_PARAMS]
+        for key, raw in bounds:
+            kind, _, col = key.partition("_")
+            if kind not in ("min", "max") or not col:
+                raise QueryError(f"unknown parameter: {key}")
+            try:
+                bound = float(raw)
+            except ValueError as exc:
+                raise QueryError(f"{key} must be a number") from exc
+            values = self._numeric(col)
+            with np.errstate(invalid="ignore"):
+                mask &= values >= bound if kind == "min" else values <= bound
+
+        sort = args.get("sort", DEFAULT_SORT)
+        direction = args.get("order", "asc")
+        if sort not in self.orders:
+            raise QueryError(f"unknown sort column: {sort}")
+        if direction not in ("asc", "desc"):
+            raise QueryError("order must be asc or desc")
+        order = self.orders[sort][direction]
+        rows = order[mask[order]]
+
+        try:
+            page = max(1, int(args.get("page", 1)))
+            per_page = min(MAX_PER_PAGE, max(1, int(args.get("per_page", DEFAULT_PER_PAGE))))
+        except ValueError as exc:
+            raise QueryError("page and per_page must be integers") from exc
+        columns = list(self.frame.columns)
+        if args.get("columns"):
+            columns = [col.strip() for col in args["columns"].split(",") if col.strip()]
+            missing = [col for col in columns if col not in self.frame.columns]
+            if missing:
+                raise QueryError(f"unknown columns: {', '.join(missing)}")
+
+        page_rows = rows[(page - 1) * per_page : page * per_page]
+        return {
+            "version": self.version,
+            "total": int(len(rows)),
+            "page": page,
+            "per_page": per_page,
+            "rows": self.frame.iloc[page_rows][columns],
+        }
+
+
+class RankingsStore:
+    """Holds the current :class:`Snapshot` and reloads it when the file changes.
+
+    The file is polled every ``interval`` seconds by a daemon thread; a new
+    snapshot is built off to the side and swapped in with a single attribute
+    assignment. A file that fails to parse (e.g. mid-write by a non-atomic
+    writer) keeps the previous snapshot in service.
+    """
+
+    def __init__(self, path: str | Path = RANKINGS_PATH, interval: float = RELOAD_INTERVAL) -> None:
+        self.path = Path(path)
+        self.interval = interval
+        self.reloads = 0
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.snapshot: Optional[Snapshot] = None
+        self.refresh()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self) -> bool:
+        """Reload the file if it changed since the last load; return whether it did."""
+
+        with self._lock:
+            stamp = self._file_stamp()
+            if stamp is None or stamp == self._stamp:
+                return False
+            try:
+                raw = self.path.read_bytes()
+                frame = read_rankings(self.path)
+            except Exception:
+                log.exception("Could not load rankings from %s; keeping previous data", self.path)
+                return False
+            version = hashlib.sha256(raw).hexdigest()[:16]
+            self._stamp = stamp
+            if self.snapshot is not None and self.snapshot.version == version:
+                return False
+            self.snapshot = Snapshot.build(frame, version)
+            self.reloads += 1
+            log.info("Loaded %d rankings rows from %s (version %s)", len(frame), self.path, version)
+            return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        def watch() -> None:
+            while True:
+                time.sleep(self.interval)
+                self.refresh()
+
+        self._thread = threading.Thread(target=watch, name="rankings-reload", daemon=True)
+        self._thread.start()
+
+
+class ResponseLRU:
+    """Thread-safe LRU of encoded response bodies keyed by data version + query."""
+
+    def __init__(self, size: int = RESPONSE_CACHE_SIZE) -> None:
+        self.size = size
+        self._items: "OrderedDict[str, Dict[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, bytes]]:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: Dict[str, bytes]) -> None:
+        with self._lock:
+            self._items[key] = entry
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+
+def _encode(result: Dict[str, Any]) -> bytes:
+    rows = result["rows"].to_json(orient="records", force_ascii=False)
+    head = (
+        f'{{"version":"{result["version"]}","total":{result["total"]},'
+        f'"page":{result["page"]},"per_page":{result["per_page"]},"rows":'
+    )
+    return (head + rows + "}").encode("utf-8")
+
+
+def create_app(store: Optional[RankingsStore] = None, watch: bool = True) -> Flask:
+    store = store or RankingsStore()
+    if watch:
+        store.start()
+    responses = ResponseLRU()
+    app = Flask(__name__)
+    app.config["RANKINGS_STORE"] = store
+
+    def _snapshot() -> Snapshot:
+        snap = store.snapshot
+        if snap is None:
+            raise QueryError(f"no rankings loaded from {store.path}")
+        return snap
+
+    @app.errorhandler(QueryError)
+    def bad_query(exc: QueryError):
+        return jsonify(error=str(exc)), 400
+
+    @app.get("/rankings")
+    def rankings() -> Response:
+        snap = _snapshot()
+        args = request.args.to_dict()
+        canonical = "&".join(f"{key}={args[key]}" for key in sorted(args))
+        etag = hashlib.sha256(f"{snap.version}?{canonical}".encode("utf-8")).hexdigest()[:24]
+        if etag in request.if_none_match:
+            return Response(status=304, headers={"ETag": f'"{etag}"', "Vary": "Accept-Encoding"})
+
+        entry = responses.get(etag)
+        if entry is None:
+            body = _encode(snap.query(args))
+            entry = {"identity": body}
+            if len(body) >= GZIP_MIN_BYTES:
+                entry["gzip"] = gzip.compress(body, compresslevel=6)
+            responses.put(etag, entry)
+
+        headers = {
+            "ETag": f'"{etag}"',
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "no-cache",
+        }
+        body = entry["identity"]
+        if "gzip" in entry and "gzip" in request.headers.get("Accept-Encoding", ""):
+            body = entry["gzip"]
+            headers["Content-Encoding"] = "gzip"
+        return Response(body, status=200, mimetype="application/json", headers=headers)
+
+    @app.get("/facets")
+    def facet_values() -> Response:
+        snap = _snapshot()
+        return jsonify(
+            version=snap.version,
+            **{col: sorted(index) for col, index in snap.facets.items()},
+            sortable=list(snap.orders),
+        )
+
+    @app.get("/healthz")
+    def health() -> Response:
+        snap = store.snapshot
+        return jsonify(
+            path=str(store.path),
+            loaded=snap is not None,
+            version=snap.version if snap else None,
+            rows=len(snap.frame) if snap else 0,
+            loaded_at=snap.loaded_at if snap else None,
+            reloads=store.reloads,
+        )
+
+    return app
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve Iron-Man rankings queries from memory.")
+    parser.add_argument("--path", default=RANKINGS_PATH, help="Rankings file (.csv, .parquet or .arrow).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--threads", type=int, default=SERVE_THREADS, help="Waitress worker threads.")
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Use Flask's development server instead of waitress (local debugging only).",
+    )
+    return parser.parse_args(argv)
+
+
+def run_server(app: Flask, host: str, port: int, threads: int = SERVE_THREADS) -> None:
+    """Serve ``app`` with waitress, a production WSGI server that runs on any platform."""
+
+    try:
+        from waitress import serve
+    except ImportError as exc:
+        raise SystemExit(
+            "waitress is not installed (pip install waitress). Alternatively run "
+            "gunicorn 'serve:create_app()', or pass --debug for Flask's development server."
+        ) from exc
+    log.info("Serving rankings on http://%s:%d with %d threads", host, port, threads)
+    serve(app, host=host, port=port, threads=threads)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args()
+    app = create_app(RankingsStore(args.path))
+    if args.debug:
+        app.run(host=args.host, port=args.port, threaded=True)
+    else:
+        run_server(app, args.host, args.port, args.threads)
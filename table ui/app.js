@@ -1,4 +1,5 @@
 const CSV_PATH = "../ironmen_rankings.csv";
+const INDEX_PATH = "../ironmen_rankings.index.json";
 const DEFAULT_SORT = { key: "displayRank", direction: "asc" };
 
 const COLUMN_META = {
@@ -126,6 +127,7 @@ const TEXT_NODE = typeof Node === "function" ? Node.TEXT_NODE : 3;
 
 const state = {
   players: [],
+  index: null,
   visiblePlayers: [],
   filters: {
     search: "",
@@ -367,18 +369,11 @@ function handleMobileSortDirection() {
 
 async function loadData() {
   try {
-    const response = await fetch(CSV_PATH);
-    if (!response.ok) throw new Error(`Failed to load CSV (${response.status})`);
-
-    const csvText = await response.text();
-    const parsed = Papa.parse(csvText, {
-      header: true,
-      dynamicTyping: false,
-      skipEmptyLines: true,
-      transformHeader: (header) => header.replace(/^\uFEFF/, "").trim(),
-    });
+    const bundle = await loadIndexBundle();
+    const rows = bundle ? rowsFromBundle(bundle) : await loadCsvRows();
+    state.index = bundle;
 
-    state.players = parsed.data.map((row, index) => normalizeRow(row, index));
+    state.players = rows.map((row, index) => normalizeRow(row, index));
     populateFilterOptions(state.players);
     recompute();
     if (typeof window !== "undefined") {
@@ -391,6 +386,45 @@ async function loadData() {
   }
 }
 
+async function loadIndexBundle() {
+  try {
+    const response = await fetch(INDEX_PATH);
+    if (!response.ok) return null;
+    const bundle = await response.json();
+    return bundle && bundle.version === 1 ? bundle : null;
+  } catch (error) {
+    console.warn("Rankings index bundle unavailable; falling back to CSV.", error);
+    return null;
+  }
+}
+
+function rowsFromBundle(bundle) {
+  const names = Object.keys(bundle.columns);
+  const rows = new Array(bundle.rows);
+  for (let index = 0; index < bundle.rows; index += 1) {
+    const row = {};
+    names.forEach((name) => {
+      row[name] = bundle.columns[name][index];
+    });
+    rows[index] = row;
+  }
+  return rows;
+}
+
+async function loadCsvRows() {
+  const response = await fetch(CSV_PATH);
+  if (!response.ok) throw new Error(`Failed to load CSV (${response.status})`);
+
+  const csvText = await response.text();
+  const parsed = Papa.parse(csvText, {
+    header: true,
+    dynamicTyping: false,
+    skipEmptyLines: true,
+    transformHeader: (header) => header.replace(/^\uFEFF/, "").trim(),
+  });
+  return parsed.data;
+}
+
 function normalizeRow(row, index) {
   const normalized = { ...row };
 
@@ -409,6 +443,7 @@ function normalizeRow(row, index) {
   const mpg = gp > 0 ? +(minutes / gp).toFixed(1) : 0;
 
   normalized.id = `${row.name_full || "player"}-${index}`;
+  normalized.row = index;
   normalized.GP = gp;
   normalized.MIN = minutes;
   normalized.MPG = mpg;
@@ -421,6 +456,12 @@ function normalizeRow(row, index) {
 }
 
 function populateFilterOptions(players) {
+  if (state.index?.facets?.team && state.index?.facets?.pos) {
+    setSelectOptions(elements.teamFilter, Object.keys(state.index.facets.team).sort());
+    setSelectOptions(elements.positionFilter, Object.keys(state.index.facets.pos).sort());
+    return;
+  }
+
   const uniqueTeams = new Set();
   const uniquePositions = new Set();
 
@@ -463,14 +504,25 @@ function recompute() {
 }
 
 function applyFilters(players) {
+  const positionRows = positionRowsFromIndex();
   return players
     .filter((player) => player.active)
     .filter(bySearch)
     .filter(byTeam)
-    .filter(byPosition)
+    .filter(positionRows ? (player) => positionRows.has(player.row) : byPosition)
     .filter(byGamesPlayed);
 }
 
+function positionRowsFromIndex() {
+  const facet = state.index?.facets?.pos;
+  if (!facet || state.filters.positions.size === 0) return null;
+  const rows = new Set();
+  state.filters.positions.forEach((pos) => {
+    (facet[pos] ?? []).forEach((row) => rows.add(row));
+  });
+  return rows;
+}
+
 function bySearch(player) {
   if (!state.filters.search) return true;
   return player.name_full?.toLowerCase().includes(state.filters.search.toLowerCase());
@@ -493,9 +545,29 @@ function byGamesPlayed(player) {
   return player.GP >= state.filters.minGames;
 }
 
+function basisScoreKey() {
+  return state.rankBasis === "goodIronman" ? "Good_IronMan_Score" : "IronMan_Score";
+}
+
+// Walks a precomputed row order from the index bundle, keeping only `players`.
+// Returns null when the bundle has no order for `column`.
+function orderedFromIndex(players, column, direction) {
+  const order = state.index?.orders?.[column]?.[direction];
+  if (!order) return null;
+  const byRow = new Map(players.map((player) => [player.row, player]));
+  const ordered = [];
+  order.forEach((row) => {
+    const player = byRow.get(row);
+    if (player) ordered.push(player);
+  });
+  return ordered;
+}
+
 function relabelRanks(players) {
-  const basisKey = state.rankBasis === "goodIronman" ? "Good_IronMan_Score" : "IronMan_Score";
-  const ranked = [...players].sort((a, b) => Number(b[basisKey] ?? 0) - Number(a[basisKey] ?? 0));
+  const basisKey = basisScoreKey();
+  const ranked =
+    orderedFromIndex(players, basisKey, "desc") ??
+    [...players].sort((a, b) => Number(b[basisKey] ?? 0) - Number(a[basisKey] ?? 0));
   ranked.forEach((player, index) => {
     player.displayRank = index + 1;
     player.currentScore = Number(player[basisKey] ?? 0);
@@ -504,6 +576,15 @@ function relabelRanks(players) {
 
 function applySort(players) {
   const { key, direction } = state.sort;
+  if (key === "displayRank") {
+    // Ascending display rank is exactly the descending basis-score order.
+    const ordered = direction === "asc" ? orderedFromIndex(players, basisScoreKey(), "desc") : null;
+    if (ordered) return ordered;
+  } else {
+    const column = key === "currentScore" ? basisScoreKey() : key;
+    const ordered = orderedFromIndex(players, column, direction);
+    if (ordered) return ordered;
+  }
   return [...players].sort((a, b) => compareByKey(a, b, key, direction));
 }
 
@@ -2,85 +2,277 @@ import base64
 import json
 import logging
 import os
+import threading
 import time
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-import requests
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
-BASE = "https://fantasysports.yahooapis.com/fantasy/v2"
-TOKEN_URL = "https://api.login.yahoo.com/oauth2/get_token"
+from cache import CACHE, DAY, HOUR
+from metrics import METRICS
+from ratelimit import AdaptiveLimiter, parse_retry_after
+
+try:
+    import orjson
+except ImportError:  # optional: faster decode of large player/draft payloads
+    orjson = None
+
+if TYPE_CHECKING:  # imported on first request; offline and re-score runs never need it
+    import requests
+
+# Overridable so benchmarks can point the client at a local stand-in server.
+BASE = os.environ.get("YH_API_BASE", "https://fantasysports.yahooapis.com/fantasy/v2")
+TOKEN_URL = os.environ.get("YH_TOKEN_URL", "https://api.login.yahoo.com/oauth2/get_token")
 TOKEN_PATH = os.environ.get("YH_TOKEN_PATH", "oauth2.json")
 
 DEFAULT_REDIRECT_URI = "https://ddd6fe0ba8e7.ngrok-free.app/callback"
 
-CLIENT_ID = os.environ.get("YH_CLIENT_ID")
-CLIENT_SECRET = os.environ.get("YH_CLIENT_SECRET")
-if not CLIENT_ID or not CLIENT_SECRET:
-    raise RuntimeError(
-        "Missing Yahoo OAuth client credentials. Set YH_CLIENT_ID and YH_CLIENT_SECRET in the environment."
-    )
 REDIRECT_URI = os.environ.get("YH_REDIRECT_URI", DEFAULT_REDIRECT_URI)
 
-logging.basicConfig(
-    filename="adp_pipeline.log",
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(message)s",
+# Cache freshness per endpoint, first substring match wins. ADP moves daily
+# during draft season; the game key and player list only change a few times
+# per preseason.
+CACHE_TTLS = (
+    ("/draft_analysis", 2 * HOUR),
+    ("/players", DAY),
+    ("/game/", 7 * DAY),
 )
+DEFAULT_CACHE_TTL = HOUR
+
+HTTP_POOL_SIZE = int(os.environ.get("YH_HTTP_POOL_SIZE", "16"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("YH_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.environ.get("YH_HTTP_READ_TIMEOUT", "20"))
+
+# Shared request budget (see ratelimit.AdaptiveLimiter). The requests-per-second
+# cap is off until Yahoo first throttles (0 = unset) unless YH_RATE_LIMIT pins a
+# starting value; YH_RATE_LIMIT_MAX bounds the additive increase. The in-flight
+# window starts at YH_CONCURRENCY_START and tops out at the connection pool size.
+RATE_LIMIT = float(os.environ.get("YH_RATE_LIMIT", "0")) or None
+RATE_LIMIT_MAX = float(os.environ.get("YH_RATE_LIMIT_MAX", "0")) or None
+RATE_LIMIT_BURST = float(os.environ.get("YH_RATE_LIMIT_BURST", "10"))
+CONCURRENCY_START = float(os.environ.get("YH_CONCURRENCY_START", "8"))
+
+# Yahoo answers 999 ("Request denied") as well as 429 when it throttles.
+THROTTLE_STATUSES = frozenset({429, 999})
+RETRYABLE_STATUSES = THROTTLE_STATUSES | {500, 502, 503, 504}
+
+LOG_PATH = os.environ.get("IRONMAN_LOG", "adp_pipeline.log")
 log = logging.getLogger("yfs")
 
 
+def configure_logging(path: str = LOG_PATH) -> None:
+    """Send INFO and above to ``path``. Called by the entry points, not on import."""
+
+    logging.basicConfig(filename=path, level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
 class ApiError(Exception):
     """Raised when Yahoo Fantasy API returns a non-success status."""
 
-    def __init__(self, message: str, response: Optional[requests.Response] = None) -> None:
+    def __init__(self, message: str, response: Optional["requests.Response"] = None) -> None:
         super().__init__(message)
         self.response = response
+        self.status = response.status_code if response is not None else None
+        self.retry_after = (
+            parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+        )
+
+
+class HttpClient:
+    """Keep-alive HTTP client shared by every Yahoo request.
+
+    Wraps a single ``requests.Session`` with a pooled adapter so repeated
+    calls to the same host reuse their TCP/TLS connection. The session is
+    shared across worker threads; ``pool_block`` keeps the number of open
+    sockets at ``pool_size`` even when more threads are in flight. It is
+    built on the first request, so runs served from the cache never import
+    ``requests``.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+    ) -> None:
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self._session: Optional["requests.Session"] = None
+        self._adapter = None
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._bytes = 0
+
+    @property
+    def session(self) -> "requests.Session":
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    session.headers.update({"Accept-Encoding": "gzip, deflate", "Accept": "application/json"})
+                    self._adapter = HTTPAdapter(
+                        pool_connections=self.pool_size, pool_maxsize=self.pool_size, pool_block=True
+                    )
+                    session.mount("https://", self._adapter)
+                    session.mount("http://", self._adapter)
+                    self._session = session
+        return self._session
+
+    def request(self, method: str, url: str, **kwargs: Any) -> "requests.Response":
+        kwargs.setdefault("timeout", self.timeout)
+        started = time.perf_counter()
+        resp = self.session.request(method, url, **kwargs)
+        size = len(resp.content)
+        with self._lock:
+            self._requests += 1
+            self._bytes += size
+        METRICS.count("http.requests")
+        METRICS.count("http.bytes", size)
+        METRICS.count("http.seconds", time.perf_counter() - started)
+        if resp.status_code >= 400:
+            METRICS.count(f"http.status_{resp.status_code}")
+        return resp
+
+    def get(self, url: str, **kwargs: Any) -> "requests.Response":
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> "requests.Response":
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request and connection-reuse counters for this client."""
+
+        opened = 0
+        if self._adapter is not None:
+            pools = self._adapter.poolmanager.pools
+            opened = sum(pools[key].num_connections for key in list(pools.keys()))
+        with self._lock:
+            total, size = self._requests, self._bytes
+        return {
+            "requests": total,
+            "connections_opened": opened,
+            "connections_reused": max(total - opened, 0),
+            "reuse_ratio": (total - opened) / total if total else 0.0,
+            "bytes_decoded": size,
+        }
+
+
+HTTP = HttpClient()
+LIMITER = AdaptiveLimiter(
+    rate=RATE_LIMIT,
+    max_rate=RATE_LIMIT_MAX,
+    burst=RATE_LIMIT_BURST,
+    window=min(CONCURRENCY_START, HTTP_POOL_SIZE),
+    max_window=HTTP_POOL_SIZE,
+)
+
+
+def client_credentials() -> tuple[str, str]:
+    """Yahoo OAuth client id and secret, read from the environment when first needed."""
+
+    client_id = os.environ.get("YH_CLIENT_ID")
+    client_secret = os.environ.get("YH_CLIENT_SECRET")
+    if not client_id or not client_secret:
+        raise ApiError(
+            "Missing Yahoo OAuth client credentials. Set YH_CLIENT_ID and YH_CLIENT_SECRET in the environment."
+        )
+    return client_id, client_secret
 
 
 def _basic_auth() -> str:
-    if not CLIENT_ID or not CLIENT_SECRET:
-        raise ApiError("Missing Yahoo OAuth client credentials in environment")
-    raw = f"{CLIENT_ID}:{CLIENT_SECRET}".encode()
+    client_id, client_secret = client_credentials()
+    raw = f"{client_id}:{client_secret}".encode()
     return "Basic " + base64.b64encode(raw).decode()
 
 
-def _load_tokens() -> Dict[str, Any]:
-    with open(TOKEN_PATH, "r", encoding="utf-8") as fh:
+def _load_tokens(path: str = TOKEN_PATH) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as fh:
         return json.load(fh)
 
 
-def _save_tokens(tokens: Dict[str, Any]) -> None:
+def _save_tokens(tokens: Dict[str, Any], path: str = TOKEN_PATH) -> Dict[str, Any]:
     tokens = dict(tokens)
     tokens["obtained_at"] = int(time.time())
-    with open(TOKEN_PATH, "w", encoding="utf-8") as fh:
+    with open(path, "w", encoding="utf-8") as fh:
         json.dump(tokens, fh, indent=2)
+    return tokens
 
 
-def _refresh_access_token() -> str:
-    tokens = _load_tokens()
-    refresh_token = tokens.get("refresh_token")
-    if not refresh_token:
-        raise ApiError("oauth2.json missing refresh_token; re-run auth_init.py")
-
+def _request_new_tokens(refresh_token: str) -> Dict[str, Any]:
     headers = {
         "Authorization": _basic_auth(),
         "Content-Type": "application/x-www-form-urlencoded",
     }
     data = {"grant_type": "refresh_token", "refresh_token": refresh_token}
     log.info("Refreshing Yahoo access token")
-    resp = requests.post(TOKEN_URL, headers=headers, data=data, timeout=30)
+    resp = HTTP.post(TOKEN_URL, headers=headers, data=data, timeout=30)
     if resp.status_code >= 400:
         snippet = resp.text[:400]
         log.error("HTTP %s %s : %s", resp.status_code, resp.url, snippet)
         raise ApiError(f"Failed to refresh token: {resp.status_code} {resp.reason}", resp)
     new_tokens = resp.json()
     new_tokens["refresh_token"] = new_tokens.get("refresh_token", refresh_token)
-    _save_tokens(new_tokens)
-    return new_tokens["access_token"]
+    return new_tokens
+
+
+class TokenManager:
+    """In-memory, thread-safe holder for the Yahoo OAuth tokens.
+
+    ``oauth2.json`` is read once and shared by every worker. When several
+    requests hit a 401 at the same time only the first one refreshes; the
+    others see that the token they were holding is already stale and reuse
+    the new one.
+    """
+
+    def __init__(self, path: str = TOKEN_PATH) -> None:
+        self.path = path
+        self.refreshes = 0
+        self._tokens: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def access_token(self) -> str:
+        with self._lock:
+            if self._tokens is None:
+                self._tokens = _load_tokens(self.path)
+            return self._tokens["access_token"]
+
+    def refresh(self, stale_token: Optional[str] = None) -> str:
+        """Refresh the access token unless another caller already replaced ``stale_token``."""
+
+        with self._lock:
+            if self._tokens is None:
+                self._tokens = _load_tokens(self.path)
+            current = self._tokens.get("access_token")
+            if stale_token is not None and current and current != stale_token:
+                return current
+            refresh_token = self._tokens.get("refresh_token")
+            if not refresh_token:
+                raise ApiError("oauth2.json missing refresh_token; re-run auth_init.py")
+            self._tokens = _save_tokens(_request_new_tokens(refresh_token), self.path)
+            self.refreshes += 1
+            METRICS.count("yahoo.token_refreshes")
+            return self._tokens["access_token"]
 
 
-def _check(resp: requests.Response) -> None:
+TOKENS = TokenManager()
+
+
+def _refresh_access_token() -> str:
+    return TOKENS.refresh()
+
+
+def decode(resp: "requests.Response") -> Dict[str, Any]:
+    """Decode a JSON response, using ``orjson`` when it is installed."""
+
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
+def _check(resp: "requests.Response") -> None:
     if 200 <= resp.status_code < 300:
         return
     body = resp.text[:400]
@@ -88,26 +280,101 @@ def _check(resp: requests.Response) -> None:
     raise ApiError(f"{resp.status_code} {resp.reason}", resp)
 
 
+def cache_ttl(path: str) -> float:
+    for fragment, ttl in CACHE_TTLS:
+        if fragment in path:
+            return ttl
+    return DEFAULT_CACHE_TTL
+
+
+def _retryable(exc: BaseException) -> bool:
+    """Retry network failures, throttling and 5xx; other API errors fail fast."""
+
+    import requests
+
+    if isinstance(exc, requests.exceptions.RequestException):
+        return True
+    if isinstance(exc, ApiError):
+        if exc.status in RETRYABLE_STATUSES:
+            return True
+        METRICS.count("yahoo.fail_fast")
+    return False
+
+
+_backoff = wait_exponential(multiplier=1, min=1, max=30)
+
+
+def _retry_wait(retry_state) -> float:
+    """Honour the server's ``Retry-After``; otherwise back off exponentially."""
+
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is not None:
+        return retry_after
+    return _backoff(retry_state)
+
+
+def _count_retry(retry_state) -> None:
+    METRICS.count("yahoo.retries")
+    log.warning(
+        "Retrying Yahoo request (attempt %d): %s",
+        retry_state.attempt_number,
+        retry_state.outcome.exception() if retry_state.outcome else "",
+    )
+
+
+def _limited_get(url: str, headers: Dict[str, str], params: Dict[str, Any]) -> "requests.Response":
+    """GET through the shared limiter and feed the outcome back into it."""
+
+    started = time.perf_counter()
+    with LIMITER.slot():
+        METRICS.count("ratelimit.wait_seconds", time.perf_counter() - started)
+        resp = HTTP.get(url, headers=headers, params=params)
+    if resp.status_code in THROTTLE_STATUSES:
+        METRICS.count("yahoo.throttled")
+        LIMITER.on_throttle(parse_retry_after(resp.headers.get("Retry-After")))
+    elif resp.status_code < 400:
+        LIMITER.on_success()
+    return resp
+
+
 @retry(
     reraise=True,
-    retry=retry_if_exception_type((requests.exceptions.RequestException, ApiError)),
-    wait=wait_exponential(multiplier=1, min=1, max=30),
+    retry=retry_if_exception(_retryable),
+    wait=_retry_wait,
     stop=stop_after_attempt(5),
+    before_sleep=_count_retry,
 )
-def get(path: str, token: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """Call the Yahoo Fantasy API with automatic retries and token refresh."""
-
-    params = dict(params or {})
-    params.setdefault("format", "json")
-
+def _fetch(path: str, token: Optional[str], params: Dict[str, Any]) -> Dict[str, Any]:
+    token = token or TOKENS.access_token()
     headers = {"Authorization": f"Bearer {token}"}
-    resp = requests.get(f"{BASE}{path}", headers=headers, params=params, timeout=20)
+    resp = _limited_get(f"{BASE}{path}", headers, params)
 
     if resp.status_code == 401:
         log.warning("401 Unauthorized for %s; attempting token refresh", resp.url)
-        token = _refresh_access_token()
+        token = TOKENS.refresh(token)
         headers["Authorization"] = f"Bearer {token}"
-        resp = requests.get(f"{BASE}{path}", headers=headers, params=params, timeout=20)
+        resp = _limited_get(f"{BASE}{path}", headers, params)
 
     _check(resp)
-    return resp.json()
+    return decode(resp)
+
+
+def get(
+    path: str,
+    token: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    max_age: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Call the Yahoo Fantasy API with caching, automatic retries and token refresh.
+
+    ``token`` defaults to the shared :data:`TOKENS` manager's access token and
+    is only resolved when the response is not already in :data:`cache.CACHE`.
+    ``max_age`` overrides the endpoint's cache TTL (``0`` forces a refetch).
+    """
+
+    METRICS.count("yahoo.calls")
+    params = dict(params or {})
+    params.setdefault("format", "json")
+    ttl = cache_ttl(path) if max_age is None else max_age
+    return CACHE.fetch("yahoo", path, params, ttl, lambda: _fetch(path, token, params))